@@ -4,18 +4,44 @@ from vpy.document_test import TestDocument
 from vpy.analysis_test import TestAnalysis
 from vpy.values_test import TestValues
 from vpy.todo_test import TestToDo
+from vpy.grouping_test import TestGrouping
+from vpy.batch_test import TestBatch
+from vpy.pkg_io_test import TestIo
+from vpy.store_test import TestStore
+from vpy.model_test import TestModel
+from vpy.gum_test import TestGum
+from vpy.piecewise_test import TestPiecewise
+from vpy.build_info_test import TestBuildInfo
+from vpy.startup_test import TestStartup
+from vpy.service_test import TestService
+from vpy.sim_test import TestSim
+from vpy.timing_test import TestTiming
 from vpy.device.cdg_test import TestCdg
 from vpy.standard.se3.uncert_test import TestUncertSE3
+from vpy.standard.se3.fill_test import TestFillSE3
 
 loader = unittest.TestLoader()
 suite  = unittest.TestSuite()
 
 suite.addTests(loader.loadTestsFromTestCase(TestCdg))
 suite.addTests(loader.loadTestsFromTestCase(TestToDo))
+suite.addTests(loader.loadTestsFromTestCase(TestGrouping))
+suite.addTests(loader.loadTestsFromTestCase(TestBatch))
+suite.addTests(loader.loadTestsFromTestCase(TestIo))
+suite.addTests(loader.loadTestsFromTestCase(TestStore))
+suite.addTests(loader.loadTestsFromTestCase(TestModel))
+suite.addTests(loader.loadTestsFromTestCase(TestGum))
+suite.addTests(loader.loadTestsFromTestCase(TestPiecewise))
+suite.addTests(loader.loadTestsFromTestCase(TestBuildInfo))
+suite.addTests(loader.loadTestsFromTestCase(TestStartup))
+suite.addTests(loader.loadTestsFromTestCase(TestService))
+suite.addTests(loader.loadTestsFromTestCase(TestSim))
+suite.addTests(loader.loadTestsFromTestCase(TestTiming))
 suite.addTests(loader.loadTestsFromTestCase(TestValues))
 suite.addTests(loader.loadTestsFromTestCase(TestAnalysis))
 suite.addTests(loader.loadTestsFromTestCase(TestDocument))
 suite.addTests(loader.loadTestsFromTestCase(TestUncertSE3))
+suite.addTests(loader.loadTestsFromTestCase(TestFillSE3))
 
 runner = unittest.TextTestRunner(verbosity=3)
 result = runner.run(suite)
\ No newline at end of file
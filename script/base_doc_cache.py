@@ -0,0 +1,32 @@
+"""
+python script/base_doc_cache.py
+python script/base_doc_cache.py --standard se3
+python script/base_doc_cache.py --standard se3 --invalidate_cache
+
+Shows the cache directory of the base docs (see
+``Io.get_base_doc()``). With ``--standard`` the base doc of the
+standard is requested (and cached) first; the hit/miss counts of this
+request are shown (counts are kept per process). ``--invalidate_cache``
+removes the cached base docs (of the given standard or all).
+"""
+import sys
+sys.path.append(".")
+
+import json
+from vpy.pkg_io import Io
+
+def main():
+    io = Io()
+    io.eval_args()
+
+    ret = {"path": io.config["cache"]["path"]}
+    if io.invalidate:
+        ret["removed"] = io.invalidate_cache(io.standard)
+    elif io.standard:
+        io.get_base_doc(io.standard)
+    ret["stats"] = io.cache_stats()
+
+    print(json.dumps(ret))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+python script/batch_analysis.py --standard se3 --ids 'cal-2019-se3-kk-75002_0001@cal-2019-se3-kk-75003_0001' --workers 4 -u -s
+python script/batch_analysis.py --standard se3 --ids '...' -a  # AuxValues from the state documents
+
+Analyses all given documents by means of ``vpy.batch.Batch``. Documents
+failing in the analysis are reported in ``errors`` and do not stop the
+run.
+"""
+import sys
+sys.path.append(".")
+
+import json
+from vpy.pkg_io import Io
+from vpy.batch import Batch
+
+def main():
+    io = Io()
+    io.eval_args()
+
+    if not io.ids:
+        sys.exit("no --ids found")
+    if not io.standard:
+        sys.exit("no --standard found")
+
+    ids = [id.replace("\"", "") for id in io.ids]
+    batch = Batch(io, io.standard, workers=io.workers)
+    ret = batch.run(ids, update=io.update, save=io.save, auxval=io.auxval)
+
+    print(json.dumps(ret))
+
+if __name__ == "__main__":
+    main()
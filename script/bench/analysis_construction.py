@@ -0,0 +1,55 @@
+"""
+Benchmark of the construction of ``Analysis`` objects with the git hash
+(``git_hash=True``, the default).
+
+python script/bench/analysis_construction.py
+python script/bench/analysis_construction.py --count 500
+
+The *before* number is measured with the former implementation (one
+``git rev-parse HEAD`` subprocess per ``Analysis``) which is kept here
+as ``legacy_git_hash()``. The hashes have to be equal.
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import subprocess
+
+from vpy import build_info
+from vpy.analysis import Analysis
+
+def legacy_git_hash():
+    return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=build_info.package_path).decode('ascii').strip()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, default="vpy/standard/se3/cal-sim-se3.json")
+    parser.add_argument("--count", type=int, default=100)
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        doc = json.load(f)
+
+    t_0 = time.perf_counter()
+    for _ in range(args.count):
+        before = Analysis(doc, git_hash=False)
+        before.doc["AuxValues"]["AnalysisGitHash"] = legacy_git_hash()
+    t_before = time.perf_counter() - t_0
+
+    t_0 = time.perf_counter()
+    for _ in range(args.count):
+        after = Analysis(doc)
+    t_after = time.perf_counter() - t_0
+
+    if before.doc["AuxValues"]["AnalysisGitHash"] != after.doc["AuxValues"]["AnalysisGitHash"]:
+        sys.exit("hashes differ")
+
+    print(json.dumps({"count": args.count,
+                      "before_s": t_before,
+                      "after_s": t_after,
+                      "speedup": t_before/t_after}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of the construction of the SE3 devices (``Se3.TDev``,
+``Se3.FillDevs`` and the customer device) by ``Cal``, ``Uncert`` and
+``init_customer_device()`` for a batch of documents.
+
+python script/bench/device_construction.py
+python script/bench/device_construction.py --docs 200 --rev
+
+Each of ``--docs`` documents is a copy of ``--file`` (as documents
+fetched one by one). With ``--rev`` the calibration objects and the
+constants get an ``_id`` and a ``_rev`` (as documents of the
+database), otherwise the devices are shared by the hash of the objects.
+
+The *before* numbers are measured with the sharing switched off
+(``Device.share_devices(False)``): every ``Cal`` and ``Uncert`` builds
+all its devices. The devices have to be equal.
+"""
+import sys
+sys.path.append(".")
+
+import copy
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy.device.device import Device
+from vpy.helper import init_customer_device
+from vpy.standard.se3.cal import Cal
+from vpy.standard.se3.uncert import Uncert
+
+## attributes not depending on the calibration object
+volatile = ("ToDo", "Val", "budgets", "error_kernel")
+
+def same_device(a, b):
+    if type(a) != type(b):
+        return False
+    va = {k: v for k, v in vars(a).items() if k not in volatile}
+    vb = {k: v for k, v in vars(b).items() if k not in volatile}
+    if va.keys() != vb.keys():
+        return False
+    for k in va:
+        if isinstance(va[k], np.ndarray):
+            if not np.array_equal(va[k], vb[k], equal_nan=True):
+                return False
+        elif hasattr(va[k], "doc"):
+            if va[k].doc != vb[k].doc:
+                return False
+        elif va[k] != vb[k]:
+            return False
+    return True
+
+def devices(docs):
+    out = []
+    for doc in docs:
+        cal = Cal(doc)
+        uncert = Uncert(doc)
+        out.append([cal.TDev, uncert.TDev] + cal.FillDevs + uncert.FillDevs + [init_customer_device(doc)])
+    return out
+
+def timed(f, repeat):
+    t = []
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        ret = f()
+        t.append(time.perf_counter() - t_0)
+    return min(t), ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, default="vpy/standard/se3/cal-sim-se3.json")
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--rev", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        doc = json.load(f)
+
+    if args.rev:
+        calib = doc["Calibration"]
+        calib["Constants"].update({"_id": "constants", "_rev": "1-a"})
+        for i, cob in enumerate(calib["CalibrationObject"]):
+            cob.update({"_id": "cob-{}".format(i), "_rev": "1-a"})
+
+    docs = [copy.deepcopy(doc) for _ in range(args.docs)]
+
+    def before():
+        Device.share_devices(False)
+        return devices(docs)
+
+    def after():
+        Device.share_devices(False)
+        Device.share_devices(True)
+        return devices(docs)
+
+    t_before, r_before = timed(before, args.repeat)
+    t_after, r_after = timed(after, args.repeat)
+    for a, b in zip(r_before, r_after):
+        if len(a) != len(b) or not all(same_device(x, y) for x, y in zip(a, b)):
+            sys.exit("devices differ")
+
+    print(json.dumps({"docs": args.docs,
+                      "rev": args.rev,
+                      "devices_per_doc": len(r_before[0]),
+                      "devices_built": len(Device.shared_devices),
+                      "before_s": t_before,
+                      "after_s": t_after,
+                      "speedup": t_before/t_after}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Lookup cost of ``Document.get_value()`` on a full SE3 calibration document.
+
+python script/bench/document_lookup.py
+python script/bench/document_lookup.py --file vpy/standard/se3/cal-sim-se3.json --repeat 5
+
+The *before* numbers are measured with the former implementation
+(deep copy of the subtree on every level of recursion) which is kept
+here as ``legacy_get_object()``.
+"""
+import sys
+sys.path.append(".")
+
+import copy
+import json
+import time
+import argparse
+
+from vpy.document import Document
+
+def legacy_get_object(key, value, obj):
+    obj = copy.deepcopy(obj)
+    if isinstance(obj, dict):
+        if key in obj and obj[key] == value:
+            return obj
+        else:
+            for k, v in obj.items():
+                if isinstance(v, dict) or isinstance(v, list):
+                    res = legacy_get_object(key, value, v)
+                    if res is not None:
+                        return res
+
+    if isinstance(obj, list):
+        for l in obj:
+            if isinstance(l, dict) or isinstance(l, list):
+                res = legacy_get_object(key, value, l)
+                if res is not None:
+                    return res
+
+def collect_types(obj, types):
+    if isinstance(obj, dict):
+        if isinstance(obj.get("Type"), str):
+            types.append(obj["Type"])
+        for v in obj.values():
+            collect_types(v, types)
+    if isinstance(obj, list):
+        for l in obj:
+            collect_types(l, types)
+
+    return types
+
+def timed(f, repeat):
+    t = []
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        f()
+        t.append(time.perf_counter() - t_0)
+    return min(t)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, default="vpy/standard/se3/cal-sim-se3.json")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--types", type=int, default=200,
+                        help="number of Type lookups per run")
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        doc = json.load(f)
+
+    types = collect_types(doc, [])[:args.types]
+    raw = copy.deepcopy(doc)
+
+    def before():
+        for t in types:
+            legacy_get_object("Type", t, raw)
+
+    def after():
+        d = Document(doc)
+        for t in types:
+            d.get_object("Type", t)
+
+    for t in types:
+        if legacy_get_object("Type", t, raw) != Document(doc).get_object("Type", t):
+            sys.exit("lookup of {} differs".format(t))
+
+    t_before = timed(before, args.repeat)
+    t_after = timed(after, args.repeat)
+
+    print(json.dumps({"file": args.file,
+                      "lookups": len(types),
+                      "before_s": t_before,
+                      "after_s": t_after,
+                      "speedup": t_before/t_after}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Memory needed to build the analysis objects (Cal, Uncert, customer device
+and Analysis) for a batch of calibration documents.
+
+python script/bench/document_memory.py
+python script/bench/document_memory.py --file vpy/standard/se3/cal-sim-se3.json --batch 20
+python script/bench/document_memory.py --file frs5-doc.json --standard frs5
+
+The *before* numbers are measured by switching ``Document`` back to
+the former eager ``copy.deepcopy()`` on initialisation.
+"""
+import sys
+sys.path.append(".")
+
+import copy
+import json
+import time
+import argparse
+import tracemalloc
+
+from vpy.document import Document
+from vpy.analysis import Analysis
+from vpy.helper import init_customer_device
+
+def build_se3(doc):
+    from vpy.standard.se3.cal import Cal
+    from vpy.standard.se3.uncert import Uncert
+    return [Cal(doc), Uncert(doc), init_customer_device(doc),
+            Analysis(doc, analysis_type="expansion", git_hash=False)]
+
+def build_frs5(doc):
+    from vpy.standard.frs5.cal import Cal
+    from vpy.standard.frs5.uncert import Uncert
+    return [Cal(doc), Uncert(doc), init_customer_device(doc),
+            Analysis(doc, git_hash=False)]
+
+builder = {"se3": build_se3,
+           "frs5": build_frs5}
+
+def eager_init(self, doc):
+    self.doc = copy.deepcopy(doc)
+    self.doc_owned = True
+    self.invalidate_index()
+
+def measure(docs, build):
+    tracemalloc.start()
+    t_0 = time.perf_counter()
+    keep = [build(doc) for doc in docs]
+    t_1 = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak, t_1 - t_0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, nargs="+", default=["vpy/standard/se3/cal-sim-se3.json"])
+    parser.add_argument("--standard", type=str, default="se3")
+    parser.add_argument("--batch", type=int, default=10,
+                        help="number of documents per file")
+    args = parser.parse_args()
+
+    docs = []
+    for file_name in args.file:
+        with open(file_name) as f:
+            doc = json.load(f)
+        docs = docs + [copy.deepcopy(doc) for _ in range(args.batch)]
+
+    build = builder[args.standard]
+
+    lazy_init = Document.__init__
+    Document.__init__ = eager_init
+    m_before, t_before = measure(docs, build)
+    Document.__init__ = lazy_init
+    m_after, t_after = measure(docs, build)
+
+    print(json.dumps({"standard": args.standard,
+                      "docs": len(docs),
+                      "before_peak_MB": m_before/1e6,
+                      "after_peak_MB": m_after/1e6,
+                      "before_s": t_before,
+                      "after_s": t_after}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Regression test and micro-benchmark of ``Device.get_error_interpol()``
+for the SE3 group normal (``FillDevs``).
+
+python script/bench/error_interpol.py
+python script/bench/error_interpol.py --points 10000 --docs 50
+
+Each of ``--docs`` documents builds its devices anew (as in a batch);
+with ``--share`` the kernels are shared between the documents.
+
+The *before* numbers are measured with the former implementation (a
+new ``scipy.interpolate.interp1d`` per call) which is kept here as
+``legacy_error_interpol()``. The results have to be equal bit by bit.
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import numpy as np
+from scipy.interpolate import interp1d
+
+from vpy.device.device import Device
+from vpy.standard.se3.std import Se3
+
+def legacy_error_interpol(dev, p_interpol, unit_interpol, p_target=None, unit_target=None):
+    N = len(p_interpol)
+    e = np.full(N, np.nan)
+
+    if unit_target is None and p_target is None:
+        unit_target = unit_interpol
+        p_target = p_interpol
+
+    conv_interpol = 1.0 if unit_interpol == dev.unit else dev.Const.get_conv(unit_interpol, dev.unit)
+    conv_target = 1.0 if unit_target == dev.unit else dev.Const.get_conv(unit_target, dev.unit)
+
+    f_e = interp1d(dev.interpol_p, dev.interpol_e, kind="linear")
+
+    idx = (p_target*conv_target > dev.interpol_min) & (p_target*conv_target < dev.interpol_max)
+    odx = (p_interpol*conv_target > dev.interpol_min) & (p_interpol*conv_target < dev.interpol_max)
+    ndx = idx & odx
+
+    if len(ndx) > 0:
+        e[ndx] = f_e(p_interpol[ndx]*conv_interpol)
+
+    return e
+
+def timed(f, repeat):
+    t = []
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        ret = f()
+        t.append(time.perf_counter() - t_0)
+    return min(t), ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, default="vpy/standard/se3/cal-sim-se3.json")
+    parser.add_argument("--points", type=int, default=100)
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--share", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        doc = json.load(f)
+
+    rng = np.random.default_rng(args.seed)
+    p = 10**rng.uniform(-2, 5.2, args.points)
+    target = p * rng.normal(1, 0.01, args.points)
+    ## nodes of the interpolation
+    p[:3] = [1.0, 10.0, 100.0]
+
+    Device.share_interpol_kernels(False)
+    Device.share_interpol_kernels(args.share)
+    batch = [Se3(doc).FillDevs for _ in range(args.docs)]
+
+    def before():
+        return [legacy_error_interpol(dev, p, "Pa", target, "Pa") for devs in batch for dev in devs]
+
+    def after():
+        for devs in batch:
+            for dev in devs:
+                dev.error_kernel = None
+        return [dev.get_error_interpol(p, "Pa", target, "Pa") for devs in batch for dev in devs]
+
+    t_before, r_before = timed(before, args.repeat)
+    t_after, r_after = timed(after, args.repeat)
+    for a, b in zip(r_before, r_after):
+        if not np.array_equal(a.view(np.int64), b.view(np.int64)):
+            sys.exit("results differ")
+
+    ## the kernel alone: interp1d (built per call) vs. Interpol (built once)
+    dev = batch[0][0]
+    v = p[(p > dev.interpol_min) & (p < dev.interpol_max)]
+    t_interp1d, _ = timed(lambda: [interp1d(dev.interpol_p, dev.interpol_e, kind="linear")(v) for _ in range(100)], args.repeat)
+    t_kernel, _ = timed(lambda: [dev.get_error_kernel()(v) for _ in range(100)], args.repeat)
+
+    print(json.dumps({"docs": args.docs,
+                      "devices": len(batch[0]),
+                      "points": args.points,
+                      "share": args.share,
+                      "kernels": len(Device.interpol_kernels) if Device.interpol_kernels is not None else None,
+                      "before_s": t_before,
+                      "after_s": t_after,
+                      "speedup": t_before/t_after,
+                      "kernel_speedup": t_interp1d/t_kernel}))
+
+if __name__ == "__main__":
+    main()
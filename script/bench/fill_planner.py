@@ -0,0 +1,97 @@
+"""
+Regression test and benchmark of the filling pressure planner
+(``vpy.standard.se3.fill``) for target sweeps.
+
+python script/bench/fill_planner.py
+python script/bench/fill_planner.py --points 80
+
+The *before* numbers are measured with the former target by target
+evaluation of ``script/se3/cal_filling_pressure.py`` (as used by
+``sim_gen_data.get_fill_and_expansion()`` and
+``se3_filling_pressure_overview.py``) which is kept here. The results
+of ``FillPlanner.plan()`` have to be equal bit by bit; the *grid*
+numbers are those of ``FillGrid.plan()`` for single targets (the grid
+is computed before) with the share of targets with the same expansion
+and the largest relative deviation of the uncertainty (``0`` where the
+expansion is the same, the uncertainty is computed exactly).
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy.standard.se3.cal import Cal
+from vpy.standard.se3.fill import FillPlanner, FillGrid
+
+def legacy_plan(cal, target_pressures, target_unit, min_p, with_f_uncert):
+    f_list = ["f_s", "f_m", "f_l"]
+    res = []
+    for target_pressure in target_pressures:
+        p_fill = np.array([target_pressure / cal.get_value(f, "1")[0] for f in f_list])
+        u_f = np.array([cal.get_value("u_{}".format(f), "1")[0] for f in f_list])
+        u = [Dev.get_total_uncert(p_fill, target_unit, target_unit) for Dev in cal.FillDevs]
+        u_rel = cal.Pres.invers_array_square_sum(u)/p_fill * 2
+        if with_f_uncert:
+            u_rel = np.sqrt(np.power(u_rel, 2) + np.power(u_f, 2))
+        u_rel[p_fill <= min_p] = np.inf
+        u_rel[p_fill > 133322.0] = np.inf
+        if all(np.isinf(u_rel)) or all(np.isnan(u_rel)):
+            res.append({"error": "all expasion sequences deliver nan"})
+            continue
+        i = np.nanargmin(u_rel)
+        res.append({"Pressure_fill":{"Value": p_fill[i], "Type": "target_fill", "Unit": target_unit},
+                    "Uncertainty_cal":{"Value": u_rel[i], "Type":  "cal_estimated", "Unit":  "1"},
+                    "Expansion":{"Type" : "name", "Value": f_list[i]}})
+    return res
+
+def timed(f, repeat):
+    t = []
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        ret = f()
+        t.append(time.perf_counter() - t_0)
+    return min(t), ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, default="vpy/standard/se3/base_doc.json")
+    parser.add_argument("--points", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        cal = Cal(json.load(f))
+    target = np.logspace(-2, 3, args.points)
+
+    out = {"points": args.points}
+    for name, min_p, with_f_uncert in [("relay", 80.0, False), ("sim", 94.0, True)]:
+        planner = FillPlanner(cal, min_p=min_p, with_f_uncert=with_f_uncert)
+        t_before, before = timed(lambda: legacy_plan(cal, target, "Pa", min_p, with_f_uncert), args.repeat)
+        t_after, plan = timed(lambda: planner.plan(target, "Pa"), args.repeat)
+        after = [planner.result_dict(plan, k) for k in range(len(target))]
+        if json.dumps(before) != json.dumps(after):
+            sys.exit("{} results differ".format(name))
+        out.update({name + "_before_s": t_before,
+                    name + "_after_s": t_after,
+                    name + "_speedup": t_before/t_after})
+
+    planner = FillPlanner(cal)
+    grid = FillGrid.shared(planner)
+    t_single, plan = timed(lambda: [planner.plan([t], "Pa") for t in target], args.repeat)
+    t_grid, grid_plan = timed(lambda: [grid.plan([t], "Pa") for t in target], args.repeat)
+    same = [p["Expansion"] == g["Expansion"] for p, g in zip(plan, grid_plan)]
+    dev = [abs(g["Uncertainty_cal"][0]/p["Uncertainty_cal"][0] - 1) for p, g in zip(plan, grid_plan)
+           if p["Expansion"][0] is not None]
+    out.update({"single_s": t_single,
+                "grid_s": t_grid,
+                "grid_speedup": t_single/t_grid,
+                "grid_same_expansion": float(np.mean(same)),
+                "grid_max_rel_dev": float(np.max(dev))})
+
+    print(json.dumps(out))
+
+if __name__ == "__main__":
+    main()
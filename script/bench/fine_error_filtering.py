@@ -0,0 +1,138 @@
+"""
+Regression test and benchmark of ``Analysis.fine_error_filtering()``.
+
+python script/bench/fine_error_filtering.py
+python script/bench/fine_error_filtering.py --file cal-doc-1.json cal-doc-2.json
+python script/bench/fine_error_filtering.py --sim 20000 --seed 1
+
+The documents need ``Calibration.Analysis.Values.Error`` (Type ``ind``).
+The recorded ``AuxValues.AverageIndex`` of the analysis is used if
+available; otherwise the average index is generated from the
+calibration pressure by means of ``ToDo.make_average_index()`` (or
+around the rounded calibration pressures if the ToDo has no target
+pressures).
+With ``--sim`` a simulated error calibration with the given number of
+points is appended.
+
+The *before* numbers are measured with the former implementation
+which is kept here as ``legacy_fine_error_filtering()``.
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy.analysis import Analysis
+from vpy.todo import ToDo
+from vpy.grouping import index_by_rel_dev
+
+def legacy_fine_error_filtering(ana, average_index):
+    error_dict = ana.pick_dict(quant='Error', dict_type='ind')
+    error = error_dict.get('Value')
+    k = 0
+    while True:
+        r = []
+        ref_mean = [None] * len(average_index)
+        ref_std = [None] * len(average_index)
+        s = [None] * len(average_index)
+        for i in range(len(average_index)):
+            s[i] = 1
+            if i > 1:
+                s[i] = i
+            if i > len(average_index) - 3:
+                s[i] = len(average_index) - 2
+            l = average_index[s[i] - 1: s[i] + 2]
+            ref_idx = [item for sublist in l for item in sublist]
+            rr = []
+            for j in range(len(average_index[i])):
+                ref_idx0 = [a for a in ref_idx if a != average_index[i][j]]
+                ref = np.take(error, ref_idx0).tolist()
+                ref_mean[i] = np.mean(ref)
+                ref_std[i] = np.std(ref)
+                if abs(ref_mean[i] - error[average_index[i][j]]) < max(0.001, 10 * ref_std[i]):
+                    rr.append(average_index[i][j])
+            r.append(rr)
+
+        k = k + 1
+        if average_index == r:
+            break
+        average_index = r
+
+    return average_index, ref_mean, ref_std, k
+
+def from_doc(doc):
+    analysis = doc['Calibration']['Analysis']
+    ana = Analysis(doc, init_dict=analysis, git_hash=False)
+    average_index = analysis.get('AuxValues', {}).get('AverageIndex')
+    if average_index is None:
+        todo = ToDo(doc)
+        if "Pres" in dir(todo):
+            p_cal = ana.pick("Pressure", "cal", "Pa") * ana.Const.get_conv("Pa", todo.pressure_unit)
+            average_index = todo.make_average_index(p_cal, todo.pressure_unit)
+        else:
+            ## no target pressures: group around the rounded calibration pressures
+            p_cal = ana.pick("Pressure", "cal", "Pa")
+            target = np.unique([float("{:.0e}".format(p)) for p in p_cal if np.isfinite(p)])
+            average_index = index_by_rel_dev(p_cal, target, ToDo.max_dev)
+
+    return ana, average_index
+
+def from_sim(points, seed):
+    rng = np.random.default_rng(seed)
+    targets = max(points // 20, 3)
+    error = rng.normal(0.01, 0.002, points)
+    error[rng.integers(0, points, points // 50)] = 0.3
+    ana = Analysis({}, git_hash=False)
+    ana.store("Error", "ind", error, "1")
+    average_index = np.array_split(np.arange(points), targets)
+
+    return ana, [l.tolist() for l in average_index]
+
+def same(a, b):
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if a is None or b is None:
+        return a is b
+    return a == b or (np.isnan(a) and np.isnan(b))
+
+def timed(f):
+    t_0 = time.perf_counter()
+    ret = f()
+    return time.perf_counter() - t_0, ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, nargs="*", default=["vpy/standard/se3/cal-sim-se3.json"])
+    parser.add_argument("--sim", type=int, default=5000,
+                        help="number of simulated points (0: none)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cases = []
+    for file_name in args.file:
+        with open(file_name) as f:
+            cases.append((file_name, from_doc(json.load(f))))
+    if args.sim > 0:
+        cases.append(("sim-{}".format(args.sim), from_sim(args.sim, args.seed)))
+
+    out = []
+    for name, (ana, average_index) in cases:
+        t_before, r_before = timed(lambda: legacy_fine_error_filtering(ana, average_index))
+        t_after, r_after = timed(lambda: ana.fine_error_filtering(average_index))
+        if not same(list(r_before), list(r_after)):
+            sys.exit("results of {} differ".format(name))
+
+        out.append({"case": name,
+                    "points": len(ana.flatten(average_index)),
+                    "iterations": r_after[3],
+                    "before_s": t_before,
+                    "after_s": t_after,
+                    "speedup": t_before/t_after})
+
+    print(json.dumps(out))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Regression test and benchmark of ``vpy.standard.frs5.uncert.Uncert.total_standard()``.
+
+python script/bench/frs5_uncert.py
+python script/bench/frs5_uncert.py --docs 50 --points 30
+
+The documents are simulated from ``vpy/standard/frs5/base_doc.json``.
+The *before* numbers are measured with the former implementation (one
+``sym.diff()`` and ``sym.lambdify()`` per uncertainty contribution and
+document) which is kept here as ``legacy_total_standard()``. The
+results have to be equal bit by bit. *cold* is the first document of
+a process (functions compiled), the later documents use the functions
+kept per process.
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import numpy as np
+import sympy as sym
+
+from vpy import model
+from vpy.analysis import Analysis
+from vpy.standard.frs5.cal import Cal
+from vpy.standard.frs5.uncert import Uncert
+
+def frs5_doc(N, rng, base):
+    r = 10**rng.uniform(-2, 1, N)
+    meas = {"Values": {
+                "Pressure": [{"Type": "frs_p", "Unit": "lb", "Value": list(r)},
+                             {"Type": "frs_zc_p", "Unit": "lb", "Value": list(rng.normal(0, 1e-5, N))},
+                             {"Type": "frs_res_ind", "Unit": "DCR", "Value": list(rng.uniform(1e-6, 1e-5, N))}],
+                "Temperature": [{"Type": "frs5", "Unit": "C", "Value": list(rng.normal(22.5, 0.1, N))}],
+                "Time": [{"Type": "amt_meas", "Unit": "ms", "Value": list(1.5e12 + 6e4*np.arange(N))}]},
+            "AuxValues": {
+                "Time": [{"Type": "offset_mt", "Unit": "ms", "Value": [1.5e12 - 1e4]}],
+                "Pressure": [{"Type": "frs_zc0_p", "Unit": "lb", "Value": [1e-5]},
+                             {"Type": "frs_res_off", "Unit": "DCR", "Value": [1e-7]}]}}
+
+    return {"Calibration": {"ToDo": {"Type": "error", "Gas": "N2"},
+                            "Standard": base["Standard"],
+                            "Constants": base["Constants"],
+                            "CalibrationObject": base["CalibrationObject"],
+                            "Measurement": meas}}
+
+def legacy_total_standard(uncert, res):
+    uncert.define_model()
+    uncert.gen_val_array(res)
+    conv = uncert.Cons.get_conv("Pa", uncert.unit)
+    p = res.pick("Pressure", "cal", uncert.unit)
+
+    def store(u_type, wrt, u_exprs):
+        s_expr = sym.diff(uncert.model, sym.Symbol(wrt))
+        expr = s_expr
+        for u_expr in u_exprs:
+            expr = expr * u_expr
+        f = sym.lambdify(uncert.symb, expr, "numpy")
+        res.store("Uncertainty", u_type, np.absolute(f(*uncert.val_arr)*conv/p), "1")
+
+    store("u_r", "r", [uncert.get_expression("u_r", "lb")])
+    store("u_r_zc", "r_zc", [uncert.get_expression("u_r_zc", "lb")])
+    store("u_r_zc0", "r_zc0", [uncert.get_expression("u_r_zc0", "lb")])
+    store("u_ub", "ub", [uncert.get_expression("u_ub", "lb")])
+    store("u_m_cal", "m_cal", [uncert.get_expression("u_m_cal", "kg")])
+    store("u_g", "g", [uncert.get_expression("u_g", "1"), uncert.Cons.get_expression("g", "m/s^2")])
+    store("u_A", "A", [uncert.get_expression("u_A", "m^2")])
+    store("u_T", "T", [uncert.get_expression("u_t", "C")])
+
+    T = res.pick("Temperature", "frs5", "C") + uncert.Cons.get_conv("C", "K")
+    M = np.full(uncert.no_of_meas_points, uncert.Cons.get_mol_weight(uncert.get_gas(), "kg/mol"))
+    R = np.full(uncert.no_of_meas_points, uncert.Cons.get_value("R", "Pa m^3/mol/K")*conv)
+    f_u = sym.lambdify((sym.Symbol('M'), sym.Symbol('R'), sym.Symbol('T'), sym.Symbol('p')),
+                       uncert.get_expression("u_rho_gas", "kg/m^3"), "numpy")
+    f_s = sym.lambdify(uncert.symb, sym.diff(uncert.model, sym.Symbol('rho_gas')), "numpy")
+    res.store("Uncertainty", "u_rho_gas", np.absolute(f_s(*uncert.val_arr)*f_u(M, R, T, p)*conv/p), "1")
+    res.store("Uncertainty", "u_rho_frs", np.absolute(np.full(uncert.no_of_meas_points, 0.0)/p), "1")
+
+    store("u_r_cal", "r_cal", [uncert.get_expression("u_r_cal", "lb")])
+    store("u_r_cal0", "r_cal0", [uncert.get_expression("u_r_cal0", "lb")])
+    store("u_ab", "r", [uncert.get_expression("u_ab", "1/K")])
+
+def run(docs, total_standard):
+    """Returns the time of ``total_standard()`` and the uncertainties.
+    """
+    t, results = 0.0, []
+    for doc in docs:
+        cal = Cal(doc)
+        res = Analysis(doc, git_hash=False)
+        cal.temperature(res)
+        cal.pressure_res(res)
+        cal.pressure_cal(res)
+        t_0 = time.perf_counter()
+        total_standard(Uncert(doc), res)
+        t = t + time.perf_counter() - t_0
+        results.append([np.asarray(v["Value"]) for v in res.doc["Values"]["Uncertainty"] if v["Type"] != "standard"])
+    return t, results
+
+def new_total_standard(uncert, res):
+    uncert.total_standard(res)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, default="vpy/standard/frs5/base_doc.json")
+    parser.add_argument("--docs", type=int, default=20)
+    parser.add_argument("--points", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        base = json.load(f)
+    rng = np.random.default_rng(args.seed)
+    docs = [frs5_doc(args.points, rng, base) for _ in range(args.docs)]
+
+    t_before, r_before = run(docs, legacy_total_standard)
+
+    model.compiled.clear()
+    t_cold, _ = run(docs[:1], new_total_standard)
+    t_after, r_after = run(docs, new_total_standard)
+
+    for a, b in zip(r_before, r_after):
+        if len(a) != len(b) or not all(np.array_equal(x.view(np.int64), y.view(np.int64)) for x, y in zip(a, b)):
+            sys.exit("results differ")
+
+    print(json.dumps({"docs": args.docs,
+                      "points": args.points,
+                      "before_s": t_before,
+                      "after_s": t_after,
+                      "speedup": t_before/t_after,
+                      "first_doc_cold_s": t_cold}))
+
+if __name__ == "__main__":
+    main()
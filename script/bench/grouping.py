@@ -0,0 +1,96 @@
+"""
+Grouping of measurement points: average index (``ToDo``), sigma
+index (``Srg``) and range index (``Analysis``).
+
+python script/bench/grouping.py
+python script/bench/grouping.py --points 50000 --targets 100 --seed 1
+
+The *before* numbers are measured with the former nested loops which
+are kept here as ``legacy_*()``. The results of both implementations
+are checked for equality on the same (simulated) data.
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy.grouping import index_by_rel_dev, index_between, gather_by_first
+
+def legacy_average_index(cal, target, max_dev):
+    r = []
+    for i in range(0, len(target)):
+        rr = []
+        for j in range(0, len(cal)):
+            if abs(cal[j] / target[i] - 1) < max_dev:
+                rr.append(j)
+        r.append(rr)
+    return r
+
+def legacy_sigma_index(p_cal, min_p, max_p):
+    N = len(p_cal)
+    return [[i] for i in range(N) if p_cal[i] > min_p and p_cal[i] < max_p]
+
+def legacy_range_index(idx, faktor):
+    r1 = {}
+    for i in idx:
+        for j in r1:
+            if np.isclose(faktor[i], faktor[j], rtol=1.e-3) and np.isfinite(faktor[j]):
+                r1[j].append(i)
+                break
+        else: r1[i] = [i]
+    return list(r1.values())
+
+def sim_data(points, targets, seed):
+    rng = np.random.default_rng(seed)
+    target = np.logspace(-3, 3, targets)
+    cal = np.repeat(target, points // targets + 1)[:points] * rng.normal(1, 0.02, points)
+    cal[rng.integers(0, points, points // 100)] = np.nan
+    faktor = rng.choice([1., 0.1, 0.01, np.nan], points, p=[.4, .3, .29, .01])
+
+    return cal, target, faktor
+
+def timed(f, repeat):
+    t = []
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        ret = f()
+        t.append(time.perf_counter() - t_0)
+    return min(t), ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--targets", type=int, default=50)
+    parser.add_argument("--max_dev", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cal, target, faktor = sim_data(args.points, args.targets, args.seed)
+    cal_list = cal.tolist()
+    idx = [i for l in index_by_rel_dev(cal, target, args.max_dev) for i in l]
+
+    cases = {"average_index": (lambda: legacy_average_index(cal_list, target, args.max_dev),
+                               lambda: index_by_rel_dev(cal, target, args.max_dev)),
+             "sigma_index": (lambda: legacy_sigma_index(cal, 0.09, 1.5),
+                             lambda: [[i] for i in index_between(cal, 0.09, 1.5)[0].tolist()]),
+             "range_index": (lambda: legacy_range_index(idx, faktor),
+                             lambda: gather_by_first(idx, faktor, lambda f, f_j: np.isclose(f, f_j, rtol=1.e-3) & np.isfinite(f_j)))}
+
+    out = {"points": args.points, "targets": args.targets}
+    for name, (before, after) in cases.items():
+        t_before, r_before = timed(before, args.repeat)
+        t_after, r_after = timed(after, args.repeat)
+        if r_before != r_after:
+            sys.exit("{} differs".format(name))
+        out[name] = {"before_s": t_before,
+                     "after_s": t_after,
+                     "speedup": t_before/t_after}
+
+    print(json.dumps(out))
+
+if __name__ == "__main__":
+    main()
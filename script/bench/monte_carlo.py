@@ -0,0 +1,114 @@
+"""
+Benchmark of the Monte Carlo mode (GUM Supplement 1) of the FRS5 and
+SE3 uncertainties: ``Uncert.total_mc()``.
+
+python script/bench/monte_carlo.py
+python script/bench/monte_carlo.py --samples 100000 --points 30 --workers 4
+
+The FRS5 document is simulated from ``vpy/standard/frs5/base_doc.json``
+(see ``frs5_uncert.py``), the SE3 document is ``--se3``. The *before*
+number is the time of the scalar evaluation (one call of the model
+per sample and point, as the existing code paths would do) measured
+for ``--scalar`` samples of one point and extrapolated. The standard
+uncertainties have to agree with the linear propagation
+(``total_standard()``, ``total()``) within ``--rtol``.
+"""
+import sys
+sys.path.append(".")
+sys.path.append("script/bench")
+
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy import gum
+from vpy.analysis import Analysis
+from vpy.standard.frs5.cal import Cal as Frs5Cal
+from vpy.standard.frs5.uncert import Uncert as Frs5Uncert
+from vpy.standard.se3.cal import Cal as Se3Cal
+from vpy.standard.se3.uncert import Uncert as Se3Uncert
+from frs5_uncert import frs5_doc
+
+def scalar_time(uncert, res, n):
+    """Returns the time of ``n`` scalar evaluations of the FRS5 model.
+    """
+    uncert.define_model()
+    uncert.gen_val_array(res)
+    prop = gum.Propagation([str(s) for s in uncert.symb], uncert.model)
+    f = gum.MonteCarlo(prop).function()
+    x = [float(np.asarray(v).flat[0]) for v in uncert.val_arr]
+    rng = np.random.default_rng(0)
+    t_0 = time.perf_counter()
+    for _ in range(n):
+        f(*[x_i*(1.0 + 1e-6*rng.standard_normal()) for x_i in x])
+
+    return time.perf_counter() - t_0
+
+def frs5(args, base):
+    doc = frs5_doc(args.points, np.random.default_rng(args.seed), base)
+    cal = Frs5Cal(doc)
+    res = Analysis(doc, git_hash=False)
+    cal.temperature(res)
+    cal.pressure_res(res)
+    cal.pressure_cal(res)
+    Frs5Uncert(doc).total_standard(res)
+
+    t_0 = time.perf_counter()
+    Frs5Uncert(doc).total_mc(res, samples=args.samples, seed=args.seed, workers=args.workers)
+    t = time.perf_counter() - t_0
+    t_scalar = scalar_time(Frs5Uncert(doc), res, args.scalar) * args.samples/args.scalar * args.points
+
+    return t, t_scalar, res.pick("Uncertainty", "standard_mc", "1")/res.pick("Uncertainty", "standard", "1")
+
+def se3(args, doc):
+    cal = Se3Cal(doc)
+    auxvalues = doc.get('Calibration').get('Analysis', {}).get('AuxValues', {})
+    ana = Analysis(doc, insert_dict={'AuxValues': auxvalues}, analysis_type="expansion", git_hash=False)
+    cal.all(ana)
+    uncert = Se3Uncert(doc)
+    uncert.total(ana)
+
+    t_0 = time.perf_counter()
+    out = uncert.total_mc(ana, samples=args.samples, seed=args.seed, workers=args.workers)
+    t = time.perf_counter() - t_0
+
+    return t, len(out["y"]), ana.pick("Uncertainty", "standard_mc", "1")/ana.pick("Uncertainty", "standard", "1")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frs5", type=str, default="vpy/standard/frs5/base_doc.json")
+    parser.add_argument("--se3", type=str, default="vpy/standard/se3/cal-sim-se3.json")
+    parser.add_argument("--samples", type=int, default=10**6)
+    parser.add_argument("--points", type=int, default=100)
+    parser.add_argument("--scalar", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--rtol", type=float, default=1e-2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.frs5) as f:
+        base = json.load(f)
+    with open(args.se3) as f:
+        se3_doc = json.load(f)
+
+    t_frs5, t_scalar, r_frs5 = frs5(args, base)
+    t_se3, se3_points, r_se3 = se3(args, se3_doc)
+
+    for r in (r_frs5, r_se3):
+        if not np.all(np.abs(r - 1.0) < args.rtol):
+            sys.exit("Monte Carlo and linear propagation differ")
+
+    print(json.dumps({"samples": args.samples,
+                      "workers": args.workers,
+                      "frs5_points": args.points,
+                      "frs5_before_s": t_scalar,
+                      "frs5_after_s": t_frs5,
+                      "frs5_speedup": t_scalar/t_frs5,
+                      "frs5_ratio_linear": [float(r_frs5.min()), float(r_frs5.max())],
+                      "se3_points": se3_points,
+                      "se3_after_s": t_se3,
+                      "se3_ratio_linear": [float(r_se3.min()), float(r_se3.max())]}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Regression test and benchmark of the piecewise tables (``vpy.piecewise``)
+of ``Se3 Uncert.cmc()`` and ``Cdg.repeat_uncert()``.
+
+python script/bench/piecewise_tables.py
+python script/bench/piecewise_tables.py --points 10000
+
+The *before* numbers are measured with the former implementations (one
+``np.piecewise()`` per pressure point) which are kept here. The results
+have to be equal bit by bit.
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy import piecewise
+from vpy.device.cdg import Cdg
+import vpy.standard.se3.uncert
+
+def legacy_se3_cmc(p_list):
+    return np.asarray([np.piecewise(p, [p <= 0.027, (p > 0.027 and p <= 0.3), (p > 0.3 and p <= 0.73), (p > 0.73 and p <= 9.), (p > 9. and p <= 30.), (p > 30. and p <= 133.),            (p > 133. and p <= 1000.), (p > 1000. and p <= 8000.), 8000. < p],
+                                    [0.0014,     0.001,                   0.00092,                0.00086,              0.00075,              ((0.0245/p)**2 + 2.24e-5**2)**0.5, 0.00075,                  0.00019,                  0.00014] ).tolist() for p in p_list])
+
+def legacy_cdg_repeat(p_list):
+    return np.asarray([np.piecewise(p, [p <= 9.5, (p > 9.5 and p <= 35.), (p > 35. and p <= 95.), p > 95.],
+                                       [0.0008,   0.0003,                0.0002,                   0.0001]).tolist() for p in p_list])
+
+def timed(f, repeat):
+    t = []
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        ret = f()
+        t.append(time.perf_counter() - t_0)
+    return min(t), ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    p = 10**rng.uniform(-3, 5, args.points)
+    ## the breaks themselves and a missing point
+    p[:21] = [0.027, 0.3, 0.73, 9., 30., 133., 1000., 8000., 9.5, 35., 95., 950., 0.0, 1e-9, 31., 132.9, 1e5, 8000.1, 29.9, 133.1, np.nan]
+
+    cases = [("se3_cmc", lambda: legacy_se3_cmc(p), lambda: piecewise.find("cmc", "SE3")(p)),
+             ("cdg_repeat", lambda: legacy_cdg_repeat(p), lambda: piecewise.find("repeat", Cdg)(p))]
+
+    out = {"points": args.points}
+    for name, before, after in cases:
+        t_before, r_before = timed(before, args.repeat)
+        t_after, r_after = timed(after, args.repeat)
+        if not np.array_equal(r_before.view(np.int64), r_after.view(np.int64)):
+            sys.exit("{} results differ".format(name))
+        out.update({name + "_before_s": t_before,
+                    name + "_after_s": t_after,
+                    name + "_speedup": t_before/t_after})
+
+    print(json.dumps(out))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark of the analysis service (``vpy.service``) against one python
+process per call.
+
+python script/bench/service.py
+python script/bench/service.py --count 50
+
+``script/se3/cal_filling_pressure.py`` is run ``--count`` times against
+an offline store holding the SE3 base document
+(``vpy/standard/se3/base_doc.json``). The *before* number is measured
+with one subprocess per call (the former way of the callers), the
+*after* number with the requests of a warm ``Service``. The results
+have to be equal.
+"""
+import sys
+sys.path.append(".")
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+from vpy.store import Store
+from vpy.service import Service
+
+def make_store(path, base_doc_file):
+    with open(base_doc_file) as f:
+        base_doc = json.load(f)
+    rows = [{"id": "std", "key": "Standard", "value": {"Standard": base_doc["Standard"]}},
+            {"id": "const", "key": "Constants", "value": {"Constants": base_doc["Constants"]}}]
+    for i, cob in enumerate(base_doc["CalibrationObject"]):
+        rows.append({"id": "cob-{}".format(i), "key": "CalibrationObject", "value": {"CalibrationObject": cob}})
+    store = Store(path)
+    store.db("vl_db").put_view("se3_req/doc", rows)
+    store.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--file", type=str, default="vpy/standard/se3/base_doc.json")
+    args = parser.parse_args()
+
+    script = "script/se3/cal_filling_pressure.py"
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "store.sqlite")
+        make_store(store, args.file)
+        targets = [str(10**(k % 5 - 1)) for k in range(args.count)]
+
+        before = []
+        t_0 = time.perf_counter()
+        for target in targets:
+            out = subprocess.check_output([sys.executable, script, "--store", store,
+                                           "--target_pressure", target, "--pressure_unit", "Pa"])
+            before.append(json.loads(out.decode("utf-8").splitlines()[-1]))
+        t_before = time.perf_counter() - t_0
+
+        service = Service(workers=args.workers)
+        ## start the workers (not part of a request)
+        service.handle({"script": script, "args": ["--store", store, "--target_pressure", "1", "--pressure_unit", "Pa"]})
+        after = []
+        run_s = []
+        t_0 = time.perf_counter()
+        for target in targets:
+            ret = service.handle({"script": script, "args": ["--store", store, "--target_pressure", target, "--pressure_unit", "Pa"]})
+            if not ret["ok"]:
+                sys.exit(ret["error"])
+            after.append(ret["result"])
+            run_s.append(ret["run_s"])
+        t_after = time.perf_counter() - t_0
+        service.close()
+
+    if before != after:
+        sys.exit("results differ")
+
+    print(json.dumps({"count": args.count,
+                      "before_s": t_before,
+                      "after_s": t_after,
+                      "after_run_s": sum(run_s),
+                      "speedup": t_before/t_after}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""
+Benchmark suite of the end-to-end analysis pipelines.
+
+python script/bench/suite.py                                # all benchmarks, sizes 10 100 1000
+python script/bench/suite.py --bench se3_expansion frs5_total_standard --sizes 100 10000
+python script/bench/suite.py --compare 5b77f44              # ratios to the results of a former commit
+python script/bench/suite.py --compare 5b77f44 --fail       # exit with an error on regressions
+python script/bench/suite.py --ce3_base_doc ce3_base_doc.json
+
+The documents are generated by ``vpy.sim`` with ``size`` measurement
+points (fixed seed). Benchmarks (see ``benchmarks``):
+
+* ``se3_expansion``: call sequence of ``script/se3/cal_analysis_expansion.py``
+* ``se3_direct``: call sequence of ``script/se3/cal_analysis_direct.py``
+* ``frs5_total_standard``: ``pressure_cal()`` and ``Uncert.total_standard()`` of FRS5
+* ``ce3_conductance_flow``: conductance and flow of ``script/ce3/cal_analysis.py``
+  (base document template of the package or ``--ce3_base_doc``)
+* ``se3_error_table``: uncertainty contributions of the customer device and
+  ``Result.make_error_table()`` of an analysed SE3 document
+  (``script/se3/cal_result_error.py`` without plots and questions)
+* ``io_store``, ``io_couch``: ``Io.get_doc_db()``, ``Io.set_doc_db()`` and
+  ``Io.get_base_doc()`` against an offline store (``vpy.store``) and a
+  local CouchDB stand-in (``vpy.pkg_io_test.CouchStandIn``)
+
+Every benchmark is run ``--repeat`` times after one warm up run; the
+inputs are prepared before each run and not timed. The times are
+stored in ``<results>/<git hash>.json`` (results of the same commit
+are updated) and printed as json. With ``--compare`` the median times
+are divided by those of the given commit; ratios above
+``1 + threshold`` are regressions.
+"""
+import sys
+sys.path.append(".")
+
+import os
+import copy
+import json
+import time
+import argparse
+import datetime
+import platform
+import tempfile
+import numpy as np
+
+from vpy.sim import Sim
+from vpy.pkg_io import Io
+from vpy.store import Store
+from vpy.build_info import git_hash
+from vpy.analysis import Analysis
+from vpy.result import Result
+from vpy.todo import ToDo
+from vpy.helper import init_customer_device, result_analysis_init
+
+docs = {}
+
+def sim_doc(standard, size, **kwargs):
+    """Returns a copy of the simulated document (built once per process).
+    """
+    key = (standard, size, json.dumps(kwargs, sort_keys=True))
+    if key not in docs:
+        docs[key] = Sim(standard, n=size, **kwargs).build()
+
+    return copy.deepcopy(docs[key])
+
+def se3_expansion(doc):
+    """Call sequence of ``script/se3/cal_analysis_expansion.py`` (cmc).
+    """
+    from vpy.standard.se3.cal import Cal
+    from vpy.standard.se3.uncert import Uncert
+
+    cal = Cal(doc)
+    auxvalues = doc.get('Calibration').get('Analysis', {}).get('AuxValues', {})
+    ana = Analysis(doc, insert_dict={'AuxValues': auxvalues}, analysis_type="expansion")
+    cus_dev = init_customer_device(doc)
+    uncert = Uncert(doc)
+
+    cal.pressure_gn_corr(ana)
+    cal.pressure_gn_mean(ana)
+    cal.deviation_target_fill(ana)
+    cal.temperature_before(ana)
+    cal.temperature_after(ana)
+    cal.temperature_room(ana)
+    cal.temperature_gas_expansion(ana)
+    cal.real_gas_correction(ana)
+    cal.volume_add(ana)
+    cal.volume_start(ana)
+    cal.expansion(ana)
+    cal.pressure_rise(ana)
+    cal.correction_delta_height(ana)
+    cal.correction_f_pressure(ana)
+    cal.pressure_cal(ana)
+    cal.error_pressure_rise(ana)
+    cal.deviation_target_cal(ana)
+    uncert.cmc(ana)
+
+    gas = cal.Aux.get_gas()
+    temperature_dict = ana.pick_dict('Temperature', 'after')
+    offset_dict = cal.Pres.get_dict('Type', 'ind_offset')
+    ind_dict = cal.Pres.get_dict('Type', 'ind')
+    range_dict = cal.Range.get_dict('Type', 'ind')
+    offset = cus_dev.pressure(offset_dict, temperature_dict, range_dict=range_dict, unit=cal.unit, gas=gas)
+    ind = cus_dev.pressure(ind_dict, temperature_dict, range_dict=range_dict, unit=cal.unit, gas=gas)
+    ana.store("Pressure", "offset", offset, cal.unit)
+    ana.store("Pressure", "ind", ind, cal.unit)
+    ana.store("Pressure", "ind_corr", ind - offset, cal.unit)
+
+    p_ind = ana.pick("Pressure", "ind_corr", cal.unit)
+    p_cal = ana.pick("Pressure", "cal", cal.unit)
+    ana.store('Error', 'ind', p_ind/p_cal-1, '1')
+    cus_dev.range_trans(ana)
+
+    return ana.build_doc()
+
+def se3_direct(doc):
+    """Call sequence of ``script/se3/cal_analysis_direct.py``.
+    """
+    from vpy.standard.se3.cal import Cal
+    from vpy.standard.se3.uncert import Uncert
+
+    cal = Cal(doc)
+    ana = Analysis(doc, analysis_type="direct")
+    cus_dev = init_customer_device(doc)
+
+    cus_dev.range_trans(ana)
+    cal.temperature_comp(ana)
+    cal.temperature_gas_direct(ana)
+    cal.pressure_gn_corr(ana)
+    cal.pressure_gn_mean(ana)
+
+    temperature_dict = ana.pick_dict('Temperature', 'compare')
+    gas = cal.Aux.get_gas()
+    ind_dict = cal.Pres.get_dict('Type', 'ind')
+    offset_dict = cal.Pres.get_dict('Type', 'ind_offset')
+    range_dict = cal.Range.get_dict('Type', 'ind')
+    ind = cus_dev.pressure(ind_dict, temperature_dict, range_dict=range_dict, unit=ana.pressure_unit, gas=gas)
+    offset = cus_dev.pressure(offset_dict, temperature_dict, range_dict=range_dict, unit=ana.pressure_unit, gas=gas)
+    ana.store("Pressure", "ind", ind, ana.pressure_unit)
+    ana.store("Pressure", "offset", offset, ana.pressure_unit)
+    ana.store("Pressure", "ind_corr", ind - offset, ana.pressure_unit)
+
+    p_ind = ana.pick("Pressure", "ind_corr", cal.unit)
+    p_cal = ana.pick("Pressure", "cal", cal.unit)
+    ana.store('Error', 'ind', p_ind/p_cal-1.0, '1')
+
+    uncert = Uncert(doc)
+    u = uncert.contrib_pressure_fill(p_cal, cal.unit)
+    ana.store("Uncertainty", "standard", u/p_cal, "1")
+
+    return ana.build_doc()
+
+def direct_doc(doc):
+    """Turns a simulated SE3 expansion into a direct calibration: the
+    group normal reads the filling pressures (``*-compare``,
+    ``*-compare_offset``, ``target_pressure``) as does the customer
+    device (``ind``); the room temperatures are those after the
+    expansion.
+    """
+    meas = doc["Calibration"]["Measurement"]
+    meas["Values"]["Pressure"] = [e for e in meas["Values"]["Pressure"] if e["Type"] != "target_pressure"]
+    rename = {"-fill": "-compare", "-offset": "-compare_offset", "target_fill": "target_pressure"}
+    sections = [meas["Values"]["Pressure"], meas["AuxValues"].get("Pressure", [])]
+    for entries in sections:
+        for e in entries:
+            for old, new in rename.items():
+                if e["Type"].endswith(old):
+                    e["Type"] = e["Type"][:-len(old)] + new
+    pres = {e["Type"]: e for e in meas["Values"]["Pressure"]}
+    pres["ind"].update(Value=list(pres["target_pressure"]["Value"]), Unit=pres["target_pressure"]["Unit"])
+    temp = meas["Values"]["Temperature"]
+    temp.extend([dict(e, Type=e["Type"].replace("_after", "_room")) for e in temp
+                 if e["Type"] in ("ch_2029_after", "ch_2030_after")])
+
+    return doc
+
+def frs5_total_standard(doc):
+    """Calibration pressure and uncertainty of ``script/frs5/frs5_cal_analysis.py``.
+    """
+    from vpy.standard.frs5.cal import Cal
+    from vpy.standard.frs5.uncert import Uncert
+
+    cal = Cal(doc)
+    ana = Analysis(doc)
+    cal.temperature(ana)
+    cal.pressure_res(ana)
+    cal.pressure_cal(ana)
+    Uncert(doc).total_standard(ana)
+
+    return ana.build_doc()
+
+def ce3_conductance_flow(doc):
+    """Conductance and flow steps of ``script/ce3/cal_analysis.py``.
+    """
+    from vpy.standard.ce3.cal import Cal
+
+    cal = Cal(doc)
+    ana = Analysis(doc)
+    cal.pressure_fill(ana)
+    cal.pressure_dp(ana)
+    cal.drift(ana)
+    cal.conductance(ana)
+    cal.conductance_name(ana)
+    cal.conductance_extrap(ana)
+    cal.temperature_pbox(ana)
+    cal.temperature_fm(ana)
+    cal.temperature_uhv(ana)
+    cal.temperature_xhv(ana)
+    cal.temperature_room(ana)
+    cal.flow(ana)
+    cal.mean_free_path(ana)
+    cal.pressure_cal(ana)
+
+    return ana.build_doc()
+
+def se3_error_table(doc):
+    """Steps of ``script/se3/cal_result_error.py`` up to
+    ``Result.make_error_table()`` without plots and questions (no
+    rejected points, no head temperature).
+    """
+    tdo = ToDo(doc)
+    cus_dev = init_customer_device(doc)
+    ana = result_analysis_init(doc)
+    res = Result(doc, result_type=ana.analysis_type)
+
+    p_cal = ana.pick('Pressure', 'cal', ana.pressure_unit)
+    conv = res.Const.get_conv(from_unit=ana.pressure_unit, to_unit=tdo.pressure_unit)
+    average_index = tdo.make_average_index(p_cal*conv, tdo.pressure_unit)
+    flat_average_index = ana.flatten(average_index)
+
+    cus_dev.offset_uncert(ana, reject_index=[])
+    cus_dev.repeat_uncert(ana)
+    cus_dev.device_uncert(ana)
+    ana.store_dict(quant='AuxValues', d={"AverageIndex": average_index,
+                                         "AverageIndexFlat": flat_average_index}, dest=None)
+    ana.total_uncert()
+
+    res.make_measurement_data_section(ana, result_type=ana.analysis_type)
+
+    return res.make_error_table(ana, pressure_unit=ana.pressure_unit, error_unit='1')
+
+def io_round_trip(io, doc_id):
+    """Gets, saves and gets again the document ``doc_id``; gets the SE3
+    base document (cached).
+    """
+    doc = io.get_doc_db(doc_id)
+    doc["Calibration"].setdefault("Analysis", {})["Date"] = [{"Type": "bench", "Value": time.time()}]
+    io.set_doc_db(doc)
+    io.get_base_doc("se3")
+
+    return io.get_doc_db(doc_id)
+
+def base_doc_rows():
+    with open("vpy/standard/se3/base_doc.json") as f:
+        base_doc = json.load(f)
+    rows = [{"id": "std", "key": "Standard", "value": {"Standard": base_doc["Standard"]}},
+            {"id": "const", "key": "Constants", "value": {"Constants": base_doc["Constants"]}}]
+    for i, cob in enumerate(base_doc["CalibrationObject"]):
+        rows.append({"id": "cob-{}".format(i), "key": "CalibrationObject", "value": {"CalibrationObject": cob}})
+
+    return rows
+
+class Bench(object):
+    """Benchmark: ``setup(size)`` returns the input of one run (not
+    timed), ``run(input)`` is timed, ``close()`` frees the resources of
+    the setups. ``skip`` holds the reason if it can not run.
+    """
+    skip = None
+
+    def __init__(self, args):
+        self.args = args
+
+    def setup(self, size):
+        raise NotImplementedError
+
+    def run(self, inp):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class SE3Expansion(Bench):
+    def setup(self, size):
+        return sim_doc("se3", size)
+
+    def run(self, doc):
+        return se3_expansion(doc)
+
+class SE3Direct(SE3Expansion):
+    """The simulated expansion documents turned into direct
+    calibrations (see ``direct_doc()``).
+    """
+    def setup(self, size):
+        return direct_doc(sim_doc("se3", size))
+
+    def run(self, doc):
+        return se3_direct(doc)
+
+class FRS5TotalStandard(Bench):
+    def setup(self, size):
+        return sim_doc("frs5", size)
+
+    def run(self, doc):
+        return frs5_total_standard(doc)
+
+class CE3ConductanceFlow(Bench):
+    def __init__(self, args):
+        super().__init__(args)
+        self.base_doc = None
+        if args.ce3_base_doc is not None:
+            with open(args.ce3_base_doc) as f:
+                self.base_doc = json.load(f)
+
+    def setup(self, size):
+        return sim_doc("ce3", size, base_doc=self.base_doc)
+
+    def run(self, doc):
+        return ce3_conductance_flow(doc)
+
+class SE3ErrorTable(Bench):
+    analysed = {}
+
+    def setup(self, size):
+        if size not in self.analysed:
+            self.analysed[size] = se3_expansion(sim_doc("se3", size))
+
+        return copy.deepcopy(self.analysed[size])
+
+    def run(self, doc):
+        return se3_error_table(doc)
+
+class IoStore(Bench):
+    """Round trips against an offline store holding the SE3 base
+    document and the calibration documents.
+    """
+    def __init__(self, args):
+        super().__init__(args)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "store.sqlite")
+        store = Store(self.path)
+        store.db("vl_db").put_view("se3_req/doc", base_doc_rows())
+        store.close()
+        self.io = self.make_io()
+        self.io.config["cache"]["path"] = self.tmp.name
+
+    def make_io(self):
+        io = Io()
+        io.config["db"]["store"] = self.path
+
+        return io
+
+    def setup(self, size):
+        doc_id = "cal-sim-se3-{}".format(size)
+        if self.io.get_rev(doc_id) is None:
+            doc = sim_doc("se3", size)
+            doc["_id"] = doc_id
+            self.io.get_db().save(doc)
+
+        return doc_id
+
+    def run(self, doc_id):
+        return io_round_trip(self.io, doc_id)
+
+    def close(self):
+        store = self.io.get_store()
+        if store is not None:
+            store.close()
+        self.tmp.cleanup()
+
+class IoCouch(IoStore):
+    """Round trips against the CouchDB stand-in of the tests (http on
+    localhost).
+    """
+    def __init__(self, args):
+        from vpy.pkg_io_test import CouchStandIn
+
+        self.srv = CouchStandIn({"vl_db": {}, "vl_db_work": {}}, {"se3_req/doc": base_doc_rows()}).start()
+        super().__init__(args)
+
+    def make_io(self):
+        return Io(db_url=self.srv.url)
+
+    def close(self):
+        self.srv.stop()
+        self.tmp.cleanup()
+
+benchmarks = {"se3_expansion": SE3Expansion,
+              "se3_direct": SE3Direct,
+              "frs5_total_standard": FRS5TotalStandard,
+              "ce3_conductance_flow": CE3ConductanceFlow,
+              "se3_error_table": SE3ErrorTable,
+              "io_store": IoStore,
+              "io_couch": IoCouch}
+
+def time_bench(bench, size, repeat):
+    """Returns min, median and all times (s) of ``repeat`` runs after
+    one warm up run.
+    """
+    bench.run(bench.setup(size))
+    times = []
+    for i in range(repeat):
+        inp = bench.setup(size)
+        t_0 = time.perf_counter()
+        bench.run(inp)
+        times.append(time.perf_counter() - t_0)
+
+    return {"min_s": min(times), "median_s": float(np.median(times)), "times_s": times}
+
+def compare(results, former, threshold):
+    """Returns the ratios of the median times to those of ``former``
+    by benchmark and size as well as the regressions.
+    """
+    ratios = {}
+    regressions = []
+    for name, sizes in results.items():
+        for size, res in sizes.items():
+            ref = former.get(name, {}).get(size)
+            if "median_s" not in res or ref is None or "median_s" not in ref:
+                continue
+            ratio = res["median_s"] / ref["median_s"]
+            ratios.setdefault(name, {})[size] = ratio
+            if ratio > 1.0 + threshold:
+                regressions.append("{} {}: {:.2f}".format(name, size, ratio))
+
+    return ratios, regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", nargs="+", choices=sorted(benchmarks), default=list(benchmarks))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--results", type=str, default="script/bench/results")
+    parser.add_argument("--commit", type=str, default=None, help="default: git hash of the package")
+    parser.add_argument("--compare", type=str, default=None, help="commit to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--fail", action="store_true", help="exit with an error on regressions")
+    parser.add_argument("--ce3_base_doc", type=str, default=None, help="default: template of vpy.sim")
+    args = parser.parse_args()
+
+    commit = args.commit or git_hash() or "unknown"
+    results = {}
+    for name in args.bench:
+        bench = benchmarks[name](args)
+        try:
+            for size in args.sizes:
+                if bench.skip:
+                    results.setdefault(name, {})[str(size)] = {"skip": bench.skip}
+                else:
+                    results.setdefault(name, {})[str(size)] = time_bench(bench, size, args.repeat)
+        finally:
+            bench.close()
+
+    os.makedirs(args.results, exist_ok=True)
+    file_name = os.path.join(args.results, "{}.json".format(commit))
+    stored = {"results": {}}
+    if os.path.isfile(file_name):
+        with open(file_name) as f:
+            stored = json.load(f)
+    for name, sizes in results.items():
+        stored["results"].setdefault(name, {}).update(sizes)
+    stored.update({"commit": commit,
+                   "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                   "machine": platform.node(),
+                   "python": platform.python_version(),
+                   "numpy": np.__version__,
+                   "repeat": args.repeat})
+    with open(file_name, "w") as f:
+        json.dump(stored, f, indent=1)
+
+    ret = {"commit": commit, "file": file_name, "results": results}
+    regressions = []
+    if args.compare:
+        former_file = os.path.join(args.results, "{}.json".format(args.compare))
+        if not os.path.isfile(former_file):
+            sys.exit("no results of {} in {}".format(args.compare, args.results))
+        with open(former_file) as f:
+            former = json.load(f)
+        ret["ratios"], regressions = compare(results, former["results"], args.threshold)
+        ret["regressions"] = regressions
+
+    print(json.dumps(ret))
+
+    if args.fail and regressions:
+        sys.exit("regressions: {}".format(", ".join(regressions)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Temperature steps of the SE3 analysis (``Cal.temperature_before()``,
+``temperature_after()``, ``temperature_room()`` and
+``temperature_state()``) on simulated documents (``vpy.sim``).
+
+python script/bench/temperature_matrix.py
+python script/bench/temperature_matrix.py --sizes 41 1000 --repeat 5
+
+Only the temperature steps are timed (not ``Cal()``, the ``Type``
+index and ``Analysis.build_doc()``). The *before* numbers are measured with the former implementation of
+``Cal.temperature()`` (``Document.get_array()`` of the readings and of
+the DMM corrections on every call) which is kept here as
+``legacy_temperature()``. The results have to be equal (bit by bit).
+"""
+import sys
+sys.path.append(".")
+
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy.sim import Sim
+from vpy.analysis import Analysis
+from vpy.standard.se3.cal import Cal
+
+def legacy_temperature(self, channels, sufix="_before", prefix="ch_", sufix_corr="", prefix_corr="corr_ch_"):
+    tem_arr = self.Temp.get_array(prefix, channels, sufix, "C")
+    cor_arr = self.TDev.get_array(prefix_corr, channels, sufix_corr, "K")
+
+    conv = self.Cons.get_conv("C", "K")
+    t_m = np.mean(tem_arr + cor_arr + conv, axis=0)
+    t_s = np.std(tem_arr + cor_arr + conv, axis=0)
+
+    return t_m, t_s, len(channels)
+
+def prepare(doc):
+    """Returns ``Cal`` and ``Analysis`` of the document with the
+    ``Type`` indices built (not part of the temperature steps).
+    """
+    cal = Cal(doc)
+    cal.Temp.get_index()
+    cal.TDev.get_index()
+
+    return cal, Analysis(doc, git_hash=False)
+
+def run(cal, ana, state):
+    if state:
+        cal.temperature_state(ana)
+    else:
+        cal.temperature_before(ana)
+        cal.temperature_after(ana)
+        cal.temperature_room(ana)
+
+def timed(doc, state, repeat):
+    """Returns the minimal time of the temperature steps and the
+    stored temperatures.
+    """
+    t, ret = [], None
+    for _ in range(repeat):
+        cal, ana = prepare(doc)
+        t_0 = time.perf_counter()
+        run(cal, ana, state)
+        t.append(time.perf_counter() - t_0)
+        ret = ana.build_doc()["State" if state else "Calibration"]["Analysis"]["Values"]["Temperature"]
+
+    return min(t), ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=[41, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    temperature = Cal.temperature
+    res = []
+    for doc_type in ["Calibration", "State"]:
+        for n in args.sizes:
+            doc = Sim("se3", n=n, doc_type=doc_type, noise={"ch_*": {"Model": "normal", "Abs": 0.01}}).build()
+            state = doc_type == "State"
+
+            Cal.temperature = legacy_temperature
+            try:
+                t_before, before = timed(doc, state, args.repeat)
+            finally:
+                Cal.temperature = temperature
+            t_after, after = timed(doc, state, args.repeat)
+
+            if json.dumps(before) != json.dumps(after):
+                sys.exit("results differ ({}, {} points)".format(doc_type, n))
+            res.append({"doc_type": doc_type, "points": n,
+                        "before_s": t_before, "after_s": t_after, "speedup": t_before/t_after})
+
+    print(json.dumps(res))
+
+if __name__ == "__main__":
+    main()
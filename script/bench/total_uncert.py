@@ -0,0 +1,119 @@
+"""
+Regression test and benchmark of ``Device.get_total_uncert()`` and
+``vpy.device.budget.total_uncert()`` on the SE3 group normal
+(``FillDevs``) and the temperature device (``TDev``).
+
+python script/bench/total_uncert.py
+python script/bench/total_uncert.py --points 2000 --repeat 20 --seed 1
+
+The pressures are the filling pressures of the document followed by
+``--points`` simulated pressures over the whole range of the group
+normal (some of them ``nan`` and ``0``). Additionally a digit
+uncertainty (``Resolution``) is appended to the budgets.
+
+The *before* numbers are measured with the former entry by entry
+evaluation which is kept here as ``legacy_total_uncert()``. The
+results have to be equal bit by bit.
+"""
+import sys
+sys.path.append(".")
+
+import copy
+import json
+import time
+import argparse
+import numpy as np
+
+from vpy.standard.se3.uncert import Uncert
+from vpy.device.budget import total_uncert
+
+def legacy_total_uncert(dev, meas_vec, meas_unit, return_unit, skip_source=None, skip_type=None, take_type_list=None):
+    uncert_arr = []
+    for u_i in dev.uncert_dict:
+        if dev.check_source_skip(u_i, skip_source):
+            continue
+        if dev.check_type_skip(u_i, skip_type):
+            continue
+        if not dev.check_take_list(u_i, take_type_list):
+            continue
+
+        u = np.full(np.shape(meas_vec)[0], np.nan)
+        u_val = u_i.get('Value')
+        digit = u_i.get('Resolution')
+        from_val, to_val = dev.convert_range_to_meas_unit(meas_unit, u_i.get('RangeUnit'), u_i.get('From'), u_i.get('To'))
+        range_index = dev.get_match_index(meas_vec, from_val, to_val)
+
+        if u_val is not None:
+            u[range_index] = float(u_val)
+            u, return_unit = dev.convert_to_return_unit(u, u_i.get('Unit'), meas_vec, meas_unit, return_unit)
+        if digit is not None:
+            u[range_index] = dev.cal_abs_digit_uncert(meas_vec[range_index], digit)
+            u, return_unit = dev.convert_to_return_unit(u, meas_unit, meas_vec, meas_unit, return_unit)
+        uncert_arr.append(u)
+
+    uncert_total = dev.Vals.square_array_sum(uncert_arr)
+
+    return dev.Vals.replace_zero_by_nan(uncert_total)
+
+def same(a, b):
+    return all(np.array_equal(np.asarray(x).view(np.int64), np.asarray(y).view(np.int64)) for x, y in zip(a, b)) and len(a) == len(b)
+
+def timed(f, repeat):
+    t = []
+    for _ in range(repeat):
+        t_0 = time.perf_counter()
+        ret = f()
+        t.append(time.perf_counter() - t_0)
+    return min(t), ret
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", type=str, default="vpy/standard/se3/cal-sim-se3.json")
+    parser.add_argument("--points", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        doc = json.load(f)
+
+    uncert = Uncert(doc)
+    devs = uncert.FillDevs
+    for dev in devs:
+        dev.uncert_dict = copy.deepcopy(dev.uncert_dict) + [{"Type": "u6_digit", "Resolution": 1e-4, "Unit": "Pa"}]
+
+    rng = np.random.default_rng(args.seed)
+    p_fill = uncert.Pres.get_value("target_fill", "Pa")
+    p = np.concatenate((p_fill if p_fill is not None else [], 10**rng.uniform(-2, 5, args.points)))
+    p[rng.integers(0, len(p), len(p)//50 + 1)] = np.nan
+    p[rng.integers(0, len(p), len(p)//100 + 1)] = 0.0
+    p_dev = p * rng.normal(1, 1e-3, (len(devs), len(p)))
+    T = rng.normal(296.15, 0.1, len(p))
+
+    take = [None, ["u1"], ["u2", "u3", "u4", "u5", "u6"], ["u2", "u4", "u5", "u6"]]
+    cases = {}
+    for t in take:
+        cases["group_normal_{}".format(t)] = (lambda t=t: [legacy_total_uncert(d, p, "Pa", "Pa", take_type_list=t) for d in devs],
+                                              lambda t=t: total_uncert(devs, p, "Pa", "Pa", take_type_list=t))
+    cases["group_normal_mbar"] = (lambda: [legacy_total_uncert(d, p, "Pa", "mbar", skip_type="A") for d in devs],
+                                 lambda: total_uncert(devs, p, "Pa", "mbar", skip_type="A"))
+    cases["gn_mean_rows"] = (lambda: [legacy_total_uncert(d, p_dev[i], "Pa", "Pa", take_type_list=take[2]) for i, d in enumerate(devs)],
+                             lambda: total_uncert(devs, p_dev, "Pa", "Pa", take_type_list=take[2]))
+    if "TDev" in dir(uncert):
+        cases["temperature"] = (lambda: [legacy_total_uncert(uncert.TDev, T, "K", "K", take_type_list=l) for l in (["u1"], ["u2", "u3", "u6"])],
+                                lambda: [uncert.TDev.get_total_uncert(T, "K", "K", take_type_list=l) for l in (["u1"], ["u2", "u3", "u6"])])
+
+    out = {"devices": len(devs), "points": len(p)}
+    for name, (before, after) in cases.items():
+        t_before, r_before = timed(before, args.repeat)
+        t_after, r_after = timed(after, args.repeat)
+        if not same(r_before, r_after):
+            sys.exit("{} differs".format(name))
+        out[name] = {"before_s": t_before,
+                     "after_s": t_after,
+                     "speedup": t_before/t_after}
+
+    print(json.dumps(out))
+
+if __name__ == "__main__":
+    main()
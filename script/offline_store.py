@@ -0,0 +1,70 @@
+"""
+python script/offline_store.py --store vl.sqlite --pull --srv http://server:5984 --db vl_db
+python script/offline_store.py --store vl.sqlite --import dump.json
+python script/offline_store.py --store vl.sqlite --export dump.json
+
+Fills or exports an offline store (see ``vpy.store``) which can be
+used instead of the server by means of the ``--store`` parameter of
+the scripts, e.g.:
+
+python script/batch_analysis.py --store vl.sqlite --standard se3 --ids '...' -u -s
+
+``--pull`` copies all documents of the database and its work database
+together with the rows of all views configured in ``Io``.
+``--import`` reads a dump written by ``--export``, the output of
+``_all_docs?include_docs=true`` or a JSONL file of documents.
+"""
+import sys
+sys.path.append(".")
+
+import json
+import argparse
+from vpy.pkg_io import Io
+from vpy.store import Store, read_dump
+
+def views_by_db(io):
+    """Views of ``io.config`` by the database they are requested from.
+    """
+    db = io.config["db"]["name"]
+    work_db = io.config["db"]["work_db"]
+    views = {db: list(io.config["all"].values()), work_db: []}
+    for std in io.config["standards"].values():
+        for k, view in std.items():
+            views[work_db if k == "state_doc_view" else db].append(view)
+
+    return views
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", type=str, required=True, help="SQLite file")
+    parser.add_argument("--pull", action="store_true", help="copy database from server")
+    parser.add_argument("--srv", type=str, default="http://localhost:5984")
+    parser.add_argument("--db", type=str, default="vl_db")
+    parser.add_argument("--import", dest="import_file", type=str, help="dump file to import")
+    parser.add_argument("--export", dest="export_file", type=str, help="dump file to write")
+    args = parser.parse_args()
+
+    store = Store(args.store)
+    ret = {"store": args.store}
+
+    if args.pull:
+        io = Io(db_url=args.srv, db_name=args.db)
+        srv = io.get_srv()
+        ret["pulled"] = {}
+        for name, views in views_by_db(io).items():
+            if name in srv:
+                ret["pulled"][name] = store.pull(srv[name], name, views)
+
+    if args.import_file:
+        ret["imported"] = store.import_dump(read_dump(args.import_file))
+
+    if args.export_file:
+        with open(args.export_file, "w") as f:
+            json.dump(store.export_dump(), f, ensure_ascii=False)
+        ret["exported"] = args.export_file
+
+    store.close()
+    print(json.dumps(ret))
+
+if __name__ == "__main__":
+    main()
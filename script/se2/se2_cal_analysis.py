@@ -6,16 +6,8 @@ import os
 sys.path.append(".")
 
 import json
-import numpy as np
 from vpy.pkg_io import Io
-from vpy.analysis import Analysis
-from vpy.standard.se2.cal import Cal
-
-from vpy.standard.se2.std import Se2
-
-from vpy.device.cdg import InfCdg, Cdg
-from vpy.device.srg import Srg
-from vpy.device.rsg import Rsg
+from vpy.pipeline import se2_expansion
 
 
 def main():
@@ -50,30 +42,7 @@ def main():
             if update:
                 doc = io.update_cal_doc(doc, base_doc)
 
-            ana = Analysis(doc, analysis_type="expansion")
-            cal = Cal(doc)
-            
-            if 'CustomerObject' in doc['Calibration']:
-                customer_device = doc['Calibration']['CustomerObject']
-                dev_class = customer_device.get('Class', "generic")
-                if dev_class == 'SRG':
-                    CustomerDevice = Srg(doc, customer_device)
-                if dev_class == 'CDG':
-                    CustomerDevice = Cdg(doc, customer_device)
-                if dev_class == 'RSG':
-                    CustomerDevice = Rsg(doc, {})
-      
-            cal.temperature_after(ana)
-            cal.temperature_room(ana)
-            cal.pressure_cal(ana)
-            cal.pressure_ind(ana)
-            cal.pressure_offset(ana)
-            cal.pressure_indication_error(ana)
-            #cal.measurement_time(ana)
-            cal.faktor(ana)
-            cal.range(ana)
-
-            io.save_doc(ana.build_doc())
+            io.save_doc(se2_expansion(doc))
            
     else:
         ret = {"error": "no --ids found"}
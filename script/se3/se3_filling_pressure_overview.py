@@ -7,7 +7,7 @@ import os
 from vpy.pkg_io import Io
 from vpy.standard.se3.cal import Cal
 
-from script.se3.se3_cal_filling_pressure import gen_result_dict, get_expansion_uncert_rel, get_fill_pressure_uncert_rel, get_fill_pressures, skip_by_pressure
+from vpy.standard.se3.fill import FillPlanner
 
 import matplotlib.pyplot as plt
 
@@ -32,36 +32,30 @@ def main(cal):
     u_m = []
     u_l = []
 
+    #planner = FillPlanner(cal, min_p=94.0, with_f_uncert=True)
+    planner = FillPlanner(cal, min_p=94.0)
+    plan = planner.plan(target_cals, target_unit)
     for i, target_cal in enumerate(target_cals):
-        target_fill = get_fill_pressures(cal, target_cal, target_unit)
-        #f_uncert_rel = get_expansion_uncert_rel(cal, target_cal, target_unit)
-
-        fill_uncert_rel = get_fill_pressure_uncert_rel(cal, target_fill, target_unit)
-        print("p_fill:{}, u: {}".format(target_fill, fill_uncert_rel))
-
-        #u_rel = np.sqrt(np.power(fill_uncert_rel,2) + np.power(f_uncert_rel, 2))
-        u_rel = fill_uncert_rel
-        u_rel = skip_by_pressure(cal, target_fill, u_rel, target_unit)
-
-        res_dict = gen_result_dict(target_fill, u_rel, target_unit)
-        if res_dict["Expansion.Value"] == "f_s":
+        print("p_fill:{}, u: {}".format(plan["p_fill"][:, i], plan["u_rel"][:, i]))
+        expansion = plan["Expansion"][i]
+        if expansion == "f_s":
             p_cal_s.append(target_cal)
-            p_fill_s.append(res_dict["Pressure_fill.Value"])
-            u_s.append(res_dict["Uncertainty_cal.Value"])
+            p_fill_s.append(plan["Pressure_fill"][i])
+            u_s.append(plan["Uncertainty_cal"][i])
 
-        if res_dict["Expansion.Value"] == "f_m":
+        if expansion == "f_m":
             p_cal_m.append(target_cal)
-            p_fill_m.append(res_dict["Pressure_fill.Value"])
-            u_m.append(res_dict["Uncertainty_cal.Value"])
+            p_fill_m.append(plan["Pressure_fill"][i])
+            u_m.append(plan["Uncertainty_cal"][i])
 
-        if res_dict["Expansion.Value"] == "f_l":
+        if expansion == "f_l":
             p_cal_l.append(target_cal)
-            p_fill_l.append(res_dict["Pressure_fill.Value"])
-            u_l.append(res_dict["Uncertainty_cal.Value"])
+            p_fill_l.append(plan["Pressure_fill"][i])
+            u_l.append(plan["Uncertainty_cal"][i])
 
         p_cal.append(target_cal)
-        p_fill.append(res_dict["Pressure_fill.Value"])
-        u.append(res_dict["Uncertainty_cal.Value"])
+        p_fill.append(plan["Pressure_fill"][i])
+        u.append(plan["Uncertainty_cal"][i])
 
     plt.subplot(111)
     plt.plot(p_cal, u, ':', color="black" )
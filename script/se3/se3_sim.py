@@ -10,14 +10,15 @@ def main():
 
     sim = Sim("se3")
     doc = sim.build()
-    res = Analysis(doc)
+    aux_values = doc["Calibration"]["Analysis"]["AuxValues"]
+    res = Analysis(doc, insert_dict={"AuxValues": aux_values}, analysis_type="expansion")
     unc = Uncert(doc)
     cal = Cal(doc)
 
-    cal.pressure_cal(res)
+    cal.all(res)
     unc.total(res)
-    p = res.pick("Pressure", "cal", "mbar")
-    u = res.pick("Uncertainty", "total", "1")
+    p = res.pick("Pressure", "cal", cal.unit)
+    u = res.pick("Uncertainty", "standard", "1")
     print(u)
 if __name__ == "__main__":
     main()
@@ -7,7 +7,7 @@ import numpy as np
 
 from vpy.pkg_io import Io
 from vpy.standard.se3.cal import Cal
-from script.se3.cal_filling_pressure import gen_result_dict, get_expansion_uncert_rel, get_fill_pressure_uncert_rel, get_fill_pressures, skip_by_pressure
+from vpy.standard.se3.fill import FillPlanner
 
 """
 renew data **struct**:
@@ -47,25 +47,10 @@ def gen_sim_value_struct(val_dict, out_file_name="values_struct.json", path="vpy
         json.dump(res_dict, f, indent=4, ensure_ascii=False)
 
 def get_fill_and_expansion(cal, target_pressures, target_unit):
+    planner = FillPlanner(cal, min_p=94.0, max_p=133322, with_f_uncert=True)
+    plan = planner.plan(target_pressures, target_unit)
 
-    expansion_name_value = []
-    target_fill_value = []
-
-    for i, target_pressure in enumerate(target_pressures):
-
-        p_fill = get_fill_pressures(cal, target_pressure, target_unit)
-        u_f = get_expansion_uncert_rel(cal, target_pressure, target_unit)
-        u_p_fill = get_fill_pressure_uncert_rel(cal, p_fill, target_unit)
-        u_rel = np.sqrt(np.power(u_p_fill, 2) + np.power(u_f, 2))
-
-        u_rel = skip_by_pressure(cal, p_fill, u_rel, target_unit)
-
-        res_dict = gen_result_dict(p_fill, u_rel, target_unit)
-
-        expansion_name_value.append(res_dict.get("Expansion").get("Value"))
-        target_fill_value.append(res_dict.get("Pressure_fill").get("Value"))
-
-    return target_fill_value, expansion_name_value
+    return list(plan["Pressure_fill"]), plan["Expansion"]
 
 def sim_temperature_before(struct_dict, target_fill, target_unit):
     c_type = struct_dict.get("Type")
@@ -3,15 +3,30 @@ https://github.com/pypa/sampleproject
 """
 
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 from codecs import open
 from os import path
+import importlib.util
 
 here = path.abspath(path.dirname(__file__))
 
 with open(path.join(here, 'README.rst'), encoding='utf-8') as f:
     long_description = f.read()
 
+class BuildPy(build_py):
+    """Writes the git hash of the checkout to ``vpy/build_info.json``
+    of the build (see ``vpy/build_info.py``).
+    """
+    def run(self):
+        super().run()
+        spec = importlib.util.spec_from_file_location("build_info", path.join(here, 'vpy', 'build_info.py'))
+        build_info = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(build_info)
+        if not self.dry_run:
+            build_info.write(path.join(self.build_lib, 'vpy'))
+
 setup(name='vpy',
+      cmdclass={'build_py': BuildPy},
       version='0.2.0',
       description='Analysis of measurement results stored in CouchDB documents.',
       long_description=long_description,
@@ -1,16 +1,23 @@
 import datetime
 import sys
-import subprocess
 import copy
 import numpy as np
 from .document import Document
 from .constants import Constants
+from .grouping import gather_by_first
+from . import build_info
 
 import math
 
 class Analysis(Document):
-    """Holds a deep copy of ``document``. Container for storing
-    the results of the calculation.
+    """Container for storing the results of the calculation.
+    Holds a reference to the original ``document`` which is
+    not changed; ``build_doc()`` returns a new document.
+
+    Float arrays given to ``store()`` are kept as columns
+    (read only ``np.array``) and returned by ``pick()`` without
+    conversion. They are written to the (json) document
+    on the first access of ``self.doc``.
     """
 
     def __init__(self, doc, init_dict=None, insert_dict=None, git_hash=True, analysis_type=None, pressure_unit = "Pa",  error_unit ="1"):
@@ -28,10 +35,10 @@ class Analysis(Document):
                         },
                         "Values": {},
                         }
-        if git_hash:
+        if git_hash and build_info.git_hash():
             if 'AuxValues' not in init_dict:
                 init_dict['AuxValues'] = {}
-            init_dict['AuxValues']['AnalysisGitHash'] = subprocess.check_output(["git", "rev-parse", "HEAD"]).decode('ascii').strip()
+            init_dict['AuxValues']['AnalysisGitHash'] = build_info.git_hash()
 
         if analysis_type:
             init_dict['AnalysisType'] = analysis_type
@@ -41,8 +48,64 @@ class Analysis(Document):
             for insert_key in insert_dict:
                 init_dict[insert_key] = insert_dict[insert_key]
 
+        self.columns = {}
+        self.pending = set()
+        self.type_index = {}
         super().__init__(init_dict)
-        self.org = copy.deepcopy(doc)
+        self.org = doc
+
+    @property
+    def doc(self):
+        """The analysis document with all columns written to it.
+        """
+        if self.pending:
+            self.flush()
+        return self._doc
+
+    @doc.setter
+    def doc(self, doc):
+        self._doc = doc
+
+    def flush(self):
+        """Writes the pending columns to their entries in ``self.doc``.
+        """
+        for key in self.pending:
+            o, columns = self.columns[key]
+            for field, column in columns.items():
+                o[field] = self.make_writable(column)
+        self.pending = set()
+
+    def drop_columns(self):
+        """Writes all columns to ``self.doc`` and forgets them together with
+        the ``Type`` indices. Called by methods changing ``self.doc`` in a
+        way ``store()`` and ``pick()`` can not follow.
+        """
+        if self.pending:
+            self.flush()
+        self.columns = {}
+        self.type_index = {}
+
+    def make_column(self, a):
+        """Converts a one dimensional float array to the read only array
+        ``pick()`` returns (``inf`` becomes ``nan`` as on the way through
+        the json document). Returns ``None`` for other types.
+
+        :param a: value to store
+        :type a: np.array
+
+        :returns: column
+        :rtype: np.array|None
+        """
+        if isinstance(a, np.float64):
+            a = [a]
+        elif not (isinstance(a, np.ndarray) and a.dtype == np.float64 and a.ndim == 1):
+            return None
+
+        column = np.array(a, dtype=np.float64)
+        column[np.isinf(column)] = np.nan
+        column.flags.writeable = False
+
+        return column
 
     def store(self, quant, val_type, value, unit, sd=None, n=None, dest='Values', descr=None):
         """Stores the result of a calculation in
@@ -65,56 +128,79 @@ class Analysis(Document):
         :type str: str
         """
 
-        value = self.make_writable(value)
-        append = True
+        if not self.doc_owned:
+            self.writable()
+        self.invalidate_index()
+
+        key = (dest, quant, val_type)
+        self.columns.pop(key, None)
+        self.pending.discard(key)
 
         o = {"Type": val_type,
-             "Value": value,
+             "Value": None,
              "Unit": unit}
 
         if descr is not None:
             o["Description"] = descr
 
         if sd is not None:
-            o['SdValue'] = self.make_writable(sd)
+            o['SdValue'] = None
 
         if n is not None:
-            o['N'] = self.make_writable(n)
-
-        if dest is not None:
-            # simply set if new
-            if quant not in self.doc[dest]:
-                self.doc[dest][quant] = [o]
-                append = False
-
-            # search type and replace if existing
-            for i, d in enumerate(self.doc[dest][quant]):
-                if d.get("Type") == val_type:
-                    self.doc[dest][quant][i] = o
-                    append = False
-                    break
+            o['N'] = None
+
+        columns = {}
+        for field, v in (("Value", value), ("SdValue", sd), ("N", n)):
+            if field in o:
+                column = self.make_column(v)
+                if column is None:
+                    o[field] = self.make_writable(v)
+                else:
+                    columns[field] = column
 
-            # append if not exist
-            if append:
-                self.doc[dest][quant].append(o)
+        if columns:
+            self.columns[key] = (o, columns)
+            self.pending.add(key)
 
+        entries, index = self.get_type_index(dest, quant)
+        if val_type in index:
+            # replace if existing
+            entries[index[val_type]] = o
         else:
-            # new
-            if quant not in self.doc:
-                self.doc[quant] = [o]
-                append = False
-
-            # replace
-            for i, d in enumerate(self.doc[quant]):
-                if d.get("Type") == val_type:
-                    self.doc[quant][i] = o
-                    append = False
-                    break
+            # append if not exist
+            index[val_type] = len(entries)
+            entries.append(o)
+
+    def get_type_index(self, dest, quant):
+        """Returns the list of entries stored under ``dest`` and ``quant``
+        (created if missing) and a dict mapping their ``Type`` to the
+        position in the list. The dict is built once per list and kept
+        up to date by ``store()``; if more than one entry has the same
+        ``Type`` the first one is indexed.
+
+        :param dest: destination (``None`` for top level)
+        :type dest: str
+        :param quant: quant measurement quantity
+        :type quant: str
+
+        :returns: entries, index
+        :rtype: list, dict
+        """
+        container = self._doc if dest is None else self._doc[dest]
+        if quant not in container:
+            container[quant] = []
+        entries = container[quant]
+
+        key = (dest, quant)
+        if key in self.type_index and self.type_index[key][0] is entries:
+            return self.type_index[key]
 
-            # append
-            if append:
-                self.doc[quant].append(o)
+        index = {}
+        for i, d in enumerate(entries):
+            index.setdefault(d.get("Type"), i)
+        self.type_index[key] = (entries, index)
 
+        return entries, index
 
     def store_dict(self, quant, d, dest='Values', plain=False):
         """ Appends a dict to document under the given destination.
@@ -161,6 +247,9 @@ class Analysis(Document):
         """
 
         if isinstance(d, dict):
+            self.writable()
+            self.invalidate_index()
+            self.drop_columns()
             for e in d:
                 d[e] = self.make_writable(d[e])
 
@@ -270,20 +359,33 @@ class Analysis(Document):
 
         :param dict_unit: dict_unit expected
         :type dict_unit: str
+
+        .. note::
+
+            Values stored as columns are returned as read only
+            arrays (no copy). Copy them before changing them.
         """
         value_ret = None
         sd_ret = None
         n_ret = None
 
-        if dest in self.doc:
-            if quant in self.doc[dest]:
-                doc = self.doc[dest][quant]
-                for d in doc:
-                    if d.get('Type') == dict_type:
-                        if with_stats:
-                            value_ret, sd_ret, n_ret = self.get_value(dict_type, dict_unit, o=d, with_stats=with_stats)
-                        else:
-                            value_ret = self.get_value(dict_type, dict_unit, o=d)
+        key = (dest, quant, dict_type)
+        if key in self.columns:
+            o, columns = self.columns[key]
+            if o["Unit"] != dict_unit:
+                sys.exit("On attempt to get value of Type {}: Unit is {} not {}".format(dict_type, o["Unit"], dict_unit))
+            value_ret, sd_ret, n_ret = [columns[field] if field in columns else
+                                        self.safe_float_array(o[field]) if field in o else None
+                                        for field in ("Value", "SdValue", "N")]
+        elif dest in self._doc: ## no flush: the entry is not a column
+            if quant in self._doc[dest]:
+                entries, index = self.get_type_index(dest, quant)
+                if dict_type in index:
+                    d = entries[index[dict_type]]
+                    if with_stats:
+                        value_ret, sd_ret, n_ret = self.get_value(dict_type, dict_unit, o=d, with_stats=with_stats)
+                    else:
+                        value_ret = self.get_value(dict_type, dict_unit, o=d)
             else:
                 msg = "{} not in Values".format(quant)
         else:
@@ -485,31 +587,18 @@ class Analysis(Document):
         rn = ana.pick_dict("Range", "range")
         idx = self.flatten(average_index)
 
-        r1 = {}
         if rn != None:
             rn = rn.get("Value")
-            for i in idx:
-                for j in r1:
-                    if rn[i] == rn[j]:
-                        r1[j].append(i)
-                        break
-                else: r1[i] = [i]
-            r1 = list(r1.values())
+            r1 = gather_by_first(idx, rn, lambda r, r_j: r == r_j)
         else:
-            for i in idx:
-                for j in r1:
-                    if np.isclose(faktor[i], faktor[j], rtol=1.e-3) and np.isfinite(faktor[j]):
-                        r1[j].append(i)
-                        break
-                else: r1[i] = [i]
-            r1 = list(r1.values())
+            faktor = np.asarray(faktor, dtype=float)
+            r1 = gather_by_first(idx, faktor, lambda f, f_j: np.isclose(f, f_j, rtol=1.e-3) & np.isfinite(f_j))
             if len(r1) > 1:
                 faktor = faktor / np.max(faktor)
-                rangemultiplier = np.full(len(faktor), "nothing")
-                for i in range(len(faktor)):
-                    if np.isclose(1., faktor[i], rtol=1.e-3): rangemultiplier[i] = "X1"
-                    elif np.isclose(0.1, faktor[i], rtol=1.e-3): rangemultiplier[i] = "X0.1"
-                    elif np.isclose(0.01, faktor[i], rtol=1.e-3): rangemultiplier[i] = "X0.01"
+                rangemultiplier = np.select([np.isclose(1., faktor, rtol=1.e-3),
+                                             np.isclose(0.1, faktor, rtol=1.e-3),
+                                             np.isclose(0.01, faktor, rtol=1.e-3)],
+                                            ["X1", "X0.1", "X0.01"], "nothing")
                 ana.store("Range", "ind", rangemultiplier, "1")
 
         # p_cal = ana.pick("Pressure", "cal", self.pressure_unit)
@@ -565,44 +654,140 @@ class Analysis(Document):
 
         """
         error_dict = self.pick_dict(quant='Error', dict_type='ind')
-        error = error_dict.get('Value')
+        error = np.asarray(error_dict.get('Value'), dtype=float)
         k = 0
         while True:
-            r = []
-            ref_mean = [None] * len(average_index) # evtl. np.full()
-            ref_std = [None] * len(average_index)
-            s = [None] * len(average_index)
-            for i in range(len(average_index)):
-                s[i] = 1
-                if i > 1:
-                    s[i] = i
-                if i > len(average_index) - 3:
-                    s[i] = len(average_index) - 2
-                # collect indices of neighbors
-                #print("s["+str(i)+"]="+str(s[i]))
-                l = average_index[s[i] - 1: s[i] + 2]
-                ref_idx = [item for sublist in l for item in sublist] # flatten
-                rr = []
-                for j in range(len(average_index[i])):
-                    # indices of neighbors only
-                    ref_idx0 = [a for a in ref_idx if a != average_index[i][j]]
-                    #print(ref_idx0)
-                    ref = np.take(error, ref_idx0).tolist()
-                    ref_mean[i] = np.mean(ref)
-                    ref_std[i] = np.std(ref)
-                    #Only accept indices if error[idx[i][j]] deviates either
-                    #less than 0.001 or less than 10*sigma from neighbors
-                    if abs(ref_mean[i] - error[average_index[i][j]]) < max(0.001, 10 * ref_std[i]):
-                        rr.append(average_index[i][j])
-                r.append(rr)
+            r = self.fine_error_select(error, average_index)
 
             k = k + 1
             if average_index == r:
                 break
             average_index = r
 
+        # mean and std of the neighbors of the last point of each group
+        ref_mean = [None] * len(average_index)
+        ref_std = [None] * len(average_index)
+        for i, (start, stop) in enumerate(self.fine_error_windows(len(average_index))):
+            if len(average_index[i]) > 0:
+                ref_idx = self.flatten(average_index[start:stop])
+                ref_mean[i], ref_std[i] = self.fine_error_ref(error, ref_idx, average_index[i][-1])
+
         return average_index, ref_mean, ref_std, k
 
+    def fine_error_windows(self, n):
+        """Returns the range of neighbor groups (start, stop) of each of
+        the ``n`` groups of ``fine_error_filtering()``.
+
+        :param n: number of groups
+        :type n: int
+
+        :returns: list of (start, stop)
+        :rtype: list
+        """
+        w = []
+        for i in range(n):
+            s = 1
+            if i > 1:
+                s = i
+            if i > n - 3:
+                s = n - 2
+            start, stop, _ = slice(s - 1, s + 2).indices(n)
+            w.append((start, max(start, stop)))
+
+        return w
+
+    def fine_error_ref(self, error, ref_idx, idx):
+        """Mean and standard deviation of the values of the
+        neighbors ``ref_idx`` without the point ``idx``.
+
+        :returns: mean, std
+        :rtype: float, float
+        """
+        ref = np.take(error, [a for a in ref_idx if a != idx]).tolist()
+
+        return np.mean(ref), np.std(ref)
+
+    def fine_error_select(self, error, average_index):
+        """One step of ``fine_error_filtering()``. Returns the points of
+        each group deviating either less than 0.001 or less than 10*sigma
+        from the mean of their neighbors.
+
+        The leave-one-out mean and std are derived from the sums over the
+        neighbor windows (sum of the group sums) by subtracting the point
+        itself. Decisions closer to the threshold than the rounding error
+        of this shortcut are checked by means of ``fine_error_ref()``.
+
+        :param error: error values
+        :type error: np.array
+        :param average_index: list of lists of indices
+        :type average_index: list
+
+        :returns: list of lists of indices
+        :rtype: list
+        """
+        n = len(average_index)
+        if n == 0:
+            return []
+
+        windows = np.array(self.fine_error_windows(n), dtype=int).reshape(n, 2)
+        size = np.array([len(i) for i in average_index], dtype=int)
+        member = np.array(self.flatten(average_index), dtype=int)
+        group = np.repeat(np.arange(n), size)
+
+        e = error[member]
+        bad = ~np.isfinite(e)
+        shift = np.median(e[~bad]) if np.any(~bad) else 0.0
+        y = np.where(bad, 0.0, e - shift)
+
+        def window_sum(v):
+            g = np.bincount(group, weights=v, minlength=n)
+            w = np.zeros(n)
+            for o in range(3):
+                i = windows[:, 0] + o
+                w = w + np.where(i < windows[:, 1], g[np.minimum(i, n - 1)], 0.0)
+            return w[group]
+
+        N_w = window_sum(np.ones(len(member)))
+        S_w = window_sum(y)
+        Q_w = window_sum(y**2)
+        B_w = window_sum(bad.astype(float))
+
+        # number of occurrences of each point in its neighbor window
+        key = np.sort(member * n + group)
+        c = (np.searchsorted(key, member * n + windows[group, 1]) -
+             np.searchsorted(key, member * n + windows[group, 0]))
+
+        N = N_w - c
+        S = S_w - c * y
+        Q = Q_w - c * y**2
+        B = B_w - c * bad
+
+        valid = (N > 0) & (B < 0.5) & ~bad
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = S / N
+            var = np.maximum(Q / N - mean**2, 0.0)
+
+            # bounds of the rounding errors
+            eps = np.finfo(float).eps
+            var_err = 4 * eps * (N_w + 2) * (Q_w / N + mean**2)
+            std_err = var_err / (np.sqrt(var) + np.sqrt(var_err))
+            dev_err = 4 * eps * (N_w + 2) * (np.abs(mean) + np.abs(y) + abs(shift))
+
+        std = np.sqrt(var)
+        dev = np.abs(mean - y)
+        threshold = np.maximum(0.001, 10 * std)
+
+        accept = valid & (dev < threshold)
+        check = np.flatnonzero(valid & (np.abs(dev - threshold) <= 4 * (10 * std_err + dev_err)))
+        for p in check:
+            start, stop = windows[group[p]]
+            ref_mean, ref_std = self.fine_error_ref(error, self.flatten(average_index[start:stop]), member[p])
+            accept[p] = abs(ref_mean - error[member[p]]) < max(0.001, 10 * ref_std)
+
+        kept = np.bincount(group[accept], minlength=n)
+
+        return [l.tolist() for l in np.split(member[accept], np.cumsum(kept)[:-1])]
+
     def reduce_by_average_index(self,  value, average_index):
         """Calculates the mean value for each target pressure.
         """
@@ -626,6 +811,8 @@ class Analysis(Document):
 
     def build_doc(self, dest='Analysis', doc=None):
         """Merges the analysis dict to the original doc and returns it.
+        Only the dicts on the path to ``dest`` are copied; the original
+        doc is left untouched.
 
         :returns: assembled dictionary
         :rtype: dict
@@ -633,11 +820,15 @@ class Analysis(Document):
         if doc is not None:
             self.org = doc
 
-        if "Calibration" in self.org:
-            self.org['Calibration'][dest] = self.doc
-        elif "State" in self.org:
-            self.org['State'][dest] = self.doc
+        org = dict(self.org)
+        if "Calibration" in org:
+            org['Calibration'] = dict(org['Calibration'])
+            org['Calibration'][dest] = self.doc
+        elif "State" in org:
+            org['State'] = dict(org['State'])
+            org['State'][dest] = self.doc
         else:
-            self.org[dest] = self.doc
+            org[dest] = self.doc
+        self.org = org
 
         return self.org
@@ -87,3 +87,63 @@ class TestAnalysis(unittest.TestCase):
     def test_init_no_hash(self):
         ana = Analysis({}, git_hash=False)
         self.assertFalse("AnalysisGitHash" in ana.doc['AuxValues'])
+
+    def test_store_get_value_1(self):
+        """values stored after a lookup are found by get_value
+        """
+        self.Ana.store("A", "b", [1], "u")
+        self.assertEqual(self.Ana.get_value("b", "u")[0], 1.)
+
+        self.Ana.store("A", "b", [2], "u")
+        self.assertEqual(self.Ana.get_value("b", "u")[0], 2.)
+
+    def test_copy_on_write_1(self):
+        """store and build_doc leave the original document untouched
+        """
+        doc = {"Calibration": {"Analysis": {"Values": {"A": [{"Type": "b", "Value": [1], "Unit": "u"}]}}}}
+        ana = Analysis(doc, init_dict=doc["Calibration"]["Analysis"], git_hash=False)
+        ana.store("A", "b", [2], "u")
+        new_doc = ana.build_doc()
+
+        self.assertEqual(doc["Calibration"]["Analysis"]["Values"]["A"][0]["Value"], [1])
+        self.assertEqual(new_doc["Calibration"]["Analysis"]["Values"]["A"][0]["Value"], [2])
+
+    def test_store_column_1(self):
+        """float arrays are picked without copy and written as json lists
+        """
+        v = np.array([1., np.nan, np.inf])
+        self.Ana.store("A", "b", v, "u", sd=np.array([.1, .1, .1]), n=[2, 2, 2])
+        a = self.Ana.pick("A", "b", "u")
+        self.assertIs(a, self.Ana.pick("A", "b", "u"))
+        self.assertFalse(a.flags.writeable)
+        self.assertTrue(np.isnan(a[2]))
+
+        a, sd, n = self.Ana.pick("A", "b", "u", with_stats=True)
+        self.assertEqual(sd[0], .1)
+        self.assertEqual(n[0], 2.)
+
+        o = self.Ana.doc["Values"]["A"][0]
+        self.assertEqual(list(o.keys()), ["Type", "Value", "Unit", "SdValue", "N"])
+        self.assertEqual(o["Value"], [1., None, None])
+        self.assertEqual(o["N"], [2, 2, 2])
+
+    def test_store_column_2(self):
+        """picking other types does not write the columns to the document
+        """
+        self.Ana.store("A", "b", np.array([1., 2.]), "u")
+        self.Ana.store("A", "c", [3], "u")
+        self.assertEqual(self.Ana.pick("A", "c", "u")[0], 3.)
+        self.assertIsNone(self.Ana.pick("A", "d", "u"))
+        self.assertIsNone(self.Ana.pick("B", "b", "u"))
+        self.assertEqual(self.Ana.pending, {("Values", "A", "b")})
+        self.assertEqual(self.Ana.doc["Values"]["A"][0]["Value"], [1., 2.])
+
+    def test_store_order_1(self):
+        """replacing a type keeps the position of the entry
+        """
+        for t in ["a", "b", "c"]:
+            self.Ana.store("A", t, [1], "u")
+        self.Ana.store("A", "b", [2], "u")
+
+        self.assertEqual([d["Type"] for d in self.Ana.doc["Values"]["A"]], ["a", "b", "c"])
+        self.assertEqual(self.Ana.pick("A", "b", "u")[0], 2.)
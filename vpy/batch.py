@@ -0,0 +1,193 @@
+"""Analysis of many calibration documents in one run.
+
+The documents are fetched in bulk, analysed by the pipeline of the
+standard (see ``vpy.pipeline``) in a pool of processes and saved in
+bulk. A failing document (exception or ``sys.exit()`` somewhere in the
+pipeline) is reported and does not stop the batch.
+"""
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from . import pipeline
+from .device.device import Device
+
+pipelines = {"se3": pipeline.se3_expansion,
+             "frs5": pipeline.frs5,
+             "se2": pipeline.se2_expansion}
+
+## standards whose pipeline takes the AuxValues from a state document (-a)
+state_dates = {"se3": pipeline.se3_state_date}
+
+def analyse(standard, doc, state_doc=None):
+    """Runs the pipeline of the ``standard`` for one document. Errors
+    are returned instead of raised so that a batch continues.
+
+    :param standard: name of the standard e.g. ``se3``
+    :type standard: str
+    :param doc: calibration document
+    :type doc: dict
+    :param state_doc: state document (AuxValues, ``-a``)
+    :type state_doc: dict
+
+    :returns: id, document (``None`` on error), error message (``None`` if ok)
+    :rtype: tuple
+    """
+    doc_id = doc.get("_id")
+    try:
+        if state_doc is not None:
+            return doc_id, pipelines[standard](doc, state_doc=state_doc), None
+        return doc_id, pipelines[standard](doc), None
+    except SystemExit as e:
+        return doc_id, None, str(e.code)
+    except Exception:
+        return doc_id, None, traceback.format_exc(limit=-3)
+
+class Batch(object):
+    """Analyses documents of one standard. With ``workers > 1`` the
+    documents are analysed in a ``ProcessPoolExecutor``.
+
+    :param io: instance of ``Io`` (needed for ``run()`` only)
+    :type io: vpy.pkg_io.Io
+    :param standard: name of the standard e.g. ``se3``
+    :type standard: str
+    :param workers: number of processes
+    :type workers: int
+    :param share_kernels: share the interpolation kernels of the devices
+                          between the documents (see ``Device.share_interpol_kernels()``)
+    :type share_kernels: bool
+    """
+    chunk_size = 50
+
+    def __init__(self, io, standard, workers=1, share_kernels=True):
+        if standard not in pipelines:
+            sys.exit("no batch pipeline for standard {}".format(standard))
+
+        self.io = io
+        self.standard = standard
+        self.workers = workers
+        self.share_kernels = share_kernels
+
+    def pool(self):
+        """Returns a new pool of ``self.workers`` processes.
+        """
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   initializer=Device.share_interpol_kernels, initargs=(self.share_kernels,))
+
+    def run_docs(self, docs, pool=None, state_docs=None):
+        """Analyses the given documents.
+
+        :param docs: calibration documents
+        :type docs: list
+        :param pool: pool to use (a new one is started if ``workers > 1``)
+        :type pool: ProcessPoolExecutor
+        :param state_docs: state document per document (``-a``)
+        :type state_docs: list
+
+        :returns: list of (id, document, error)
+        :rtype: list
+        """
+        if state_docs is None:
+            state_docs = [None] * len(docs)
+
+        if pool is not None:
+            return list(pool.map(analyse, [self.standard] * len(docs), docs, state_docs))
+
+        if self.workers > 1 and len(docs) > 1:
+            with self.pool() as pool:
+                return self.run_docs(docs, pool, state_docs)
+
+        Device.share_interpol_kernels(self.share_kernels)
+        return [analyse(self.standard, doc, state_doc) for doc, state_doc in zip(docs, state_docs)]
+
+    def state_doc(self, doc, state_docs):
+        """Returns the state document of the first measurement date of
+        ``doc``; ``state_docs`` keeps the documents by date.
+        """
+        date = state_dates[self.standard](doc)
+        if date not in state_docs:
+            state_docs[date] = self.io.get_state_doc(self.standard, enddate=date)
+
+        return state_docs[date]
+
+    def run(self, ids, update=False, save=False, auxval=False):
+        """Fetches, analyses and (if ``save``) saves the documents
+        with the given ids in chunks of ``chunk_size``.
+
+        :param ids: document ids
+        :type ids: list
+        :param update: update docs with the base doc (``-u``)
+        :type update: bool
+        :param save: save the results (``-s``)
+        :type save: bool
+        :param auxval: take the AuxValues from the state document of
+                       the measurement date (``-a``, se3 only)
+        :type auxval: bool
+
+        :returns: report with throughput and errors
+        :rtype: dict
+        """
+        if auxval and self.standard not in state_dates:
+            sys.exit("no AuxValues from state documents (-a) for standard {}".format(self.standard))
+
+        t_0 = time.perf_counter()
+        report = {"standard": self.standard, "docs": len(ids), "ok": 0, "saved": 0, "errors": {}}
+
+        base_doc = self.io.get_base_doc(self.standard) if update else None
+        pool = self.pool() if self.workers > 1 else None
+        try:
+            self.run_chunks(ids, base_doc, save, pool, report, {} if auxval else None)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        report["seconds"] = time.perf_counter() - t_0
+        report["docs_per_second"] = len(ids) / report["seconds"] if report["seconds"] > 0 else None
+
+        return report
+
+    def run_chunks(self, ids, base_doc, save, pool, report, state_docs=None):
+        """Fetches, analyses and saves the documents chunk by chunk
+        and fills the ``report``. With ``state_docs`` (a dict) the state
+        documents are fetched (``-a``) and kept by date.
+        """
+        for i in range(0, len(ids), self.chunk_size):
+            chunk = ids[i:i + self.chunk_size]
+            docs = []
+            chunk_state_docs = [] if state_docs is not None else None
+            for doc_id, doc in zip(chunk, self.io.get_docs(chunk)):
+                if doc is None:
+                    report["errors"][doc_id] = "document not found"
+                    continue
+                if base_doc is not None:
+                    try:
+                        doc = self.io.update_cal_doc(doc, base_doc)
+                    except SystemExit as e:
+                        report["errors"][doc_id] = str(e.code)
+                        continue
+                if state_docs is not None:
+                    try:
+                        chunk_state_docs.append(self.state_doc(doc, state_docs))
+                    except SystemExit as e:
+                        report["errors"][doc_id] = str(e.code)
+                        continue
+                    except Exception:
+                        report["errors"][doc_id] = traceback.format_exc(limit=-3)
+                        continue
+                docs.append(doc)
+
+            results = []
+            for doc_id, doc, err in self.run_docs(docs, pool, chunk_state_docs):
+                if err is None:
+                    results.append(doc)
+                else:
+                    report["errors"][doc_id] = err
+            report["ok"] = report["ok"] + len(results)
+
+            if save and len(results) > 0:
+                for doc_id, err in self.io.save_docs(results):
+                    if err is None:
+                        report["saved"] = report["saved"] + 1
+                    else:
+                        report["errors"][doc_id] = err
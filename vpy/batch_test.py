@@ -0,0 +1,77 @@
+import unittest
+import json
+import os
+from .batch import Batch
+
+class IoStub(object):
+    """Stands in for ``Io``: serves and takes documents from a dict.
+    """
+    def __init__(self, docs, state_doc=None):
+        self.docs = docs
+        self.state_doc = state_doc
+        self.saved = []
+        self.state_dates = []
+
+    def get_docs(self, doc_ids):
+        return [self.docs.get(doc_id) for doc_id in doc_ids]
+
+    def get_state_doc(self, name, enddate=None):
+        self.state_dates.append(enddate)
+        return self.state_doc
+
+    def save_docs(self, docs):
+        self.saved = self.saved + docs
+        return [(doc["_id"], None) for doc in docs]
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        file_name = os.path.join(os.path.dirname(__file__), "standard", "se3", "cal-sim-se3.json")
+        with open(file_name) as f:
+            self.doc = json.load(f)
+
+    def test_run_1(self):
+        """a failing document does not stop the batch
+        """
+        io = IoStub({"ok": dict(self.doc, _id="ok"),
+                     "broken": {"_id": "broken", "Calibration": {}}})
+        report = Batch(io, "se3").run(["broken", "ok", "missing"], save=True)
+
+        self.assertEqual(report["ok"], 1)
+        self.assertEqual(report["saved"], 1)
+        self.assertEqual(sorted(report["errors"].keys()), ["broken", "missing"])
+        self.assertTrue("Analysis" in io.saved[0]["Calibration"])
+
+    def test_run_docs_1(self):
+        """process pool gives the same documents
+        """
+        docs = [dict(self.doc, _id=str(i)) for i in range(2)]
+        serial = Batch(None, "se3").run_docs(docs)
+        pool = Batch(None, "se3", workers=2).run_docs(docs)
+
+        for (id_s, doc_s, err_s), (id_p, doc_p, err_p) in zip(serial, pool):
+            self.assertEqual(id_s, id_p)
+            self.assertIsNone(err_p)
+            self.assertEqual(doc_s["Calibration"]["Analysis"]["Values"], doc_p["Calibration"]["Analysis"]["Values"])
+
+    def test_run_2(self):
+        """-a takes the AuxValues from the state document of the measurement date (fetched once per date)
+        """
+        aux = self.doc["Calibration"]["Analysis"]["AuxValues"]
+        state_doc = {"_id": "state", "State": {"Analysis": {"Values": {
+            "Volume": aux["Volume"], "OutGasRate": aux["OutGasRate"], "Time": aux["Time"], "Pressure": []}}}}
+        docs = {}
+        for i in range(2):
+            doc = json.loads(json.dumps(self.doc))
+            doc["_id"] = str(i)
+            doc["Calibration"]["Measurement"]["Date"] = [{"Type": "measurement", "Value": ["2023-05-04 10:00"]}]
+            doc["Calibration"]["Analysis"]["AuxValues"] = {}
+            docs[str(i)] = doc
+        io = IoStub(docs, state_doc)
+        report = Batch(io, "se3").run(["0", "1"], save=True, auxval=True)
+
+        self.assertEqual(report["ok"], 2)
+        self.assertEqual(io.state_dates, ["2023-05-04"])
+        self.assertEqual(io.saved[0]["Calibration"]["Analysis"]["AuxValues"]["Volume"], aux["Volume"])
+        with self.assertRaises(SystemExit):
+            Batch(io, "frs5").run(["0"], auxval=True)
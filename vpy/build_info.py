@@ -0,0 +1,122 @@
+"""Build information (git hash) of the vpy package.
+
+The hash is resolved once per process by ``git_hash()`` from
+
+#. ``build_info.json`` next to this file (written by ``setup.py`` when
+   the package is built),
+#. the ``.git`` directory of the checkout containing the package
+   (``HEAD``, loose refs, ``packed-refs``) without running git,
+#. ``git rev-parse HEAD`` in the package directory.
+
+This module imports nothing from vpy so that ``setup.py`` can load it
+before the package is installed.
+"""
+import os
+import json
+import subprocess
+
+package_path = os.path.dirname(os.path.abspath(__file__))
+info_file = os.path.join(package_path, "build_info.json")
+resolved = {}
+
+def read(path):
+    try:
+        with open(path) as fh:
+            return fh.read().strip()
+    except OSError:
+        return None
+
+def find_git_dir(path):
+    """Returns the git directory of the checkout containing ``path``
+    (follows ``gitdir:`` files of worktrees and submodules) or ``None``.
+    """
+    while True:
+        git = os.path.join(path, ".git")
+        if os.path.isdir(git):
+            return git
+        if os.path.isfile(git):
+            content = read(git) or ""
+            if content.startswith("gitdir:"):
+                return os.path.normpath(os.path.join(path, content[len("gitdir:"):].strip()))
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+def resolve_ref(git_dir, ref):
+    """Returns the hash of ``ref`` (e.g. ``refs/heads/master``) from
+    the loose refs or ``packed-refs`` of ``git_dir`` or ``None``.
+    """
+    common = read(os.path.join(git_dir, "commondir"))
+    dirs = [git_dir]
+    if common:
+        dirs.append(os.path.normpath(os.path.join(git_dir, common)))
+
+    for d in dirs:
+        value = read(os.path.join(d, *ref.split("/")))
+        if value:
+            return value
+    for d in dirs:
+        for line in (read(os.path.join(d, "packed-refs")) or "").splitlines():
+            parts = line.split()
+            if len(parts) == 2 and parts[1] == ref and not line.startswith(("#", "^")):
+                return parts[0]
+
+    return None
+
+def head_of(path):
+    """Returns the hash of ``HEAD`` of the checkout containing ``path``
+    read from the git directory or ``None``.
+
+    :param path: directory in the checkout
+    :type path: str
+
+    :returns: hash
+    :rtype: str
+    """
+    git_dir = find_git_dir(path)
+    if git_dir is None:
+        return None
+    head = read(os.path.join(git_dir, "HEAD"))
+    if not head:
+        return None
+    if head.startswith("ref:"):
+        return resolve_ref(git_dir, head[len("ref:"):].strip())
+
+    return head
+
+def git_hash():
+    """Returns the git hash of the package or ``None`` if it can not be
+    found (e.g. an installation without build information). The hash
+    is resolved once per process.
+
+    :returns: hash
+    :rtype: str
+    """
+    if "git_hash" not in resolved:
+        value = None
+        try:
+            with open(info_file) as fh:
+                value = json.load(fh).get("GitHash")
+        except (OSError, ValueError):
+            pass
+        if not value:
+            value = head_of(package_path)
+        if not value:
+            try:
+                value = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=package_path,
+                                                stderr=subprocess.DEVNULL).decode('ascii').strip()
+            except (OSError, subprocess.CalledProcessError):
+                value = None
+        resolved["git_hash"] = value
+
+    return resolved["git_hash"]
+
+def write(path, value=None):
+    """Writes ``build_info.json`` with the hash ``value`` (default:
+    ``HEAD`` of the checkout) to the directory ``path``.
+    """
+    value = value or head_of(package_path)
+    if value:
+        with open(os.path.join(path, "build_info.json"), "w") as fh:
+            json.dump({"GitHash": value}, fh)
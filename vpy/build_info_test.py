@@ -0,0 +1,50 @@
+import os
+import unittest
+import tempfile
+from . import build_info
+
+class TestBuildInfo(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.git = os.path.join(self.dir.name, "repo", ".git")
+        os.makedirs(os.path.join(self.git, "refs", "heads"))
+        self.sub = os.path.join(self.dir.name, "repo", "vpy")
+        os.makedirs(self.sub)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, content):
+        with open(os.path.join(self.git, name), "w") as fh:
+            fh.write(content)
+
+    def test_head_of_1(self):
+        """loose ref, packed ref and detached HEAD
+        """
+        self.write("HEAD", "ref: refs/heads/master\n")
+        self.write("packed-refs", "# pack-refs with: peeled\n" + "a"*40 + " refs/heads/master\n")
+        self.assertEqual(build_info.head_of(self.sub), "a"*40)
+
+        self.write(os.path.join("refs", "heads", "master"), "b"*40 + "\n")
+        self.assertEqual(build_info.head_of(self.sub), "b"*40)
+
+        self.write("HEAD", "c"*40 + "\n")
+        self.assertEqual(build_info.head_of(self.sub), "c"*40)
+
+    def test_head_of_2(self):
+        """worktree: .git file pointing to the git dir, refs in the common dir
+        """
+        wt_git = os.path.join(self.git, "worktrees", "wt")
+        os.makedirs(wt_git)
+        with open(os.path.join(wt_git, "HEAD"), "w") as fh:
+            fh.write("ref: refs/heads/feature\n")
+        with open(os.path.join(wt_git, "commondir"), "w") as fh:
+            fh.write("../..\n")
+        self.write(os.path.join("refs", "heads", "feature"), "d"*40 + "\n")
+        wt = os.path.join(self.dir.name, "wt")
+        os.makedirs(wt)
+        with open(os.path.join(wt, ".git"), "w") as fh:
+            fh.write("gitdir: " + wt_git + "\n")
+
+        self.assertEqual(build_info.head_of(wt), "d"*40)
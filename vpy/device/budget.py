@@ -0,0 +1,292 @@
+"""Uncertainty budgets (the ``Uncertainty`` list of a device) compiled
+to arrays.
+
+A ``Budget`` holds the range limits (converted to the measurement
+unit), the values, the digit uncertainties and the conversion to the
+return unit of all entries. ``total_uncert()`` evaluates the budgets
+of several devices for all measurement points at once. Up to
+``direct_rows`` selected entries (e.g. the temperature device alone)
+the entries are evaluated one by one, gathering the budgets would take
+longer. The results are the same (bit by bit) as the entry by entry
+evaluation ``Device.get_total_uncert()`` did before.
+"""
+import sys
+import numpy as np
+
+## conversion of an entry to the return unit, see Device.convert_to_return_unit()
+OP_NONE = 0
+OP_DIV_MEAS = 1      # u/meas
+OP_ADD = 2           # u + c
+OP_MUL = 3           # u * c
+OP_ADD_MUL_MEAS = 4  # (u + c) * meas
+OP_MUL_MEAS = 5      # u * meas * c
+
+## up to this number of selected entries (of all devices) total_uncert()
+## evaluates entry by entry, see script/bench/total_uncert.py
+direct_rows = 8
+
+class Budget(object):
+    """The ``Uncertainty`` list of the device ``dev`` compiled for the
+    measurement unit ``meas_unit`` and the return unit ``return_unit``.
+
+    :param dev: device with ``uncert_dict``
+    :type dev: vpy.device.device.Device
+    :param meas_unit: unit of the measurement vector
+    :type meas_unit: str
+    :param return_unit: unit of the return values
+    :type return_unit: str
+    """
+    def __init__(self, dev, meas_unit, return_unit):
+        self.dev = dev
+        self.entries = dev.uncert_dict
+        self.meas_unit = meas_unit
+        self.return_unit = return_unit
+        self.selections = {}
+
+        E = len(self.entries)
+        self.lo = np.full(E, np.nan)
+        self.hi = np.full(E, np.nan)
+        self.ranged = np.full(E, False)
+        self.has_val = np.full(E, False)
+        self.val = np.full(E, np.nan)
+        self.val_op = np.full(E, OP_NONE)
+        self.val_conv = np.full(E, np.nan)
+        self.has_digit = np.full(E, False)
+        self.digit = np.full(E, np.nan)
+        self.digit_op = np.full(E, OP_NONE)
+        self.digit_conv = np.full(E, np.nan)
+        self.error = [None] * E
+
+        for e, u_i in enumerate(self.entries):
+            from_val, to_val = dev.convert_range_to_meas_unit(meas_unit, u_i.get('RangeUnit'), u_i.get('From'), u_i.get('To'))
+            if type(from_val) == np.ndarray:
+                from_val = from_val[0]
+            if type(to_val) == np.ndarray:
+                to_val = to_val[0]
+            if from_val and to_val:
+                self.lo[e] = from_val
+                self.hi[e] = to_val
+                self.ranged[e] = True
+
+            u_val = u_i.get('Value')
+            if u_val is not None:
+                self.has_val[e] = True
+                self.val[e] = float(u_val)
+                self.val_op[e], self.val_conv[e], self.error[e] = self.compile_conv(u_i.get('Unit'))
+
+            digit = u_i.get('Resolution')
+            if digit is not None:
+                self.has_digit[e] = True
+                self.digit[e] = digit * 0.29
+                self.digit_op[e], self.digit_conv[e], err = self.compile_conv(meas_unit)
+                self.error[e] = self.error[e] or err
+
+    def compile_conv(self, u_unit):
+        """Returns the operation and the factor converting an entry
+        of the unit ``u_unit`` to the return unit.
+
+        :returns: operation, factor, error message
+        :rtype: tuple
+        """
+        meas_unit, return_unit = self.meas_unit, self.return_unit
+        if not (u_unit and meas_unit and return_unit):
+            return OP_NONE, np.nan, "No uncertainty unit"
+
+        if return_unit == "1" and u_unit != "1" and u_unit == meas_unit:
+            return OP_DIV_MEAS, np.nan, None
+
+        if u_unit != "1":
+            conv = self.dev.Const.get_conv(from_unit=u_unit, to_unit=return_unit)[0]
+            if u_unit == "C" and return_unit == "K":
+                return OP_ADD, conv, None
+            return OP_MUL, conv, None
+
+        conv = self.dev.Const.get_conv(from_unit=meas_unit, to_unit=return_unit)[0]
+        if meas_unit == "C" and return_unit == "K":
+            return OP_ADD_MUL_MEAS, conv, None
+
+        return OP_MUL_MEAS, conv, None
+
+    def select(self, skip_source=None, skip_type=None, take_type_list=None):
+        """Returns the indices of the entries not skipped
+        (see ``Device.check_source_skip()``, ``Device.check_type_skip()``
+        and ``Device.check_take_list()``).
+
+        :returns: indices
+        :rtype: np.array
+        """
+        key = (repr(skip_source), repr(skip_type), repr(take_type_list))
+        if key not in self.selections:
+            dev = self.dev
+            self.selections[key] = np.array([e for e, u_i in enumerate(self.entries)
+                                             if not dev.check_source_skip(u_i, skip_source)
+                                             and not dev.check_type_skip(u_i, skip_type)
+                                             and dev.check_take_list(u_i, take_type_list)], dtype=int)
+
+        return self.selections[key]
+
+def convert_entry(u, op, conv, meas):
+    """Applies the conversion ``op`` with the factor ``conv``.
+    """
+    if op == OP_DIV_MEAS:
+        return u/meas
+    if op == OP_ADD:
+        return u + conv
+    if op == OP_MUL:
+        return u * conv
+    if op == OP_ADD_MUL_MEAS:
+        return (u + conv) * meas
+    if op == OP_MUL_MEAS:
+        return u * meas * conv
+
+    return u
+
+def convert(u, op, conv, meas):
+    """Applies the conversions ``op`` row by row.
+    """
+    for k in set(op.tolist()):
+        if k != OP_NONE:
+            r = op == k
+            u[r] = convert_entry(u[r], k, conv[r, None], meas[r])
+
+    return u
+
+def digit_power(meas):
+    """Returns ``10**floor(log10(abs(meas)))``. The powers are calculated
+    once per exponent in the same way ``Device.cal_abs_digit_uncert()`` does.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exp = np.floor(np.log10(np.abs(meas)))
+        p = np.power(10.0, exp)
+    finite = np.isfinite(exp)
+    if np.any(finite):
+        e_min = int(np.min(exp[finite]))
+        e_max = int(np.max(exp[finite]))
+        table = np.array([10**np.float64(e) for e in range(e_min, e_max + 1)])
+        p[finite] = table[exp[finite].astype(int) - e_min]
+
+    return p
+
+def entry_uncert(budget, e, meas, has_meas):
+    """Returns the uncertainty of the entry ``e`` of the ``budget`` (one
+    row of ``total_uncert()``).
+    """
+    if budget.ranged[e] and has_meas:
+        with np.errstate(invalid="ignore"):
+            mask = (meas > budget.lo[e]) & (meas < budget.hi[e])
+    else:
+        mask = np.full(len(meas), has_meas)
+
+    u = np.full(len(meas), np.nan)
+    if budget.has_val[e]:
+        u[mask] = budget.val[e]
+        u = convert_entry(u, budget.val_op[e], budget.val_conv[e], meas)
+    if budget.has_digit[e]:
+        u = np.where(mask, budget.digit[e] * digit_power(meas), np.nan)
+        u = convert_entry(u, budget.digit_op[e], budget.digit_conv[e], meas)
+
+    return u
+
+def store_uncert(devs, budgets, rows, starts, u, res, return_unit, prefix):
+    """Stores the contributions ``u`` (rows of ``total_uncert()``) in
+    ``res`` (if given).
+    """
+    if res is not None:
+        for i, dev in enumerate(devs):
+            for e, u_e in zip(rows[i], u[starts[i]:starts[i + 1]]):
+                u_i = budgets[i].entries[e]
+                if prefix:
+                    type_name = "{dev}_{u_type}".format(dev=dev.name, u_type=u_i.get('Type'))
+                else:
+                    type_name = "{u_type}".format(u_type=u_i.get('Type'))
+                res.store("Uncertainty", type_name, np.copy(u_e), return_unit, descr=u_i.get("Description"))
+
+def total_uncert(devs, meas_vec, meas_unit, return_unit, res=None, skip_source=None, skip_type=None, take_type_list=None, prefix=True):
+    """Evaluates the uncertainty budgets of the devices ``devs``
+    (see ``Device.get_total_uncert()``) with one pass over all entries
+    of all devices.
+
+    :param devs: devices
+    :type devs: list
+    :param meas_vec: measurement vector (the same for all devices) or
+                     one row per device
+    :type meas_vec: np.array
+
+    :returns: quadratic sum of uncertainties for every device
+    :rtype: list
+    """
+    if len(devs) == 0:
+        return []
+
+    meas_vec = np.asarray(meas_vec)
+    if meas_vec.ndim == 1:
+        meas = np.broadcast_to(meas_vec, (len(devs), len(meas_vec)))
+    else:
+        meas = meas_vec
+    N = np.shape(meas)[1]
+
+    budgets, rows, dev_rows, starts = [], [], [], [0]
+    for i, dev in enumerate(devs):
+        budget = dev.get_budget(meas_unit, return_unit)
+        sel = budget.select(skip_source, skip_type, take_type_list)
+        for e in sel:
+            if budget.error[e] is not None:
+                sys.exit(budget.error[e])
+        budgets.append(budget)
+        rows.append(sel)
+        dev_rows.append(np.full(len(sel), i))
+        starts.append(starts[-1] + len(sel))
+
+    ## range index, see Device.get_match_index()
+    has_meas = np.array([dev.Vals.cnt_nan(meas[i]) > 0 for i in range(len(devs))], dtype=bool)
+    R = starts[-1]
+
+    if R <= direct_rows:
+        u = np.array([entry_uncert(budgets[i], e, meas[i], has_meas[i])
+                      for i in range(len(devs)) for e in rows[i]]).reshape(R, N)
+        store_uncert(devs, budgets, rows, starts, u, res, return_unit, prefix)
+
+        return [dev.Vals.replace_zero_by_nan(dev.Vals.square_array_sum(u[starts[i]:starts[i + 1]]))
+                for i, dev in enumerate(devs)]
+
+    def gather(attr):
+        return np.concatenate([getattr(b, attr)[r] for b, r in zip(budgets, rows)])
+
+    dev_of_row = np.concatenate(dev_rows).astype(int)
+    m = meas[dev_of_row]
+
+    ranged = gather("ranged")
+    with np.errstate(invalid="ignore"):
+        in_range = (m > gather("lo")[:, None]) & (m < gather("hi")[:, None])
+    mask = np.where(ranged[:, None], in_range, True) & has_meas[dev_of_row][:, None]
+
+    u = np.full((R, N), np.nan)
+    has_val = gather("has_val")
+    u = np.where(mask & has_val[:, None], gather("val")[:, None], u)
+    u = convert(u, np.where(has_val, gather("val_op"), OP_NONE), gather("val_conv"), m)
+
+    has_digit = gather("has_digit")
+    if np.any(has_digit):
+        r = np.flatnonzero(has_digit)
+        u[r] = np.where(mask[r], gather("digit")[r, None] * digit_power(m[r]), np.nan)
+        u = convert(u, np.where(has_digit, gather("digit_op"), OP_NONE), gather("digit_conv"), m)
+
+    store_uncert(devs, budgets, rows, starts, u, res, return_unit, prefix)
+
+    if N < 2:
+        ## a reduction over one column may be summed pairwise by numpy
+        return [dev.Vals.replace_zero_by_nan(dev.Vals.square_array_sum(u[starts[i]:starts[i + 1]]))
+                for i, dev in enumerate(devs)]
+
+    ## quadratic sum in the order of Values.square_array_sum(): row by row
+    sq = np.power(u, 2)
+    sq[np.isnan(sq)] = 0.0
+    pos = np.arange(R) - np.asarray(starts[:-1], dtype=int)[dev_of_row]
+    total = np.zeros((len(devs), N))
+    for j in range(int(np.max(pos)) + 1 if R > 0 else 0):
+        r = np.flatnonzero(pos == j)
+        total[dev_of_row[r]] = total[dev_of_row[r]] + sq[r]
+    total = np.sqrt(total)
+    total[total == 0.0] = np.nan
+
+    return list(total)
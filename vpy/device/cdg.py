@@ -1,10 +1,11 @@
 import sys
 import datetime
 import numpy as np
-from scipy.optimize import curve_fit
 from ..device.device import Device
 from ..values import Values, Range, Time
 from ..constants import Constants
+from .. import lazy, piecewise
+optimize = lazy.module("scipy.optimize")
 
 class Cdg(Device):
     unit = "Pa"
@@ -97,7 +98,7 @@ class Cdg(Device):
         p = np.take(p, idx)[0]
         e = np.take(e, idx)[0]
 
-        params, _ = curve_fit(self.e_vis_model, p, e, bounds=self.e_vis_bounds(), maxfev=10000)
+        params, _ = optimize.curve_fit(self.e_vis_model, p, e, bounds=self.e_vis_bounds(), maxfev=10000)
         return params
 
     def __init__(self, doc, dev):
@@ -339,6 +340,8 @@ class Cdg(Device):
         t_ms = [int(t) for t in t_ms]
         ## make elements not in use_idx nan or "":
         if reject_index:
+            ind = np.copy(ind)
+            offset = np.copy(offset)
             for i in reject_index:
                 ind[i] = np.nan
                 offset[i] = np.nan
@@ -455,12 +458,16 @@ class Cdg(Device):
 
 
         if not ok: #Rest
-            u = np.asarray([np.piecewise(p, [p <= 9.5, (p > 9.5 and p <= 35.), (p > 35. and p <= 95.), p > 95.],
-                                            [0.0008,   0.0003,                0.0002,                   0.0001]).tolist() for p in p_list])
+            table = piecewise.find("repeat", type(self), self.doc)
+            u = table(ana.pick("Pressure", "ind_corr", table.unit))
 
         ana.store("Uncertainty", "repeat", u, "1")
 
 
+piecewise.register("Cdg", "repeat", piecewise.Piecewise(
+    [9.5,    35.,    95.],
+    [0.0008, 0.0003, 0.0002, 0.0001]))
+
 class InfCdg(Cdg):
     """Inficon CDGs are usable two decades only
     """
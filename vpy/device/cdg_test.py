@@ -2,7 +2,11 @@ import unittest
 import numpy as np
 import sympy as sym
 import copy
-from vpy.device.cdg import Cdg
+from vpy.device.cdg import Cdg, InfCdg
+from vpy.device import budget
+from vpy.device.budget import total_uncert
+from vpy.device.device import Device
+from scipy.interpolate import interp1d
 
 
 class TestCdg(unittest.TestCase):
@@ -167,3 +171,117 @@ class TestCdg(unittest.TestCase):
         self.assertAlmostEqual(e_3[0], e_0)
         self.assertAlmostEqual(e_3[1], e)
         self.assertAlmostEqual(e_3[2], e_0)
+
+    def test_total_uncert_1(self):
+        """budget with range, relative, absolute and digit contributions;
+        several devices in one pass give the same as one by one
+        """
+        cob = copy.deepcopy(self.cob)
+        cob['CalibrationObject']['Uncertainty'] = [
+            {"Type": "u1", "Value": 1e-3, "Unit": "1", "From": 0.1, "To": 100, "RangeUnit": "Pa"},
+            {"Type": "u2", "Value": 0.5, "Unit": "Pa", "Source": "standard"},
+            {"Type": "u3", "Resolution": 1e-4, "Unit": "Pa"}]
+        cdg = Cdg({}, cob)
+        p = np.array([0.01, 1.0, 50.0, 1000.0, np.nan])
+
+        u = cdg.get_total_uncert(p, "Pa", "Pa")
+        u_1 = np.array([0, 1e-3, 5e-2, 0, 0])
+        u_3 = 1e-4 * 0.29 * np.array([1e-2, 1, 10, 1000, 0])
+        np.testing.assert_allclose(u[:4], np.sqrt(u_1**2 + 0.5**2 + u_3**2)[:4])
+        self.assertAlmostEqual(u[4], 0.5)
+
+        u = cdg.get_total_uncert(p, "Pa", "Pa", skip_source="standard", take_type_list=["u1"])
+        self.assertTrue(np.isnan(u[0]))
+        self.assertAlmostEqual(u[2], 5e-2)
+
+        cob['CalibrationObject']['Uncertainty'] = cob['CalibrationObject']['Uncertainty'][1:]
+        devs = [cdg, Cdg({}, cob)]
+        u_arr = total_uncert(devs, np.array([p, 2*p]), "Pa", "Pa")
+        for i, dev in enumerate(devs):
+            np.testing.assert_array_equal(u_arr[i], dev.get_total_uncert((i + 1)*p, "Pa", "Pa"))
+
+    def test_total_uncert_2(self):
+        """entry by entry evaluation of small budgets gives the same
+        (bit by bit) as the gathered one
+        """
+        cob = copy.deepcopy(self.cob)
+        cob['CalibrationObject']['Uncertainty'] = [
+            {"Type": "u1", "Value": 1e-3, "Unit": "1", "From": 0.1, "To": 100, "RangeUnit": "Pa"},
+            {"Type": "u2", "Value": 0.5, "Unit": "Pa", "Source": "standard"},
+            {"Type": "u3", "Resolution": 1e-4, "Unit": "Pa"},
+            {"Type": "u4", "Value": 2e-3, "Unit": "mbar"}]
+        devs = [Cdg({}, copy.deepcopy(cob)) for _ in range(2)]
+        p = np.array([[0.01, 1.0, 50.0, 1000.0, np.nan, 0.0], [np.nan]*6])
+
+        direct_rows = budget.direct_rows
+        try:
+            budget.direct_rows = 0
+            gathered = total_uncert(devs, p, "Pa", "Pa")
+            budget.direct_rows = 100
+            direct = total_uncert(devs, p, "Pa", "Pa")
+        finally:
+            budget.direct_rows = direct_rows
+        for g, d in zip(gathered, direct):
+            np.testing.assert_array_equal(g.view(np.int64), d.view(np.int64))
+
+    def test_error_interpol_1(self):
+        """kernel gives the interp1d values and is shared between devices
+        """
+        cob = copy.deepcopy(self.cob)
+        cob['CalibrationObject']['Setup'].update({"UseFrom": "1", "UseTo": "100", "UseUnit": "Pa"})
+        cob['CalibrationObject']['Interpol'] = [{"Type": "p_ind", "Unit": "Pa", "Value": [0.9, 10, 2, 101]},
+                                                {"Type": "e", "Unit": "1", "Value": [1e-3, 3e-3, 2e-3, 1e-2]}]
+        p = np.array([0.5, 1.5, 2, 50, np.nan, 99.9])
+        e = interp1d([0.9, 10, 2, 101], [1e-3, 3e-3, 2e-3, 1e-2], kind="linear")(p[[1, 2, 3, 5]])
+
+        Device.share_interpol_kernels()
+        try:
+            cdg_1 = Cdg({}, copy.deepcopy(cob))
+            cdg_2 = Cdg({}, copy.deepcopy(cob))
+            e_1 = cdg_1.get_error_interpol(p, "Pa")
+            e_2 = cdg_2.get_error_interpol(p, "Pa")
+        finally:
+            Device.share_interpol_kernels(False)
+
+        np.testing.assert_array_equal(e_1[[1, 2, 3, 5]], e)
+        self.assertTrue(np.isnan(e_1[0]) and np.isnan(e_1[4]))
+        np.testing.assert_array_equal(e_1, e_2)
+        self.assertIs(cdg_1.error_kernel, cdg_2.error_kernel)
+
+    def test_shared_1(self):
+        """one device per calibration object revision and constants
+        """
+        cob = copy.deepcopy(self.cob)
+        cob['CalibrationObject']['Setup']['TypeHead'] = '1Torr'
+        cob['CalibrationObject']['Device']['Producer'] = 'MKS Inc.'
+        doc = {"Calibration": {"Constants": {"_id": "c", "_rev": "1-a", "Conversion": []}}}
+        cob["_id"], cob["_rev"] = "x", "1-a"
+
+        cdg_1 = Cdg.shared(doc, cob)
+        self.assertIs(Cdg.shared(doc, copy.deepcopy(cob)), cdg_1)
+        self.assertIsNot(Cdg.shared(doc, dict(cob, _rev="2-a")), cdg_1)
+        self.assertIsNot(Cdg.shared({}, cob), cdg_1)
+        self.assertIsNot(InfCdg.shared(doc, cob), cdg_1)
+
+        del cob["_rev"]
+        cdg_2 = Cdg.shared({}, cob)
+        self.assertIs(Cdg.shared({}, copy.deepcopy(cob)), cdg_2)
+        cob['CalibrationObject']['Setup']['TypeHead'] = '10Torr'
+        self.assertIsNot(Cdg.shared({}, cob), cdg_2)
+
+    def test_shared_2(self):
+        """the least recently used device is dropped beyond max_shared_devices
+        """
+        cob = copy.deepcopy(self.cob)
+        cob['CalibrationObject']['Setup']['TypeHead'] = '1Torr'
+        cob['CalibrationObject']['Device']['Producer'] = 'MKS Inc.'
+        devices, max_devices = Device.shared_devices, Device.max_shared_devices
+        Device.shared_devices, Device.max_shared_devices = None, 2
+        try:
+            Device.share_devices()
+            cdg = [Cdg.shared({}, dict(cob, _id="x", _rev="{}-a".format(i))) for i in range(3)]
+            self.assertEqual(len(Device.shared_devices), 2)
+            self.assertIs(Cdg.shared({}, dict(cob, _id="x", _rev="2-a")), cdg[2])
+            self.assertIsNot(Cdg.shared({}, dict(cob, _id="x", _rev="0-a")), cdg[0])
+        finally:
+            Device.shared_devices, Device.max_shared_devices = devices, max_devices
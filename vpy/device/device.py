@@ -1,10 +1,13 @@
 import sys
 import numpy as np
+from collections import OrderedDict
 from ..document import Document
 from ..values import Values, Pressure, AuxValues, Range
 from ..constants import Constants
 from ..todo import ToDo
-from scipy.interpolate import interp1d
+from .budget import Budget, total_uncert
+from .interpol import Interpol, kernel_key
+from .registry import device_key
 
 class Device(Document):
     """ Class should be complete with
@@ -13,6 +16,9 @@ class Device(Document):
 
     range_extend = 0.005 # relativ
     interpol_pressure_points = np.logspace(-3, 5, num=81) # Pa
+    interpol_kernels = None # shared kernels by key, see share_interpol_kernels()
+    shared_devices = OrderedDict() # devices by key, least recently used first, see shared()
+    max_shared_devices = 256
 
     def __init__(self, doc, dev):
 
@@ -28,14 +34,101 @@ class Device(Document):
 
         if "Uncertainty" in dev:
             self.uncert_dict = dev.get('Uncertainty')
+        self.budgets = {}
+        self.error_kernel = None
 
         self.name = dev.get("Name")
         self.dev_class = dev.get("Class")
 
         super().__init__(dev)
 
+    @classmethod
+    def share_interpol_kernels(cls, share=True):
+        """Switches the sharing of the interpolation kernels of
+        ``get_error_interpol()`` between all devices (e.g. of a batch of
+        documents) on or off. The kernels are shared by ``_id`` and
+        ``_rev`` of the calibration object (see ``kernel_key()``).
+        Kernels already shared are kept.
+        """
+        if not share:
+            cls.interpol_kernels = None
+        elif cls.interpol_kernels is None:
+            cls.interpol_kernels = {}
+
+    @classmethod
+    def share_devices(cls, share=True):
+        """Switches the sharing of the devices built by ``shared()``
+        on or off. Sharing is on by default. Devices already shared are
+        kept.
+        """
+        if not share:
+            Device.shared_devices = None
+        elif Device.shared_devices is None:
+            Device.shared_devices = OrderedDict()
+
+    @classmethod
+    def shared(cls, doc, dev):
+        """Returns the device of the class built from ``doc`` and
+        ``dev``. The device is built once per calibration object (and
+        constants) and shared by all callers of the process
+        (e.g. ``Cal`` and ``Uncert`` of a document or the documents of
+        a batch), see ``vpy.device.registry.device_key()``. Shared
+        devices must not be changed by the callers. At most
+        ``max_shared_devices`` devices are kept; the least recently
+        used one is dropped first.
+
+        :param doc: calibration document
+        :type doc: dict
+        :param dev: calibration object or customer object
+        :type dev: dict
+
+        :returns: device
+        :rtype: vpy.device.device.Device
+        """
+        devices = Device.shared_devices
+        if devices is None:
+            return cls(doc, dev)
+
+        key = device_key(cls, doc, dev)
+        device = devices.get(key)
+        if device is None:
+            device = cls(doc, dev)
+            devices[key] = device
+            while len(devices) > Device.max_shared_devices:
+                devices.popitem(last=False)
+        else:
+            devices.move_to_end(key)
+
+        return device
+
     def interp_function(self, x, y):
-        return interp1d(x, y, kind="linear")
+        return Interpol(x, y)
+
+    def get_error_kernel(self):
+        """Returns the interpolation kernel for ``self.interpol_e`` vs.
+        ``self.interpol_p``. The kernel is built on the first call (or
+        taken from the shared kernels).
+
+        :returns: kernel
+        :rtype: vpy.device.interpol.Interpol
+        """
+        kernel = self.error_kernel
+        if kernel is not None and kernel.src[0] is self.interpol_p and kernel.src[1] is self.interpol_e:
+            return kernel
+
+        shared = Device.interpol_kernels
+        if shared is not None:
+            key = kernel_key(self.doc, self.interpol_p, self.interpol_e)
+            kernel = shared.get(key)
+            if kernel is None or not kernel.same_source(self.interpol_p, self.interpol_e):
+                kernel = self.interp_function(self.interpol_p, self.interpol_e)
+                shared[key] = kernel
+        else:
+            kernel = self.interp_function(self.interpol_p, self.interpol_e)
+
+        self.error_kernel = kernel
+
+        return kernel
 
     def get_error_interpol(self, p_interpol, unit_interpol, p_target=None, unit_target=None):
         """
@@ -64,7 +157,7 @@ class Device(Document):
         else:
             conv_target = self.Const.get_conv(unit_target, self.unit)
 
-        f_e = self.interp_function(self.interpol_p, self.interpol_e)
+        f_e = self.get_error_kernel()
 
         idx = (p_target*conv_target > self.interpol_min) & (p_target*conv_target < self.interpol_max)
         odx = (p_interpol*conv_target > self.interpol_min) & (p_interpol*conv_target < self.interpol_max)
@@ -255,58 +348,32 @@ class Device(Document):
 
         """
 
-        uncert_arr = []
-        if "uncert_dict" in self.__dict__:
-            u_dict = self.uncert_dict
-
-            for u_i in u_dict:
-                if self.check_source_skip(u_i, skip_source):
-                    continue
-
-                if self.check_type_skip(u_i, skip_type):
-                    continue
+        return total_uncert([self], meas_vec, meas_unit, return_unit, res=res, skip_source=skip_source,
+                            skip_type=skip_type, take_type_list=take_type_list, prefix=prefix)[0]
 
-                if not self.check_take_list(u_i, take_type_list):
-                    continue
+    def get_budget(self, meas_unit, return_unit):
+        """Returns the uncertainty budget compiled for the given units.
+        The budget is compiled on the first call and again if
+        ``self.uncert_dict`` is replaced.
 
-                u = np.full(np.shape(meas_vec)[0], np.nan)
-
-                u_val = u_i.get('Value')
-                digit = u_i.get('Resolution')
-
-                range_unit = u_i.get('RangeUnit')
-                from_val = u_i.get('From')
-                to_val = u_i.get('To')
-                u_unit = u_i.get('Unit')
-                u_type = u_i.get('Type')
-                u_descr = u_i.get("Description")
-
-                from_val, to_val = self.convert_range_to_meas_unit(meas_unit, range_unit, from_val, to_val)
-                range_index = self.get_match_index(meas_vec, from_val, to_val)
-
-                if u_val is not None:
-                    u[range_index] = float(u_val)
-                    u, return_unit = self.convert_to_return_unit( u, u_unit, meas_vec, meas_unit, return_unit)
-
-                if digit is not None:
-                    u[range_index] = self.cal_abs_digit_uncert(meas_vec[range_index], digit)
-                    u, return_unit = self.convert_to_return_unit( u, meas_unit, meas_vec, meas_unit, return_unit)
+        :param  meas_unit: unit of the measurement vector
+        :type  meas_unit: str
 
-                uncert_arr.append( u )
-                if prefix:
-                    type_name="{dev}_{u_type}".format(dev=self.name, u_type=u_type)
-                else:
-                    type_name="{u_type}".format(u_type=u_type)
+        :param return_unit: unit of the return values
+        :type return_unit: str
 
-                if res is not None:
-                    res.store("Uncertainty", type_name, u, return_unit, descr=u_descr)
+        :returns: budget
+        :rtype: vpy.device.budget.Budget
+        """
+        if "uncert_dict" not in self.__dict__:
+            sys.exit("No uncertainty dict available")
 
-            uncert_total = self.Vals.square_array_sum(uncert_arr)
-            uncert_total = self.Vals.replace_zero_by_nan(uncert_total)
+        budget = self.budgets.get((meas_unit, return_unit))
+        if budget is None or budget.entries is not self.uncert_dict:
+            budget = Budget(self, meas_unit, return_unit)
+            self.budgets[(meas_unit, return_unit)] = budget
 
-            return uncert_total
-        else:
-            sys.exit("No uncertainty dict available")
+        return budget
 
     def cal_abs_digit_uncert(self, meas_vec, digit):
         exp = np.floor(np.log10(np.abs(meas_vec)))
@@ -475,6 +542,8 @@ class Device(Document):
         offset = ana.pick("Pressure", "offset", ana.pressure_unit)
 
         if reject_index:
+            ind = np.copy(ind)
+            offset = np.copy(offset)
             for i in reject_index:
                 ind[i] = np.nan
                 offset[i] = np.nan
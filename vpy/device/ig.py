@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sym
 from ..device.device import Device
 from ..constants import Constants
+from .. import lazy
+sym = lazy.module("sympy")
 
 class Ig(Device):
     rel_repeat_uncert = 0.008
@@ -33,6 +34,8 @@ class Ig(Device):
         offset = ana.pick("Pressure", "ind_offset", ind_unit)
 
         if reject_index:
+            ind = np.copy(ind)
+            offset = np.copy(offset)
             for i in reject_index:
                 ind[i] = np.nan
                 offset[i] = np.nan
@@ -0,0 +1,65 @@
+"""Piecewise linear interpolation kernels.
+
+``Interpol`` gives the same values as
+``scipy.interpolate.interp1d(x, y, kind="linear")`` (which delegates
+to ``np.interp()`` for one dimensional float data): the points are
+sorted and checked once, a call only needs ``np.interp()``.
+"""
+import hashlib
+import numpy as np
+
+class Interpol(object):
+    """Interpolation kernel for ``y`` vs. ``x``.
+
+    :param x: x values (need not be sorted)
+    :type x: np.array
+    :param y: y values
+    :type y: np.array
+    """
+    def __init__(self, x, y):
+        self.src = (x, y)
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        ind = np.argsort(x, kind="mergesort")
+        self.x = x[ind]
+        self.y = y[ind]
+
+    def __call__(self, x_new):
+        """Returns the interpolated values. Raises a ``ValueError`` for
+        values out of the interpolation range (as ``interp1d`` does).
+
+        :param x_new: values to interpolate at
+        :type x_new: np.array
+
+        :returns: interpolated values
+        :rtype: np.array
+        """
+        x_new = np.asarray(x_new, dtype=float)
+        if (x_new < self.x[0]).any():
+            raise ValueError("A value in x_new is below the interpolation range.")
+        if (x_new > self.x[-1]).any():
+            raise ValueError("A value in x_new is above the interpolation range.")
+
+        return np.interp(x_new, self.x, self.y)
+
+    def same_source(self, x, y):
+        """Checks if the kernel has been built from ``x`` and ``y``.
+        """
+        return (self.src[0] is x and self.src[1] is y) or (np.array_equal(self.src[0], x) and np.array_equal(self.src[1], y))
+
+def kernel_key(doc, x, y):
+    """Returns the key of the kernel for the (calibration object)
+    document ``doc``: ``_id`` and ``_rev`` if available, otherwise a hash
+    of the points.
+
+    :returns: key
+    :rtype: tuple
+    """
+    if doc.get("_id") and doc.get("_rev"):
+        return doc["_id"], doc["_rev"]
+
+    h = hashlib.sha1(np.asarray(x, dtype=float).tobytes())
+    h.update(np.asarray(y, dtype=float).tobytes())
+
+    return "sha1", h.hexdigest()
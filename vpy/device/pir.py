@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sym
 from ..device.device import Device
 from ..constants import Constants
+from .. import lazy
+sym = lazy.module("sympy")
 
 class Pir(Device):
     rel_repeat_uncert = 0.008
@@ -42,6 +43,8 @@ class Pir(Device):
         offset = ana.pick("Pressure", "offset", ana.pressure_unit)
 
         if reject_index:
+            ind = np.copy(ind)
+            offset = np.copy(offset)
             for i in reject_index:
                 ind[i] = np.nan
                 offset[i] = np.nan
@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sym
 from ..device.device import Device
 from ..constants import Constants
+from .. import lazy
+sym = lazy.module("sympy")
 
 class Qbs(Device):
     unit = "Pa"
@@ -75,6 +76,8 @@ class Qbs(Device):
         offset = ana.pick("Pressure", "offset", ana.pressure_unit)
 
         if reject_index:
+            ind = np.copy(ind)
+            offset = np.copy(offset)
             for i in reject_index:
                 ind[i] = np.nan
                 offset[i] = np.nan
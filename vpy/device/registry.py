@@ -0,0 +1,61 @@
+"""Keys of the devices shared by ``Device.shared()``.
+
+A device depends on its calibration (or customer) object, on the
+constants of the document (unit conversions) and on its class only.
+Objects with ``_id`` and ``_rev`` are identified by the revision,
+all others (e.g. the objects of a base document assembled from views)
+by a hash of their content. Changing an object therefore leads to a
+new device.
+"""
+import hashlib
+import pickle
+
+def object_key(obj):
+    """Returns ``(_id, _rev)`` of the object or the sha1 of its content.
+
+    :param obj: calibration object, customer object or constants
+    :type obj: dict
+
+    :returns: key
+    :rtype: tuple or str
+    """
+    if obj is None:
+        return None
+    if "_id" in obj and "_rev" in obj:
+        return (obj["_id"], obj["_rev"])
+
+    return hashlib.sha1(pickle.dumps(obj, protocol=4)).hexdigest()
+
+def constants_of(doc):
+    """Returns the constants used by ``Constants(doc)`` or ``None``
+    (fall back constants).
+
+    :param doc: calibration document
+    :type doc: dict
+
+    :returns: constants
+    :rtype: dict
+    """
+    if 'Calibration' in doc:
+        doc = doc['Calibration']
+
+    if 'State' in doc:
+        doc = doc['State']
+
+    return doc.get('Constants') or None
+
+def device_key(cls, doc, dev):
+    """Returns the key of the device of the class ``cls`` built from
+    the document ``doc`` and the object ``dev``.
+
+    :param cls: device class e.g. ``InfCdg``
+    :type cls: type
+    :param doc: calibration document
+    :type doc: dict
+    :param dev: calibration object or customer object
+    :type dev: dict
+
+    :returns: key
+    :rtype: tuple
+    """
+    return (cls.__module__, cls.__qualname__, object_key(dev), object_key(constants_of(doc)))
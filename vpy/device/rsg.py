@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sym
 from ..device.device import Device
 from ..constants import Constants
+from .. import lazy
+sym = lazy.module("sympy")
 
 class Rsg(Device):
     rel_repeat_uncert = 8e-5
@@ -2,6 +2,7 @@ import sys
 import numpy as np
 from .device import Device
 from ..constants import Constants
+from ..grouping import index_between
 
 class Srg(Device):
     """ SRG
@@ -27,11 +28,10 @@ class Srg(Device):
         """
         if unit != self.unit:
             sys.exit("implement me!")
-        N = len(p_cal)
         min_p = self.sigma_min_pressure
         max_p = self.sigma_max_pressure
 
-        return [[i] for i in range(N) if p_cal[i] > min_p and p_cal[i] < max_p]
+        return [[i] for i in index_between(p_cal, min_p, max_p)[0].tolist()]
 
     def dcr_conversion(self, unit="Pa", gas="N2"):
         """
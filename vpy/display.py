@@ -4,12 +4,13 @@ import subprocess
 import copy
 import numpy as np
 from .document import Document
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
 from .analysis import Analysis
 from .todo import ToDo
 from .values import Values
 from .constants import Constants
+from . import lazy
+plt = lazy.module("matplotlib.pyplot")
+optimize = lazy.module("scipy.optimize")
 
 
 class Display:
@@ -121,7 +122,7 @@ class Display:
         unc = np.asarray(unc, dtype=float)
         unc = unc / 2 * self.Cons.get_conv(unc_unit, "%") #k=1
 
-        para_val, covariance = curve_fit(model, pcal, error, bounds=([0, 0, 0, -np.inf], [np.inf, np.inf, np.inf, np.inf]), maxfev=1000)
+        para_val, covariance = optimize.curve_fit(model, pcal, error, bounds=([0, 0, 0, -np.inf], [np.inf, np.inf, np.inf, np.inf]), maxfev=1000)
         residuals = model(pcal, *para_val) - error
         para_unc = np.sqrt(np.diag(covariance))
 
@@ -3,14 +3,15 @@ import time
 import subprocess
 import copy
 import numpy as np
-from scipy.optimize import curve_fit
-import matplotlib.pyplot as plt
 
 from ..document import Document
 from ..analysis import Analysis
 from ..todo import ToDo
 from ..values import Values
 from ..constants import Constants
+from .. import lazy
+optimize = lazy.module("scipy.optimize")
+plt = lazy.module("matplotlib.pyplot")
 
 
 class Display:
@@ -1,9 +1,48 @@
+import re
 import sys
 import copy
 import numpy as np
-import sympy as sym
+from . import lazy, timing
+sym = lazy.module("sympy")
+
+def sympify(value):
+    """Returns ``sym.sympify(value)``. The expressions of strings and
+    numbers are kept per process (sympy expressions are immutable).
+    """
+    if not isinstance(value, (str, int, float)):
+        return sym.sympify(value)
+    key = (type(value), value)
+    expr = expressions.get(key)
+    if expr is None:
+        expr = sym.sympify(value)
+        expressions[key] = expr
+
+    return expr
+
+expressions = {}
 
 class Document(object):
+    """Wraps a (CouchDB) document and provides search and extract methods.
+
+    The document is not copied on initialisation. All instances built from
+    the same document share it and treat it as immutable. Methods writing to
+    the document get a private copy by means of ``writable()`` (copy on
+    write).
+
+    Lookups by ``Type`` (the vast majority of all lookups) are answered from
+    an index which is built on first use by a single traversal of the
+    document. The index maps the value of ``Type`` to the first object
+    found in the same (depth first) order ``get_object()`` uses. Methods
+    writing to ``self.doc`` have to call ``invalidate_index()``.
+    """
+    index_key = "Type"
+
+    def __init_subclass__(cls, **kwargs):
+        """Classes derived while timing is enabled are timed as well
+        (see ``vpy.timing``).
+        """
+        super().__init_subclass__(**kwargs)
+        timing.instrument_class(cls)
 
     def __init__(self, doc):
         """Initialisation of Document class.
@@ -11,7 +50,71 @@ class Document(object):
         :param doc: doc document to search and extract from
         :type doc: dict
         """
-        self.doc = copy.deepcopy(doc)
+        self.doc = doc
+        self.doc_owned = False
+        self.invalidate_index()
+
+    def writable(self):
+        """Returns ``self.doc`` for writing. The shared document is
+        copied on the first call.
+
+        :returns: doc
+        :rtype: dict
+        """
+        if not self.doc_owned:
+            self.doc = copy.deepcopy(self.doc)
+            self.doc_owned = True
+            self.invalidate_index()
+
+        return self.doc
+
+    def invalidate_index(self):
+        """Drops the ``Type`` index. The index is rebuilt on the next lookup.
+        """
+        self._index = None
+        self._index_doc = None
+
+    def build_index(self, obj, index):
+        """Collects the first object for every value of ``self.index_key``.
+        The objects are visited in the same order as in ``get_object()``.
+
+        :param obj: obj to traverse
+        :type obj: dict|list
+
+        :param index: index to fill
+        :type index: dict
+        """
+        if isinstance(obj, dict):
+            if self.index_key in obj:
+                value = obj[self.index_key]
+                if isinstance(value, str) and value not in index:
+                    index[value] = obj
+            for v in obj.values():
+                if isinstance(v, (dict, list)):
+                    self.build_index(v, index)
+
+        if isinstance(obj, list):
+            for l in obj:
+                if isinstance(l, (dict, list)):
+                    self.build_index(l, index)
+
+        return index
+
+    def get_index(self):
+        """Returns the ``Type`` index of ``self.doc``. The index is
+        (re)built if missing or if ``self.doc`` has been replaced.
+
+        :returns: index
+        :rtype: dict
+        """
+        index = getattr(self, "_index", None)
+        if index is None or getattr(self, "_index_doc", None) is not self.doc:
+            index = self.build_index(self.doc, {})
+            self._index = index
+            self._index_doc = self.doc
+            self._channel_matrices = {}
+
+        return index
 
     def get_all(self):
         """Returns the entire document
@@ -59,6 +162,47 @@ class Document(object):
 
         return ret
 
+    def get_channel_matrix(self, prefix, sufix, unit):
+        """Collects the values of all types ``<prefix><channel><sufix>``
+        (e.g. ``ch_1001_before`` ... ``ch_3030_before``) in one pass
+        over the ``Type`` index. Types with another unit are left out
+        (``get_value()`` of such a type exits). The result is kept as
+        long as the index is valid; do not change the returned array.
+
+        :param prefix: prefix of the type
+        :type prefix: str
+        :param sufix: sufix of the type
+        :type sufix: str
+        :param unit: unit of the values
+        :type unit: str
+
+        :returns: channels (as in the types) and array with one row per
+                  channel (``None`` if the values differ in length)
+        :rtype: list, np.array
+        """
+        index = self.get_index()
+        key = (prefix, sufix, unit)
+        if key in self._channel_matrices:
+            return self._channel_matrices[key]
+
+        pattern = re.compile("{}([0-9]+){}".format(re.escape(prefix), re.escape(sufix)))
+        found = []
+        for t, obj in index.items():
+            m = pattern.fullmatch(t)
+            if m and obj.get("Unit", unit) == unit:
+                found.append((int(m.group(1)), m.group(1), t, obj))
+        found.sort()
+
+        channels = [f[1] for f in found]
+        rows = [self.get_value(t, unit, obj) for _, _, t, obj in found]
+        if not rows or any(r is None for r in rows) or len({len(r) for r in rows}) != 1:
+            ret = (channels, None)
+        else:
+            ret = (channels, np.array(rows))
+        self._channel_matrices[key] = ret
+
+        return ret
+
     def get_value_and_unit(self, d_type, with_stats=False):
         """Intended use for this method: **extracting values when unit is unknown**.
         Searches ``dict`` by means of method ``get_object()`` and extracts the unit.
@@ -108,10 +252,10 @@ class Document(object):
             if "Unit" in  obj:
                 if obj["Unit"] == unit:
                     if "Expression" in obj:
-                        ret = sym.sympify(obj["Expression"])
+                        ret = sympify(obj["Expression"])
 
                     if "Value" in obj:
-                        ret = sym.sympify(obj["Value"])
+                        ret = sympify(obj["Value"])
                 else:
 
                     sys.exit("Unit is {} not {}".format(obj["Unit"], unit))
@@ -248,6 +392,11 @@ class Document(object):
         """Recursive  searches obj for
         ''obj[key] == val'' and returns obj
 
+        .. note::
+
+            The returned object is not a copy but a view into the
+            document. Copy it before changing it.
+
         :param key: key to search for
         :type key: str
 
@@ -259,9 +408,11 @@ class Document(object):
         """
 
         if o:
-            obj = copy.deepcopy(o)
+            obj = o
         else:
-            obj = copy.deepcopy(self.doc)
+            if key == self.index_key and isinstance(value, str):
+                return self.get_index().get(value)
+            obj = self.doc
 
         if isinstance(obj, dict):
             if key in obj and obj[key] == value:
@@ -143,6 +143,25 @@ class TestDocument(unittest.TestCase):
         self.assertEqual(np.shape(res), (3, 3))
 
 
+    def test_get_channel_matrix_1(self):
+        """Should return the rows of all channels in channel order, same as get_array().
+        """
+        channels, res = self.Doc.get_channel_matrix("b_", "", "s")
+        self.assertEqual(channels, ["1", "2", "3"])
+        self.assertTrue(np.array_equal(res, self.Doc.get_array("b_", (1,2,3), "", "s")))
+        self.assertIs(self.Doc.get_channel_matrix("b_", "", "s")[1], res)
+        self.assertEqual(self.Doc.get_channel_matrix("x_", "", "s"), ([], None))
+
+    def test_get_channel_matrix_2(self):
+        """Should leave out channels with an other unit.
+        """
+        doc = Document({"Values": [{"Type": "b_1", "Value": [1, 2], "Unit": "s"},
+                                   {"Type": "b_2", "Value": [3, 4], "Unit": "ms"},
+                                   {"Type": "b_3", "Value": [5, 6], "Unit": "s"}]})
+        channels, res = doc.get_channel_matrix("b_", "", "s")
+        self.assertEqual(channels, ["1", "3"])
+        self.assertTrue(np.array_equal(res, doc.get_array("b_", (1, 3), "", "s")))
+
     def test_get_expression_1(self):
         """Should return a sympy Expression
         """
@@ -155,3 +174,21 @@ class TestDocument(unittest.TestCase):
         val, unit = self.Doc.get_value_and_unit("a")
         self.assertTrue(len(val) == 3)
         self.assertTrue(unit == "s")
+
+    def test_get_object_7(self):
+        """first match (depth first) wins if a Type occurs more than once
+        """
+        doc = Document({'A': {'Type': 'x', 'Value': [1]},
+                        'B': [{'Type': 'x', 'Value': [2]}]})
+        res = doc.get_object('Type', 'x')
+        self.assertEqual(res['Value'], [1])
+
+    def test_get_object_8(self):
+        """index follows replacement of self.doc
+        """
+        res = self.Doc.get_object('Type', 'a')
+        self.assertEqual(res['Unit'], 's')
+
+        self.Doc.doc = {'Type': 'a', 'Unit': 'm'}
+        res = self.Doc.get_object('Type', 'a')
+        self.assertEqual(res['Unit'], 'm')
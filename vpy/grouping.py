@@ -0,0 +1,121 @@
+"""Grouping of measurement points by means of sorting and
+``np.searchsorted()``. Used for the generation of the average
+index (``ToDo``), the sigma index (``Srg``) and the range index
+(``Analysis``).
+
+All functions return (lists of) lists of indices in ascending order
+as the former nested loops did.
+"""
+import numpy as np
+
+def sort_values(values):
+    """Returns the values as float array, the indices sorting them and
+    the sorted values (``nan`` at the end).
+
+    :param values: values to sort
+    :type values: np.array|list
+
+    :returns: values, order, sorted values
+    :rtype: np.array, np.array, np.array
+    """
+    values = np.asarray(values, dtype=float)
+    order = np.argsort(values, kind="stable")
+
+    return values, order, values[order]
+
+def index_between(values, lower, upper):
+    """Returns the indices ``i`` with ``lower[k] < values[i] < upper[k]``
+    for every ``k``.
+
+    :param values: values to search in
+    :type values: np.array|list
+    :param lower: lower (excluded) limits
+    :type lower: np.array|list|float
+    :param upper: upper (excluded) limits
+    :type upper: np.array|list|float
+
+    :returns: list of index arrays
+    :rtype: list
+    """
+    values, order, sorted_values = sort_values(values)
+    lower = np.atleast_1d(np.asarray(lower, dtype=float))
+    upper = np.atleast_1d(np.asarray(upper, dtype=float))
+
+    left = np.searchsorted(sorted_values, lower, side="right")
+    right = np.searchsorted(sorted_values, upper, side="left")
+
+    return [np.sort(order[l:r]) if r > l else np.array([], dtype=int) for l, r in zip(left, right)]
+
+def index_by_rel_dev(values, centers, max_dev):
+    """Returns the indices ``i`` with ``abs(values[i]/centers[k] - 1) < max_dev``
+    for every ``k``. The candidates are found by means of a
+    slightly widened window; the condition above is checked exactly
+    afterwards.
+
+    :param values: values to group
+    :type values: np.array|list
+    :param centers: values to group around (e.g. target pressures)
+    :type centers: np.array|list
+    :param max_dev: maximal relative deviation
+    :type max_dev: float
+
+    :returns: list of lists of indices
+    :rtype: list
+    """
+    values, order, sorted_values = sort_values(values)
+    centers = np.asarray(centers, dtype=float)
+
+    a = centers * (1.0 - max_dev)
+    b = centers * (1.0 + max_dev)
+    margin = np.abs(centers) * 1e-12
+    lower = np.minimum(a, b) - margin
+    upper = np.maximum(a, b) + margin
+
+    left = np.searchsorted(sorted_values, lower, side="left")
+    right = np.searchsorted(sorted_values, upper, side="right")
+
+    r = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for i, center in enumerate(centers):
+            if np.isfinite(lower[i]) and np.isfinite(upper[i]):
+                idx = np.sort(order[left[i]:right[i]])
+            else:
+                idx = np.arange(len(values))
+            idx = idx[np.abs(values[idx] / center - 1) < max_dev]
+            r.append(idx.tolist())
+
+    return r
+
+def gather_by_first(idx, values, match):
+    """Gathers the indices ``idx`` in groups. Every index joins the
+    group of the first representative it matches; indices matching
+    no representative start a new group. The groups are returned in
+    the order of their representatives.
+
+    :param idx: indices to gather (may contain duplicates)
+    :type idx: list
+    :param values: values belonging to the indices
+    :type values: np.array|list
+    :param match: ``match(values[idx], values[rep])`` returns a bool array
+    :type match: function
+
+    :returns: list of lists of indices
+    :rtype: list
+    """
+    idx = np.asarray(idx, dtype=int)
+    v = np.asarray(values)[idx]
+    free = np.ones(len(idx), dtype=bool)
+    groups = {}
+
+    k = 0
+    while k < len(idx):
+        # all indices before k are gathered already
+        free[k] = False
+        m = free[k:] & np.asarray(match(v[k:], v[k]), dtype=bool)
+        free[k:] = free[k:] & ~m
+        groups[int(idx[k])] = [int(idx[k])] + idx[k:][m].tolist()
+
+        rest = np.flatnonzero(free[k:])
+        k = k + int(rest[0]) if len(rest) > 0 else len(idx)
+
+    return list(groups.values())
@@ -0,0 +1,29 @@
+import unittest
+import numpy as np
+from .grouping import index_by_rel_dev, index_between, gather_by_first
+
+
+class TestGrouping(unittest.TestCase):
+
+    def test_index_by_rel_dev_1(self):
+        """points are grouped around the targets in ascending order
+        """
+        cal = [1.0, 2.04, np.nan, 0.96, 1.92, 2.0]
+        self.assertEqual(index_by_rel_dev(cal, [1.0, 2.0], 0.05), [[0, 3], [1, 4, 5]])
+
+    def test_index_by_rel_dev_2(self):
+        """the limit is excluded
+        """
+        self.assertEqual(index_by_rel_dev([1.5, 0.5], [1.0], 0.5), [[]])
+
+    def test_index_between_1(self):
+        """nan and the limits are excluded
+        """
+        idx = index_between([0.5, 0.1, np.nan, 1.0, 0.2], 0.1, 1.0)
+        self.assertEqual(idx[0].tolist(), [0, 4])
+
+    def test_gather_by_first_1(self):
+        """indices join the group of the first matching representative
+        """
+        rn = ["a", "b", "a", "c", "b"]
+        self.assertEqual(gather_by_first([0, 1, 2, 3, 4], rn, lambda r, r_j: r == r_j), [[0, 2], [1, 4], [3]])
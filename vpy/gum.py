@@ -0,0 +1,541 @@
+"""Propagation of uncertainties (GUM, uncorrelated input quantities).
+
+A ``Propagation`` holds a model ``y = f(x_1, ..., x_n)`` either as a
+sympy expression or as a function of numpy arrays. The sensitivity
+coefficients are
+
+* derived and compiled once (sympy expression, see ``vpy.model``),
+* given explicitly (``sens``) or
+* central finite differences (function) computed by one call of the
+  model with all inputs perturbed at once.
+
+``contributions()`` returns the products of the sensitivity
+coefficients with the standard uncertainties of the inputs for all
+measurement points, ``total()`` additionally their quadratic sum.
+"""
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from . import model as compiler
+from . import lazy
+sym = lazy.module("sympy")
+
+def quadratic_sum(u, square=np.power):
+    """Returns ``sqrt(u_1^2 + u_2^2 + ...)``. The squares are summed
+    in the order of ``u``.
+
+    :param u: contributions
+    :type u: list
+    :param square: squares the contributions: ``np.power`` (``np.power(u, 2)``)
+                   or ``np.square`` (``u**2``); both differ in the last bit
+    :type square: function
+
+    :returns: quadratic sum
+    :rtype: np.array
+    """
+    total = None
+    for u_i in u:
+        sq = square(u_i, 2) if square is np.power else square(u_i)
+        total = sq if total is None else total + sq
+
+    return np.sqrt(total)
+
+class Propagation(object):
+    """Propagation of uncertainties through the model ``model``.
+
+    :param args: names of the input quantities in the order of the
+                 arguments of the model
+    :type args: tuple
+    :param model: sympy expression or function of the inputs
+    :type model: sym.Expr or function
+    :param sens: sensitivity coefficients by name of the input
+                 (functions of the inputs); take precedence over
+                 derived ones
+    :type sens: dict
+    :param step: relative step of the finite differences
+    :type step: float
+    """
+    def __init__(self, args, model, sens=None, step=1e-7):
+        self.args = tuple(args)
+        self.model = model
+        self.sens = sens or {}
+        self.step = step
+        self.symbolic = lazy.is_sympy(model)
+
+    def values(self, x):
+        """Returns the inputs as list in the order of ``self.args``.
+
+        :param x: inputs by name or list
+        :type x: dict or list
+        """
+        if isinstance(x, dict):
+            return [x[a] for a in self.args]
+
+        return list(x)
+
+    def compile(self, table):
+        """Returns the function of the inputs computing the terms of
+        ``table`` (sensitivity coefficient times uncertainty expression)
+        in one call; built once per model and table.
+        """
+        exprs = [(name, wrt, u) for name, wrt, u in table]
+        key = compiler.expression_key(self.model, self.args, exprs)
+
+        def build():
+            out = []
+            for name, wrt, u in table:
+                expr = sym.diff(self.model, sym.Symbol(wrt))
+                if u is not None:
+                    expr = expr * u
+                out.append(expr)
+            return out
+
+        return compiler.lambdify(self.args, build, key)
+
+    def finite_differences(self, x, names):
+        """Returns the central differences of the model for the
+        inputs ``names`` computed by one call of the model.
+
+        :returns: sensitivity coefficients by name
+        :rtype: dict
+        """
+        x = [np.asarray(x_i, dtype=float) for x_i in x]
+        shape = np.broadcast(*x).shape
+        n = len(names)
+        X = [np.array(np.broadcast_to(x_i, (2*n,) + shape)) for x_i in x]
+        h = []
+        for k, name in enumerate(names):
+            i = self.args.index(name)
+            h_k = self.step * np.where(np.abs(x[i]) > 0, np.abs(x[i]), 1.0)
+            X[i][2*k] = X[i][2*k] + h_k
+            X[i][2*k + 1] = X[i][2*k + 1] - h_k
+            h.append(h_k)
+        y = self.model(*X)
+
+        return {name: (y[2*k] - y[2*k + 1])/(2*h[k]) for k, name in enumerate(names)}
+
+    def sensitivities(self, x, names=None):
+        """Returns the sensitivity coefficients of the inputs ``names``
+        (default: all).
+
+        :param x: inputs by name or list
+        :type x: dict or list
+
+        :returns: sensitivity coefficients by name
+        :rtype: dict
+        """
+        names = list(names or self.args)
+        x = self.values(x)
+        c = {name: self.sens[name](*x) for name in names if name in self.sens}
+        todo = [name for name in names if name not in c]
+        if len(todo) > 0:
+            if self.symbolic:
+                vals = self.compile([(name, name, None) for name in todo])(*x)
+                c.update(zip(todo, vals))
+            else:
+                c.update(self.finite_differences(x, todo))
+
+        return {name: c[name] for name in names}
+
+    def contributions(self, x, table):
+        """Returns the contributions of the ``table`` entries
+        ``(name, input, u)``: the sensitivity coefficient of the input
+        times the standard uncertainty ``u`` (array in the unit of the
+        input). For a symbolic model ``u`` may be a sympy expression of
+        the inputs (or ``None`` for the sensitivity coefficient alone);
+        all terms are then computed by one compiled function.
+
+        :param x: inputs by name or list
+        :type x: dict or list
+        :param table: (name, input, u)
+        :type table: list
+
+        :returns: contributions by name (in the order of the table)
+        :rtype: dict
+        """
+        x = self.values(x)
+        if self.symbolic and not any(wrt in self.sens for _, wrt, _ in table):
+            exprs = [(name, wrt, u if lazy.is_sympy(u) or u is None else None) for name, wrt, u in table]
+            vals = self.compile(exprs)(*x)
+            return {name: val if lazy.is_sympy(u) or u is None else val * u
+                    for (name, _, u), val in zip(table, vals)}
+
+        c = self.sensitivities(x, [wrt for _, wrt, _ in table])
+
+        return {name: c[wrt] * u for name, wrt, u in table}
+
+    def total(self, x, table):
+        """Returns the contributions (see ``contributions()``) and their
+        quadratic sum.
+
+        :returns: contributions, total uncertainty
+        :rtype: tuple
+        """
+        u = self.contributions(x, table)
+
+        return u, quadratic_sum(list(u.values()))
+
+    def uncertainties(self, x, table):
+        """Returns the ``table`` with the uncertainty expressions
+        (sympy) evaluated at ``x``; entries without uncertainty are
+        dropped.
+
+        :returns: table with arrays
+        :rtype: list
+        """
+        x = self.values(x)
+        exprs = [u for _, _, u in table if lazy.is_sympy(u)]
+        vals = []
+        if len(exprs) > 0:
+            key = compiler.expression_key("uncertainties", self.args, exprs)
+            vals = compiler.lambdify(self.args, lambda: exprs, key)(*x)
+        vals = iter(vals)
+
+        return [(name, wrt, next(vals) if lazy.is_sympy(u) else u) for name, wrt, u in table if u is not None]
+
+def common_dist(entries, default="norm"):
+    """Returns the ``Dist`` shared by all uncertainty ``entries``
+    (``Uncertainty`` lists of calibration objects), otherwise
+    ``default`` (the sum of several contributions).
+
+    :returns: distribution
+    :rtype: str
+    """
+    dists = set(u_i.get("Dist") or default for u_i in entries)
+
+    return dists.pop() if len(dists) == 1 else default
+
+def draw(rng, dist, n):
+    """Returns ``n`` samples of the distribution ``dist`` (``Dist`` of
+    an uncertainty entry: ``norm``, ``rect``, ``tri`` or ``arcsine``)
+    with mean 0 and variance 1.
+
+    :returns: samples
+    :rtype: np.array
+    """
+    if dist in ("rect", "uniform"):
+        return rng.uniform(-np.sqrt(3.0), np.sqrt(3.0), n)
+    if dist in ("tri", "triangular"):
+        return rng.triangular(-np.sqrt(6.0), 0.0, np.sqrt(6.0), n)
+    if dist in ("arcsine", "u"):
+        return np.sqrt(2.0) * np.sin(rng.uniform(-np.pi/2, np.pi/2, n))
+
+    return rng.standard_normal(n)
+
+def reduce_const(a):
+    """Returns the first element (shape ``(1,)``) of an array whose
+    values are all equal, otherwise the array.
+    """
+    a = np.asarray(a, dtype=float)
+    if a.ndim == 1 and a.size > 1 and np.all(a == a[0]):
+        return a[:1]
+
+    return a
+
+class Smallest(object):
+    """The ``k`` smallest (or, with ``largest``, the ``k`` largest,
+    kept negated) values per point of a stream of samples (samples x
+    points). Only values beyond the ``k``-th value kept so far are
+    candidates; the candidates are merged with the kept values once a
+    point has ``k`` of them.
+
+    :param N: number of points
+    :type N: int
+    :param k: number of values kept per point
+    :type k: int
+    :param largest: keep the largest values
+    :type largest: bool
+    """
+    def __init__(self, N, k, largest=False):
+        self.N = N
+        self.k = k
+        self.largest = largest
+        self.kept = np.full((N, k), np.inf)
+        self.thr = np.full(N, np.inf)
+        self.added = np.zeros(N, dtype=np.int64)
+        self.pending = np.zeros(N, dtype=np.int64)
+        self.parts = []
+
+    def add(self, y):
+        """Adds the samples ``y`` (samples x points); ``nan`` is skipped.
+        """
+        if self.largest:
+            c, r = np.divmod(np.flatnonzero(y.T > -self.thr[:, None]), len(y))
+            v = -y[r, c]
+        else:
+            c, r = np.divmod(np.flatnonzero(y.T < self.thr[:, None]), len(y))
+            v = y[r, c]
+        if len(c) == 0:
+            return
+        n = np.bincount(c, minlength=self.N)
+        self.parts.append((c, v, n))
+        self.pending += n
+        self.added += n
+        if self.pending.max() > self.k:
+            self.prune()
+
+    def prune(self):
+        """Merges the candidates with the kept values.
+        """
+        if not self.parts:
+            return
+        buf = np.full((self.N, self.k + self.pending.max()), np.inf)
+        buf[:, :self.k] = self.kept
+        free = np.full(self.N, self.k)
+        for c, v, n in self.parts: ## c is sorted, n values per point
+            start = np.cumsum(n) - n
+            buf[c, free[c] + np.arange(len(c)) - start[c]] = v
+            free += n
+        self.keep(buf)
+
+    def keep(self, buf):
+        buf = np.partition(buf, self.k - 1, axis=1)
+        self.kept = buf[:, :self.k]
+        self.thr = buf[:, self.k - 1].copy()
+        self.pending[:] = 0
+        self.parts = []
+
+    def merge(self, other):
+        """Adds the values of the ``Smallest`` ``other``.
+        """
+        self.prune()
+        other.prune()
+        self.added += other.added
+        self.keep(np.concatenate((self.kept, other.kept), axis=1))
+
+    def value(self, i, j):
+        """Returns the ``j``-th smallest (largest) value (from ``0``) of
+        point ``i``; ``nan`` if it is not kept.
+        """
+        self.prune()
+        if not 0 <= j < min(self.k, self.added[i]):
+            return np.nan
+
+        v = np.partition(self.kept[i], j)[j]
+
+        return -v if self.largest else v
+
+class Tails(object):
+    """Extreme samples of ``MonteCarlo``: per point the ``k`` smallest
+    and the ``k`` largest values (see ``Smallest``); ``nan`` samples are
+    only counted.
+
+    :param N: number of points
+    :type N: int
+    :param k: number of samples kept per point and side
+    :type k: int
+    """
+    def __init__(self, N, k):
+        self.N = N
+        self.nan = np.zeros(N, dtype=np.int64)
+        self.low = Smallest(N, k)
+        self.high = Smallest(N, k, largest=True)
+
+    def add(self, y):
+        """Adds the samples ``y`` (samples x points).
+        """
+        self.low.add(y)
+        self.high.add(y)
+
+    def merge(self, other):
+        """Adds the samples of the ``Tails`` ``other``.
+        """
+        self.nan += other.nan
+        self.low.merge(other.low)
+        self.high.merge(other.high)
+
+    def value(self, side, i, j):
+        """Returns the ``j``-th extreme sample (from ``0``) of point
+        ``i`` of the ``side`` (``low`` or ``high``); ``nan`` if it is
+        not kept.
+        """
+        return getattr(self, side).value(i, j)
+
+def mc_part(mc, x, y_0, table, dists, n, seed):
+    """Runs ``n`` samples of ``mc`` (see ``MonteCarlo.sample()``) in a
+    process of the pool.
+    """
+    return mc.sample(x, y_0, table, dists, n, np.random.default_rng(seed))
+
+class MonteCarlo(object):
+    """Propagation of distributions (GUM Supplement 1) through the
+    model of ``prop``.
+
+    All inputs of the ``table`` (see ``Propagation.contributions()``)
+    are drawn as ``x + u*z`` with ``z`` of unit variance; the model is
+    evaluated for chunks of samples x points of at most
+    ``max_elements`` values. The samples ``z`` are the same for all
+    points (the distribution of every point is not affected). The
+    limits of the coverage interval are order statistics of the
+    samples: per point the ``(1 - p)/2 * samples`` smallest and
+    largest samples are kept (see ``Tails``), i.e. about
+    ``(1 - p) * samples * points`` values (40 MB for 10**6 samples,
+    100 points and ``p = 0.95``). Inputs and uncertainties equal at all
+    points are drawn once per sample (one column) and broadcast by the
+    model.
+
+    :param prop: propagation with model
+    :type prop: Propagation
+    :param samples: number of samples
+    :type samples: int
+    :param p: coverage probability
+    :type p: float
+    :param seed: seed of the random numbers
+    :type seed: int
+    :param workers: number of processes; the model has to be
+                    picklable then (sympy expression or module level function)
+    :type workers: int
+    """
+    max_elements = 2**16
+
+    def __init__(self, prop, samples=10**6, p=0.95, seed=None, workers=1):
+        self.prop = prop
+        self.samples = int(samples)
+        self.p = p
+        self.seed = seed
+        self.workers = max(int(workers), 1)
+
+    def function(self):
+        """Returns the model as function of numpy arrays.
+        """
+        prop = self.prop
+        if prop.symbolic:
+            return compiler.lambdify(prop.args, lambda: prop.model, compiler.expression_key(prop.model, prop.args))
+
+        return prop.model
+
+    def evaluate(self, f, x, table, dists, n, rng):
+        """Returns the model for ``n`` samples (rows) of the inputs.
+        """
+        X = list(x)
+        for name, wrt, u in table:
+            i = self.prop.args.index(wrt)
+            dx = np.multiply.outer(draw(rng, dists.get(name, "norm"), n), u)
+            if dx.shape == np.broadcast_shapes(dx.shape, np.shape(X[i])):
+                dx += X[i]
+            else:
+                dx = dx + X[i]
+            X[i] = dx
+
+        return f(*X)
+
+    def tails(self, N):
+        """Returns the ``Tails`` of ``N`` points keeping enough samples
+        for the limits of the coverage interval.
+        """
+        return Tails(N, int(np.ceil((1.0 - self.p)/2.0 * self.samples)) + 1)
+
+    def count(self, y, y_0, tails):
+        """Returns the sum and the sum of squares of the deviations from
+        the model at ``x`` of the samples ``y``; the samples are added to
+        ``tails``.
+        """
+        y = np.broadcast_to(y, (len(y), len(y_0)))
+        tails.add(y)
+
+        d = y - y_0
+        s_1 = d.sum(axis=0)
+        s_2 = np.einsum("ij,ij->j", d, d)
+        if not np.all(np.isfinite(s_1)):
+            nan = np.isnan(d)
+            tails.nan += np.count_nonzero(nan, axis=0)
+            s_1, s_2 = np.nansum(d, axis=0), np.nansum(d*d, axis=0)
+
+        return s_1, s_2
+
+    def sample(self, x, y_0, table, dists, n, rng):
+        """Evaluates the model for ``n`` samples in chunks.
+
+        :param x: inputs (list of arrays)
+        :type x: list
+        :param y_0: model at ``x``
+        :type y_0: np.array
+
+        :returns: sum and sum of squares (see ``count()``), number of
+                  samples, ``Tails``
+        :rtype: tuple
+        """
+        f = self.function()
+        chunk = max(1, self.max_elements // max(len(y_0), 1))
+        tails = self.tails(len(y_0))
+
+        s_1, s_2 = 0.0, 0.0
+        done = 0
+        while done < n:
+            c = min(chunk, n - done)
+            d_1, d_2 = self.count(self.evaluate(f, x, table, dists, c, rng), y_0, tails)
+            s_1, s_2 = s_1 + d_1, s_2 + d_2
+            done = done + c
+
+        return s_1, s_2, n, tails
+
+    def quantile(self, tails, n, q):
+        """Returns the ``q`` quantile of every point: the sample of rank
+        ``ceil(q*m)`` of the ``m`` samples which are not ``nan``;
+        ``nan`` if all samples of the point are ``nan``.
+        """
+        ret = np.full(tails.N, np.nan)
+        for i in range(tails.N):
+            m = n - tails.nan[i]
+            if m > 0:
+                r = max(int(np.ceil(q * m)), 1)
+                ret[i] = tails.value("low", i, r - 1) if r <= m - r else tails.value("high", i, m - r)
+
+        return ret
+
+    def run(self, x, table, dists=None):
+        """Draws ``self.samples`` samples of all inputs of the ``table``
+        and evaluates the model.
+
+        :param x: inputs by name or list
+        :type x: dict or list
+        :param table: (name, input, u) with the standard uncertainty
+                      ``u`` in the unit of the input
+        :type table: list
+        :param dists: ``Dist`` by name of the table entries (default ``norm``)
+        :type dists: dict
+
+        Samples for which the model gives ``nan`` are left out: ``mean``,
+        ``std`` and the coverage interval of a point are those of its
+        samples which are not ``nan`` (``nan`` if there are none).
+
+        :returns: model at ``x`` (``y``), ``mean``, ``std`` and the
+                  probabilistically symmetric coverage interval
+                  (``low``, ``high``) of every point
+        :rtype: dict
+        """
+        dists = dists or {}
+        seeds = np.random.SeedSequence(self.seed).spawn(self.workers)
+        f = self.function()
+        x_0 = [np.asarray(x_i, dtype=float) for x_i in self.prop.values(x)]
+        y_0 = np.asarray(f(*x_0), dtype=float)
+        table = [(name, wrt, reduce_const(np.broadcast_to(np.asarray(u, dtype=float), y_0.shape)))
+                 for name, wrt, u in table if u is not None]
+        x = [reduce_const(np.broadcast_to(x_i, y_0.shape)) for x_i in x_0]
+
+        parts = [self.samples // self.workers + (1 if i < self.samples % self.workers else 0) for i in range(self.workers)]
+        if self.workers > 1:
+            W = self.workers
+            with ProcessPoolExecutor(max_workers=W) as pool:
+                results = list(pool.map(mc_part, [self] * W, [x] * W, [y_0] * W, [table] * W, [dists] * W,
+                                        parts, seeds))
+        else:
+            results = [self.sample(x, y_0, table, dists, parts[0], np.random.default_rng(seeds[0]))]
+
+        s_1, s_2, n, tails = results[0]
+        for d_1, d_2, m, t in results[1:]:
+            s_1, s_2, n = s_1 + d_1, s_2 + d_2, n + m
+            tails.merge(t)
+
+        m = n - tails.nan ## samples which are not nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = s_1/m
+            std = np.sqrt(np.maximum(s_2/m - mean**2, 0.0) * m/np.maximum(m - 1, 1))
+        out = {"y": y_0,
+               "mean": y_0 + mean,
+               "std": std,
+               "low": self.quantile(tails, n, (1.0 - self.p)/2.0),
+               "high": self.quantile(tails, n, (1.0 + self.p)/2.0)}
+        for v in out.values():
+            v[~np.isfinite(y_0)] = np.nan
+
+        return out
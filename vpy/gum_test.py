@@ -0,0 +1,83 @@
+import math
+import unittest
+from statistics import NormalDist
+import numpy as np
+import sympy as sym
+from . import gum
+
+class TestGum(unittest.TestCase):
+
+    def setUp(self):
+        self.x = {"p": np.array([1.0, 10.0, 100.0]), "f": np.array([1e-2, 2e-2, 5e-3]), "T": np.full(3, 296.15)}
+        self.p, self.f, self.T = sym.symbols("p f T")
+
+    def test_sensitivities_1(self):
+        """derived, explicit and finite difference coefficients agree
+        """
+        expr = self.p*self.f*296.15/self.T
+        func = lambda p, f, T: p*f*296.15/T
+        c_sym = gum.Propagation(("p", "f", "T"), expr).sensitivities(self.x)
+        c_fd = gum.Propagation(("p", "f", "T"), func).sensitivities(self.x)
+        c_exp = gum.Propagation(("p", "f", "T"), func, sens={"p": lambda p, f, T: f*296.15/T}).sensitivities(self.x, ["p"])
+
+        for name in ("p", "f", "T"):
+            np.testing.assert_allclose(c_fd[name], c_sym[name], rtol=1e-6)
+        np.testing.assert_array_equal(c_exp["p"], self.x["f"]*296.15/self.x["T"])
+
+    def test_total_1(self):
+        """uncertainty expressions are compiled with the coefficients; total is the quadratic sum
+        """
+        prop = gum.Propagation(("p", "f", "T"), self.p*self.f)
+        u_i, u = prop.total(self.x, [("u_p", "p", 1e-3*self.p), ("u_f", "f", np.full(3, 1e-4)), ("u_T", "T", None)])
+
+        np.testing.assert_allclose(u_i["u_p"], self.x["f"]*1e-3*self.x["p"])
+        np.testing.assert_array_equal(u_i["u_f"], self.x["p"]*1e-4)
+        np.testing.assert_array_equal(u_i["u_T"], np.zeros(3))
+        np.testing.assert_array_equal(u, np.sqrt(np.power(u_i["u_p"], 2) + np.power(u_i["u_f"], 2) + np.power(u_i["u_T"], 2)))
+        np.testing.assert_array_equal(gum.quadratic_sum([self.x["p"], self.x["f"]], square=np.square),
+                                      (self.x["p"]**2 + self.x["f"]**2)**0.5)
+
+    def test_monte_carlo_1(self):
+        """linear model: standard uncertainty and coverage interval of the linear propagation
+        """
+        prop = gum.Propagation(("p", "f", "T"), self.p*self.f + self.T)
+        table = [("u_p", "p", 1e-2*self.x["p"]), ("u_f", "f", np.full(3, 1e-4)), ("u_T", "T", np.full(3, 0.05))]
+        u = prop.total(self.x, table)[1]
+        out = gum.MonteCarlo(prop, samples=2*10**5, seed=1).run(self.x, table, {"u_T": "rect"})
+
+        np.testing.assert_array_equal(out["y"], self.x["p"]*self.x["f"] + self.x["T"])
+        np.testing.assert_allclose(out["std"], u, rtol=1e-2)
+        np.testing.assert_allclose(out["mean"], out["y"], atol=1e-2*u.max())
+        self.assertTrue(np.all(out["low"] < out["y"]) and np.all(out["y"] < out["high"]))
+        self.assertTrue(np.all(out["high"] - out["low"] < 2*1.96*u))
+
+    def test_monte_carlo_2(self):
+        """skewed, heavy tailed output: the limits of the coverage interval are those of the distribution
+        """
+        prop = gum.Propagation(("p",), sym.exp(self.p))
+        x = {"p": np.array([0.0, 1.0])}
+        table = [("u_p", "p", np.array([3.0, 4.0]))]
+        mc = gum.MonteCarlo(prop, samples=2*10**5, seed=2)
+        mc.max_elements = 16 ## many chunks of 8 samples
+        out = mc.run(x, table)
+
+        np.testing.assert_allclose(np.log(out["low"]), x["p"] - 1.96*table[0][2], atol=0.05)
+        np.testing.assert_allclose(np.log(out["high"]), x["p"] + 1.96*table[0][2], atol=0.05)
+
+    def test_monte_carlo_3(self):
+        """samples the model gives nan for are left out of mean, std and coverage interval
+        """
+        prop = gum.Propagation(("p",), sym.sqrt(self.p))
+        x = {"p": np.array([1.0e4, 0.0])}
+        table = [("u_p", "p", np.array([1.0, 1.0]))]
+        with np.errstate(invalid="ignore"):
+            out = gum.MonteCarlo(prop, samples=2*10**5, seed=3).run(x, table)
+
+        ## half of the samples of the second point are nan, the others sqrt(|z|)
+        mean = 2**0.25*math.gamma(0.75)/math.sqrt(math.pi)
+        std = math.sqrt(math.sqrt(2/math.pi) - mean**2)
+        low, high = [math.sqrt(NormalDist().inv_cdf((1 + q)/2)) for q in (0.025, 0.975)]
+        np.testing.assert_allclose(out["mean"], [100.0, mean], rtol=1e-2)
+        np.testing.assert_allclose(out["std"], [0.005, std], rtol=1e-2)
+        np.testing.assert_allclose(out["low"], [100.0 - 1.96*0.005, low], rtol=5e-2) ## sqrt is steep at 0
+        np.testing.assert_allclose(out["high"], [100.0 + 1.96*0.005, high], rtol=1e-2)
@@ -11,19 +11,19 @@ def init_customer_device(doc):
     customer_object = doc.get('Calibration').get('CustomerObject')
 
     if customer_object.get("Class") == "SRG":
-        cus_dev = Srg(doc, customer_object)
+        cus_dev = Srg.shared(doc, customer_object)
     if customer_object.get("Class") == "CDG":
-        cus_dev = Cdg(doc, customer_object)
+        cus_dev = Cdg.shared(doc, customer_object)
     if customer_object.get("Class") == "CPT":
-        cus_dev = Cdg(doc, customer_object)
+        cus_dev = Cdg.shared(doc, customer_object)
     if customer_object.get("Class") == "RSG":
-        cus_dev = Rsg(doc, customer_object)
+        cus_dev = Rsg.shared(doc, customer_object)
     if customer_object.get("Class") == "QBS":
-        cus_dev = Qbs(doc, customer_object)
+        cus_dev = Qbs.shared(doc, customer_object)
     if customer_object.get("Class") == "IG":
-        cus_dev = Ig(doc, customer_object)
+        cus_dev = Ig.shared(doc, customer_object)
     if customer_object.get("Class") == "PIR":
-        cus_dev = Pir(doc, customer_object)
+        cus_dev = Pir.shared(doc, customer_object)
 
     return cus_dev
 
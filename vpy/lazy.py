@@ -0,0 +1,53 @@
+"""Heavy dependencies (sympy, scipy, matplotlib, couchdb) imported at
+first use.
+
+``module(name)`` returns a stand-in for the module which imports it on
+the first attribute access; modules use it in place of the import
+statement::
+
+    sym = lazy.module("sympy")
+
+The attributes are kept by the stand-in, i.e. later accesses cost as
+much as those of the module itself. A missing dependency fails at
+first use instead of at import.
+"""
+import sys
+import importlib
+
+class LazyModule(object):
+    """Stand-in of the module ``name``.
+    """
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attr):
+        value = getattr(importlib.import_module(self._name), attr)
+        self.__dict__[attr] = value
+
+        return value
+
+    def __repr__(self):
+        return "<lazy module '{}'>".format(self._name)
+
+def module(name):
+    """Returns the module ``name`` if imported already, otherwise a
+    ``LazyModule``.
+
+    :param name: name of the module e.g. ``scipy.optimize``
+    :type name: str
+
+    :returns: module
+    :rtype: module or LazyModule
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    return LazyModule(name)
+
+def is_sympy(obj):
+    """Returns ``True`` if ``obj`` is a sympy object; does not import
+    sympy (there are no sympy objects before it is imported).
+    """
+    sym = sys.modules.get("sympy")
+
+    return sym is not None and isinstance(obj, sym.Basic)
@@ -0,0 +1,62 @@
+"""Models (sympy expressions) compiled to numpy functions.
+
+``lambdify()`` differentiates and lambdifies a list of expressions once
+and keeps the function per process (``compiled``). The key is the sha1
+of the strings the expressions are built from (see
+``expression_key()``), so that a compiled function is found without
+building the expressions again. Generated code is never stored on or
+loaded from disk.
+
+A function of several expressions returns a list with one entry per
+expression; the entries are computed by the same code
+``sym.lambdify()`` generates for a single expression, i.e. the values
+are equal bit by bit.
+"""
+import json
+import hashlib
+from . import lazy
+sym = lazy.module("sympy")
+
+compiled = {}
+reprs = {}
+
+def expression_key(*parts):
+    """Returns the sha1 of ``parts`` (strings, lists of strings,
+    sympy expressions).
+
+    :returns: key
+    :rtype: str
+    """
+    return hashlib.sha1(json.dumps(parts, default=srepr).encode("utf-8")).hexdigest()
+
+def srepr(expr):
+    """Returns ``sym.srepr(expr)``, kept per expression.
+    """
+    r = reprs.get(expr)
+    if r is None:
+        r = sym.srepr(expr)
+        reprs[expr] = r
+
+    return r
+
+def lambdify(args, build, key):
+    """Returns the numpy function of the symbols ``args`` computing
+    the expressions returned by ``build()``.
+
+    :param args: names of the arguments
+    :type args: tuple
+    :param build: returns the expression (or a list of expressions);
+                  called only if the function is not cached
+    :type build: function
+    :param key: key of the expressions, see ``expression_key()``
+    :type key: str
+
+    :returns: function
+    :rtype: function
+    """
+    f = compiled.get(key)
+    if f is None:
+        f = sym.lambdify([sym.Symbol(a) for a in args], build(), "numpy")
+        compiled[key] = f
+
+    return f
@@ -0,0 +1,30 @@
+import unittest
+import numpy as np
+import sympy as sym
+from . import model
+
+class TestModel(unittest.TestCase):
+
+    def setUp(self):
+        x, y = sym.symbols("x y")
+        self.exprs = [sym.diff(x**2*sym.sqrt(y)/(1.0 - x/y), s) * sym.sympify("1.0e-5*x + 3") for s in (x, y)]
+        self.key = model.expression_key(self.exprs, ["x", "y"])
+
+    def tearDown(self):
+        model.compiled.pop(self.key, None)
+
+    def test_lambdify_1(self):
+        """all expressions in one call, equal to one lambdify per expression
+        """
+        f = model.lambdify(("x", "y"), lambda: self.exprs, self.key)
+        x, y = np.linspace(0.1, 0.9, 7), np.linspace(2, 3, 7)
+        for val, expr in zip(f(x, y), self.exprs):
+            g = sym.lambdify(sym.symbols("x y"), expr, "numpy")
+            np.testing.assert_array_equal(val, g(x, y))
+
+    def test_lambdify_2(self):
+        """the function is kept per process without building the expressions again
+        """
+        f = model.lambdify(("x", "y"), lambda: self.exprs, self.key)
+        g = model.lambdify(("x", "y"), lambda: self.fail("built again"), self.key)
+        self.assertIs(f, g)
@@ -0,0 +1,166 @@
+"""Piecewise tables of the pressure (CMC and repeatability tables).
+
+A ``Piecewise`` table has the upper limits ``breaks`` (ascending) of
+its segments; segment ``k`` covers ``breaks[k-1] < p <= breaks[k]``,
+the last one all ``p > breaks[-1]``. A segment is a constant or a
+formula of ``p`` (python expression string, e.g.
+``"((0.0245/p)**2 + 2.24e-5**2)**0.5"``; nothing but ``+ - * / **``,
+numbers and ``p``, see ``check_formula()``). All points are evaluated at
+once by ``np.searchsorted()``; ``**`` is computed by ``np.power()``
+which gives the values of a single number (``x**2`` of an array is
+``np.square()`` and differs in the last bit).
+
+The tables of a standard or a device class are registered by
+``register()``. ``find()`` returns the table of the ``Piecewise`` list
+of a ``Standard`` or ``CalibrationObject`` document if there is one,
+otherwise the registered one:
+
+.. code-block:: json
+
+    "Piecewise": [{"Type": "cmc",
+                   "Unit": "Pa",
+                   "Breaks": [0.027, 0.3],
+                   "Segments": [0.0014, 0.001, "2.0e-4 + 0.1/p"]}]
+"""
+import sys
+import ast
+import numpy as np
+
+tables = {}
+loaded = {}
+
+class Piecewise(object):
+    """Piecewise table.
+
+    :param breaks: upper limits of the segments (one less than segments)
+    :type breaks: list
+    :param segments: constants or formulas of ``p``
+    :type segments: list
+    :param unit: unit of the pressure
+    :type unit: str
+    :param default: value of points not covered (``nan`` pressure)
+    :type default: float
+    """
+    def __init__(self, breaks, segments, unit="Pa", default=0.0):
+        if len(breaks) + 1 != len(segments):
+            sys.exit("Piecewise table needs one segment more than breaks")
+        self.breaks = np.asarray(breaks, dtype=float)
+        if np.any(np.diff(self.breaks) <= 0):
+            sys.exit("Breaks of piecewise table are not ascending")
+        self.unit = unit
+        self.default = default
+        self.const = np.full(len(segments), np.nan)
+        self.formulas = []
+        for k, seg in enumerate(segments):
+            if isinstance(seg, str):
+                self.formulas.append((k, compile_formula(seg, k)))
+            else:
+                self.const[k] = seg
+
+    @classmethod
+    def from_doc(cls, d):
+        """Returns the table of the document entry ``d`` (see module).
+
+        :param d: entry with ``Breaks``, ``Segments`` and ``Unit``
+        :type d: dict
+
+        :returns: table
+        :rtype: Piecewise
+        """
+        return cls(d["Breaks"], d["Segments"], unit=d.get("Unit", "Pa"))
+
+    def __call__(self, p):
+        """Returns the values of the table at the pressures ``p``
+        (in ``self.unit``).
+
+        :param p: pressures
+        :type p: np.array
+
+        :returns: values
+        :rtype: np.array
+        """
+        p = np.asarray(p, dtype=float)
+        k = np.searchsorted(self.breaks, p, side="left")
+        u = self.const[k]
+        for j, code in self.formulas:
+            i = np.where(k == j)
+            if len(i[0]) > 0:
+                u[i] = eval(code, {"__builtins__": {}, "np": np}, {"p": p[i]})
+        u[np.isnan(p)] = self.default
+
+        return u
+
+class PowerToCall(ast.NodeTransformer):
+    """Replaces ``a**b`` by ``np.power(a, b)``.
+    """
+    def visit_BinOp(self, node):
+        node = self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            func = ast.Attribute(value=ast.Name(id="np", ctx=ast.Load()), attr="power", ctx=ast.Load())
+            return ast.copy_location(ast.Call(func=func, args=[node.left, node.right], keywords=[]), node)
+
+        return node
+
+## nodes a formula may consist of: arithmetic of numbers and p
+formula_nodes = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+                 ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+def check_formula(tree, formula):
+    """Raises ``ValueError`` if the parsed ``formula`` is more than
+    arithmetic (``+ - * / **``) of numbers and ``p``; the formulas come
+    from the documents and are evaluated.
+    """
+    for node in ast.walk(tree):
+        if not isinstance(node, formula_nodes):
+            raise ValueError("{} not allowed in formula {}".format(type(node).__name__, formula))
+        if isinstance(node, ast.Name) and node.id != "p":
+            raise ValueError("name {} not allowed in formula {}".format(node.id, formula))
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ValueError("constant {!r} not allowed in formula {}".format(node.value, formula))
+
+def compile_formula(formula, k):
+    """Returns the code of the formula of segment ``k``.
+    """
+    tree = ast.parse(formula, mode="eval")
+    check_formula(tree, formula)
+    tree = ast.fix_missing_locations(PowerToCall().visit(tree))
+
+    return compile(tree, "<segment {}>".format(k), "eval")
+
+def register(owner, kind, table):
+    """Registers the table ``kind`` (e.g. ``cmc``) of ``owner`` (name
+    of a standard or of a device class).
+    """
+    tables[(owner, kind)] = table
+
+def find(kind, owner, obj=None):
+    """Returns the table ``kind`` of the ``Piecewise`` list of ``obj``
+    or the one registered for ``owner``. For a device class the
+    classes it is derived from are searched too.
+
+    :param kind: type of the table e.g. ``cmc`` or ``repeat``
+    :type kind: str
+    :param owner: name of the standard or device class
+    :type owner: str or type
+    :param obj: standard or calibration object
+    :type obj: dict
+
+    :returns: table
+    :rtype: Piecewise
+    """
+    ## vpy.device imports the device modules registering their tables
+    from .device.registry import object_key
+
+    for d in (obj or {}).get("Piecewise", []):
+        if d.get("Type") == kind:
+            key = object_key(d)
+            if key not in loaded:
+                loaded[key] = Piecewise.from_doc(d)
+            return loaded[key]
+
+    names = [c.__name__ for c in owner.__mro__] if isinstance(owner, type) else [owner]
+    for name in names:
+        if (name, kind) in tables:
+            return tables[(name, kind)]
+
+    return None
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from . import piecewise
+from .device.cdg import Cdg, InfCdg
+
+class TestPiecewise(unittest.TestCase):
+
+    def test_segments_1(self):
+        """segments are closed on the right; formulas of p; nan gives the default
+        """
+        table = piecewise.Piecewise([1.0, 10.0], [0.1, "1.0/p**0.5", 0.01])
+        p = np.array([0.5, 1.0, 1.5, 4.0, 10.0, 10.5, np.nan])
+        u = table(p)
+
+        np.testing.assert_array_equal(u, [0.1, 0.1, 1.0/np.power(1.5, 0.5), 0.5, 1.0/np.power(10.0, 0.5), 0.01, 0.0])
+
+    def test_segments_2(self):
+        """formulas are arithmetic of numbers and p only
+        """
+        table = piecewise.Piecewise([1.0], [0.1, "-(2.0e-4 + 0.1/p)"])
+        np.testing.assert_array_equal(table(np.array([2.0])), [-(2.0e-4 + 0.1/2.0)])
+        for formula in ["().__class__.__base__.__subclasses__()", "p.__class__", "abs(p)", "np.sqrt(p)",
+                        "p[0]", "__import__('os')", "x + p", "'a' * 3", "True + p", "lambda: p", "[p][0]"]:
+            with self.assertRaises(ValueError, msg=formula):
+                piecewise.Piecewise([1.0], [0.1, formula])
+
+    def test_find_1(self):
+        """table of the calibration object first, then the registered one of the class (or base class)
+        """
+        cob = {"Piecewise": [{"Type": "repeat", "Unit": "Pa", "Breaks": [1.0], "Segments": [2e-3, 1e-3]}]}
+        p = np.array([0.5, 20.0, 200.0])
+
+        np.testing.assert_array_equal(piecewise.find("repeat", InfCdg, cob)(p), [2e-3, 1e-3, 1e-3])
+        np.testing.assert_array_equal(piecewise.find("repeat", InfCdg)(p), [0.0008, 0.0003, 0.0001])
+        self.assertIs(piecewise.find("repeat", InfCdg), piecewise.find("repeat", Cdg))
+        self.assertIsNone(piecewise.find("cmc", "unknown"))
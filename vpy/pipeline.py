@@ -0,0 +1,182 @@
+"""Analysis pipelines of the standards.
+
+One function per entry point script; the scripts (e.g.
+``script/se3/cal_analysis_expansion.py``) and ``vpy.batch`` call them
+so that both analyse a document the same way. A pipeline takes the
+calibration document (already updated by the base doc if requested)
+and returns the document with analysis; fetching and saving is left
+to the caller.
+"""
+from .analysis import Analysis
+from .helper import init_customer_device
+
+def se3_expansion(doc, state_doc=None, cmc=True):
+    """Analysis pipeline of ``script/se3/cal_analysis_expansion.py``.
+
+    :param doc: calibration document
+    :type doc: dict
+    :param state_doc: state document the AuxValues are taken from
+                      (``-a``); ``None`` keeps the AuxValues of
+                      ``Calibration.Analysis``
+    :type state_doc: dict
+    :param cmc: CMC uncertainty (total uncertainty otherwise)
+    :type cmc: bool
+
+    :returns: document with analysis
+    :rtype: dict
+    """
+    from .standard.se3.cal import Cal
+    from .standard.se3.uncert import Uncert
+
+    cal = Cal(doc)
+
+    if state_doc is not None: ## AuxValues from related (meas_date) state measurement
+        ana = Analysis(doc, analysis_type="expansion")
+        cal.insert_state_results(ana, state_doc)
+    else: ## keep AuxValues from Calibration.Analysis.AuxValues
+        auxvalues = doc.get('Calibration').get('Analysis', {}).get('AuxValues', {})
+        ana = Analysis(doc, insert_dict={'AuxValues': auxvalues}, analysis_type="expansion")
+
+    cus_dev = init_customer_device(doc)
+    uncert = Uncert(doc)
+
+    cal.pressure_gn_corr(ana)
+    cal.pressure_gn_mean(ana)
+    cal.deviation_target_fill(ana)
+    cal.temperature_before(ana)
+    cal.temperature_after(ana)
+    cal.temperature_room(ana)
+    cal.temperature_gas_expansion(ana)
+    cal.real_gas_correction(ana)
+    cal.volume_add(ana)
+    cal.volume_start(ana)
+    cal.expansion(ana)
+    cal.pressure_rise(ana)
+    cal.correction_delta_height(ana)
+    cal.correction_f_pressure(ana)
+    cal.pressure_cal(ana)
+    cal.error_pressure_rise(ana)
+    cal.deviation_target_cal(ana)
+
+    ## uncert. calculation
+    if cmc:
+        # bis update CMC Einträge --> vorh. CMC Einträge
+        # cal uncertainty of standard
+        uncert.cmc(ana)
+    else:
+        uncert.total(ana)
+
+    ## calculate customer indication
+    gas = cal.Aux.get_gas()
+    temperature_dict = ana.pick_dict('Temperature', 'after')
+    offset_dict = cal.Pres.get_dict('Type', 'ind_offset' )
+    ind_dict = cal.Pres.get_dict('Type', 'ind' )
+    range_dict = cal.Range.get_dict('Type', 'ind' )
+
+    offset = cus_dev.pressure(offset_dict, temperature_dict, range_dict=range_dict, unit = cal.unit, gas=gas)
+    ind = cus_dev.pressure(ind_dict, temperature_dict, range_dict=range_dict, unit = cal.unit, gas=gas)
+
+    ana.store("Pressure", "offset", offset, cal.unit)
+    ana.store("Pressure", "ind", ind, cal.unit)
+    ana.store("Pressure", "ind_corr", ind - offset, cal.unit)
+
+    p_ind = ana.pick("Pressure", "ind_corr", cal.unit)
+    p_cal = ana.pick("Pressure", "cal" , cal.unit)
+
+    if cal.ToDo.type == "error":
+        ana.store('Error', 'ind', p_ind/p_cal-1, '1')
+        cus_dev.range_trans(ana)
+
+    if cal.ToDo.type == "sigma":
+        ana.store('Error', 'ind', p_ind/p_cal-1, '1') ## used for check analysis
+        ana.store('Sigma', 'eff', p_ind/p_cal, '1')
+
+    return ana.build_doc()
+
+def se3_state_date(doc):
+    """Returns the date (``yyyy-mm-dd``) of the first measurement of
+    the calibration document, the end date of the state document used
+    by ``se3_expansion()`` with ``-a``.
+
+    :param doc: calibration document
+    :type doc: dict
+
+    :returns: date
+    :rtype: str
+    """
+    from .values import Date
+
+    return Date(doc).first_measurement()
+
+def frs5(doc):
+    """Analysis pipeline of ``script/frs5/frs5_cal_analysis.py``.
+
+    :param doc: calibration document
+    :type doc: dict
+
+    :returns: document with analysis
+    :rtype: dict
+    """
+    from .standard.frs5.cal import Cal
+    from .standard.frs5.uncert import Uncert
+
+    cus_dev = init_customer_device(doc)
+    cal = Cal(doc)
+    res = Analysis(doc)
+    uncert = Uncert(doc)
+
+    cal.temperature(res)
+    cal.pressure_res(res)
+    cal.pressure_cal(res)
+
+    ## calculate the uncertainty of the standard
+    uncert.total_standard(res)
+
+    ## calculate customer indication
+    gas = cal.Aux.get_gas()
+
+    ## todo meas temp room, gas
+    temperature_dict = {}
+
+    offset_dict = cal.Pres.get_dict('Type', 'ind_offset' )
+    ind_dict = cal.Pres.get_dict('Type', 'ind' )
+
+    offset = cus_dev.pressure(offset_dict, temperature_dict, unit = cal.unit, gas=gas)
+    ind = cus_dev.pressure(ind_dict, temperature_dict, unit = cal.unit, gas=gas)
+    res.store("Pressure", "offset", offset, cal.unit)
+    res.store("Pressure", "ind", ind, cal.unit)
+    res.store("Pressure", "ind_corr", ind - offset, cal.unit)
+
+    # error for rating procedures
+    p_ind = res.pick("Pressure", "ind_corr", cal.unit)
+    p_cal = res.pick("Pressure", "cal" , cal.unit)
+    res.store('Error', 'ind', p_ind/p_cal-1, '1')
+    cus_dev.range_trans(res)
+
+    return res.build_doc()
+
+def se2_expansion(doc):
+    """Analysis pipeline of ``script/se2/se2_cal_analysis.py``.
+
+    :param doc: calibration document
+    :type doc: dict
+
+    :returns: document with analysis
+    :rtype: dict
+    """
+    from .standard.se2.cal import Cal
+
+    ana = Analysis(doc, analysis_type="expansion")
+    cal = Cal(doc)
+
+    cal.temperature_after(ana)
+    cal.temperature_room(ana)
+    cal.pressure_cal(ana)
+    cal.pressure_ind(ana)
+    cal.pressure_offset(ana)
+    cal.pressure_indication_error(ana)
+    #cal.measurement_time(ana)
+    cal.faktor(ana)
+    cal.range(ana)
+
+    return ana.build_doc()
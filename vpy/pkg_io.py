@@ -2,26 +2,41 @@ import argparse
 import sys
 import os
 import re
+import copy
 import json
-import couchdb
+import time
+import hashlib
 import tempfile
+from .store import Store
+from . import lazy
+from . import timing
+couchdb = lazy.module("couchdb")
 
 class Io(object):
     """Class Io should handle all the input
     output issues of the pkg.
+
+    All database requests of an instance share one session
+    (HTTP keep-alive, connection pool) which is created on first use.
     """
+    base_docs = None # base docs in memory by cache file and validator (long running processes, see vpy.service)
 
     def __init__(self, db_url="http://localhost:5984", db_name = "vl_db"):
         """Change the configuration the python way by a
         direct access to io.config....
         """
+        self.cache_counts = {}
 
         self.config = {
             "plot": {"path": "temppath", "make": True},
+            "cache": {"path": self.user_cache_path(), "base_doc": True},
+            "profile": {"path": os.path.join(tempfile.gettempdir(), "vpy-profile")},
             "db": {
                 "url": db_url ,
                 "name": db_name,
-                "work_db":"{}_work".format(db_name)
+                "work_db":"{}_work".format(db_name),
+                "store": None,
+                "timeout": None # socket timeout of the session in s (None: no timeout)
             },
             "standards": {
                 "se3": {
@@ -59,6 +74,10 @@ class Io(object):
             self.config["db"]["url"] = db_url.replace('http://','http://{usr}:{pwd}@'.format(usr=usr, pwd=pwd))
 
         self.make_plot =  self.config["plot"]["make"]
+        self.srv = None
+        self.srv_url = None
+        self.store = None
+        self.dbs = {}
 
     def eval_args(self):
         """
@@ -85,6 +104,9 @@ class Io(object):
         # --file
         parser.add_argument("--file", type=str, nargs=1,
                             help="file containing document to analyse")
+        # --store
+        parser.add_argument("--store", type=str, nargs=1,
+                            help="offline store (SQLite file) used instead of the server")
         # -- min_pressure
         parser.add_argument("--min_pressure", type=str, nargs=1,
                             help="minimal pressure for *whatever*-script")
@@ -97,6 +119,9 @@ class Io(object):
         # -- pressure_unit
         parser.add_argument("--pressure_unit", type=str, nargs=1,
                             help="pressure unit of the given pressure params")
+        # -- grid
+        parser.add_argument("--grid", action='store_true',
+                            help="use the lookup grid of the filling pressure planner", default=False)
         # -s save
         parser.add_argument('-s', action='store_true',
                             help='save the results of calculation', default=False)
@@ -112,6 +137,21 @@ class Io(object):
         # -- measure now
         parser.add_argument("-n", action='store_true',
                             help="measure data set now")
+        # --standard
+        parser.add_argument("--standard", type=str, nargs=1,
+                            help="name of the standard (batch analysis)")
+        # --workers
+        parser.add_argument("--workers", type=int, nargs=1,
+                            help="number of processes (batch analysis)")
+        # --no_cache
+        parser.add_argument("--no_cache", action='store_true',
+                            help="do not use the base doc cache", default=False)
+        # --invalidate_cache
+        parser.add_argument("--invalidate_cache", action='store_true',
+                            help="remove the cached base docs", default=False)
+        # --profile
+        parser.add_argument("--profile", type=str, nargs="?", const=self.config["profile"]["path"],
+                            help="write timing summaries of the analysis to the given directory (see vpy.timing)")
 
         self.args = parser.parse_args()
 
@@ -132,6 +172,9 @@ class Io(object):
             else:
                 self.config["db"]["url"] = self.args.srv[0]
 
+        if self.args.store:
+            self.config["db"]["store"] = self.args.store[0]
+
         if self.args.u:
             self.update = True
         else:
@@ -161,6 +204,82 @@ class Io(object):
         else:
             self.n = False
 
+        if self.args.no_cache:
+            self.config["cache"]["base_doc"] = False
+
+        self.invalidate = self.args.invalidate_cache
+
+        if self.args.standard:
+            self.standard = self.args.standard[0]
+        else:
+            self.standard = None
+
+        if self.args.workers:
+            self.workers = self.args.workers[0]
+        else:
+            self.workers = os.cpu_count() or 1
+
+        profile = self.args.profile or os.environ.get("VPY_PROFILE")
+        if profile:
+            timing.enable(profile)
+
+    def get_srv(self):
+        """Returns the server. The server and its session are created on
+        the first call and again if ``self.config['db']['url']`` changes.
+
+        :returns: server
+        :rtype: couchdb.Server
+        """
+        url = self.config['db']['url']
+        if self.srv is None or self.srv_url != url:
+            self.srv = couchdb.Server(url, session=couchdb.http.Session(timeout=self.config['db']['timeout']))
+            self.srv_url = url
+            self.dbs = {}
+
+        return self.srv
+
+    def get_store(self):
+        """Returns the offline store given by ``self.config['db']['store']``
+        (``None`` if the server is used).
+
+        :returns: store
+        :rtype: vpy.store.Store
+        """
+        path = self.config['db']['store']
+        if path is None:
+            return None
+        if self.store is None or self.store.path != path:
+            self.store = Store(path)
+            self.dbs = {}
+
+        return self.store
+
+    def get_db(self, name=None):
+        """Returns the database ``name`` (default: ``self.config['db']['name']``).
+        The existence of the database is checked once per instance.
+        With an offline store (``--store``) the database of the store
+        is returned.
+
+        :param name: name of the database
+        :type name: str
+
+        :returns: database
+        :rtype: couchdb.Database|vpy.store.StoreDb
+        """
+        if name is None:
+            name = self.config['db']['name']
+        store = self.get_store()
+        if store is not None:
+            if name not in self.dbs:
+                self.dbs[name] = store.db(name)
+            return self.dbs[name]
+
+        srv = self.get_srv()
+        if name not in self.dbs:
+            self.dbs[name] = srv[name]
+
+        return self.dbs[name]
+
     def read_json(self, fname):
         with open(fname) as json_doc_file:
             doc = json.load(json_doc_file)
@@ -213,9 +332,9 @@ class Io(object):
         :returns: assembled dictionary
         :rtype: dict
         """
+        timing.begin(doc_id)
 
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
         doc = db.get(doc_id)
 
         if doc:
@@ -236,15 +355,100 @@ class Io(object):
         :param doc: document
         :type doc: dict
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
 
-        old_doc = db.get(doc["_id"])
-        if old_doc and not 'error' in old_doc:
-            doc["_rev"] = old_doc["_rev"]
+        rev = self.get_rev(doc["_id"])
+        if rev:
+            doc["_rev"] = rev
 
         return db.save(doc)
 
+    def get_rev(self, doc_id):
+        """Returns the current revision of a document by means of a
+        HEAD request (``None`` if the document does not exist).
+
+        :param doc_id: document id
+        :type doc_id: str
+
+        :returns: revision
+        :rtype: str
+        """
+        if self.get_store() is not None:
+            return self.get_db().get_rev(doc_id)
+        try:
+            _, headers, _ = self.get_db().resource.head(doc_id)
+        except couchdb.http.ResourceNotFound:
+            return None
+
+        return headers.get("ETag", "").strip('"') or None
+
+    def get_revs(self, doc_ids):
+        """Returns the current revisions of the documents with one
+        ``_all_docs`` request.
+
+        :param doc_ids: document ids
+        :type doc_ids: list
+
+        :returns: revision by id (missing documents are left out)
+        :rtype: dict
+        """
+        if self.get_store() is not None:
+            return self.get_db().get_revs(doc_ids)
+        _, _, data = self.get_db().resource.post_json('_all_docs', body={"keys": doc_ids})
+
+        return {row["key"]: row["value"]["rev"] for row in data.get("rows", [])
+                if "value" in row and not row["value"].get("deleted")}
+
+    def get_docs(self, doc_ids):
+        """Gets the documents with the given ids in one request.
+
+        :param doc_ids: document ids
+        :type doc_ids: list
+
+        :returns: documents in the order of ``doc_ids`` (``None`` if not found)
+        :rtype: list
+        """
+        db = self.get_db()
+        if self.get_store() is not None:
+            return db.get_docs(doc_ids)
+
+        docs = {}
+        try:
+            _, _, data = db.resource.post_json('_bulk_get', body={"docs": [{"id": doc_id} for doc_id in doc_ids]})
+            for result in data.get("results", []):
+                for d in result.get("docs", []):
+                    if "ok" in d:
+                        docs[result["id"]] = d["ok"]
+        except (couchdb.http.ResourceNotFound, couchdb.http.ServerError):
+            ## no _bulk_get (CouchDB < 2.0)
+            for row in db.view('_all_docs', keys=doc_ids, include_docs=True):
+                if row.doc is not None:
+                    docs[row.key] = dict(row.doc)
+
+        return [docs.get(doc_id) for doc_id in doc_ids]
+
+    def save_docs(self, docs):
+        """Writes the documents back to the database in one request.
+        Missing ``_rev``s are resolved with one request by means of
+        ``get_revs()``.
+
+        :param docs: documents
+        :type docs: list
+
+        :returns: list of (id, error) with ``error`` ``None`` on success
+        :rtype: list
+        """
+        db = self.get_db()
+
+        no_rev = [doc["_id"] for doc in docs if "_id" in doc and "_rev" not in doc]
+        if len(no_rev) > 0:
+            revs = self.get_revs(no_rev)
+            for doc in docs:
+                if doc.get("_id") in revs and "_rev" not in doc:
+                    doc["_rev"] = revs[doc["_id"]]
+
+        return [(doc_id, None if ok else str(rev)) for ok, doc_id, rev in db.update(docs)]
+
     def update_cal_doc(self, doc, base_doc):
         """More or less a merge between ``doc`` and ``base_doc``.
 
@@ -272,16 +476,42 @@ class Io(object):
         """Gets the latest standard related documents from the given
         database and combines it to one document.
 
+        The combined document is cached on disk (see ``self.config['cache']``).
+        The cache entry is used as long as the validator of the view
+        (see ``get_view_validator()``) is unchanged.
+
         :param name: name of the standard e.g. ``se2`` or ``se3``
         :type doc: str
 
         :returns: updated calibration document
         :rtype: dict
         """
-
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
         view = self.config['standards'][name]['all_doc_view']
+        validator = None
+
+        if self.config['cache']['base_doc']:
+            validator = self.get_view_validator(view)
+            doc = self.read_cache(name, validator)
+            if doc is not None:
+                return doc
+
+        doc = self.fetch_base_doc(view)
+
+        if validator is not None:
+            self.write_cache(name, validator, doc)
+
+        return doc
+
+    def fetch_base_doc(self, view):
+        """Combines the rows of the ``view`` to the base document.
+
+        :param view: view e.g. ``se3_req/doc``
+        :type view: str
+
+        :returns: base document
+        :rtype: dict
+        """
+        db = self.get_db()
 
         doc = {"Standard": {},
                "Constants": {},
@@ -310,6 +540,177 @@ class Io(object):
 
         return doc
 
+    def get_view_validator(self, view):
+        """Returns a string changing whenever the result of the ``view``
+        may change: the ETag of the view (HEAD request, no rows are
+        transferred) or, if the server sends none, the ``update_seq``
+        of the database (always with an offline store). Returns
+        ``None`` if neither is available.
+
+        :param view: view e.g. ``se3_req/doc``
+        :type view: str
+
+        :returns: validator
+        :rtype: str
+        """
+        db = self.get_db()
+        if self.get_store() is not None:
+            return "seq:{}".format(db.info()["update_seq"])
+        design, name = view.split("/")
+        try:
+            _, headers, _ = db.resource('_design', design, '_view', name).head()
+            etag = headers.get("ETag")
+            if etag:
+                return "etag:{}".format(etag.strip('"'))
+
+            seq = db.info().get("update_seq")
+            if seq is not None:
+                return "seq:{}".format(seq)
+        except (couchdb.http.ResourceNotFound, couchdb.http.ServerError):
+            pass
+
+        return None
+
+    @staticmethod
+    def user_cache_path():
+        """Default cache directory: ``vpy`` in ``$XDG_CACHE_HOME`` or
+        ``~/.cache`` (per user, not shared).
+
+        :returns: path
+        :rtype: str
+        """
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+        return os.path.join(base, "vpy")
+
+    def cache_dir(self):
+        """Returns the cache directory (created with mode 0700 if
+        missing) or ``None`` if it can not be created, is not owned
+        by the current user or is accessible by others; the disk
+        cache is not used then.
+
+        :returns: path
+        :rtype: str
+        """
+        path = self.config['cache']['path']
+        try:
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            st = os.stat(path)
+        except OSError:
+            return None
+        if hasattr(os, "getuid") and st.st_uid != os.getuid():
+            return None
+        if st.st_mode & 0o077:
+            return None
+
+        return path
+
+    def cache_file(self, name):
+        """Path of the cache file of the standard ``name`` for the
+        current server (or store) and database (credentials are not
+        part of the key).
+
+        :param name: name of the standard e.g. ``se3``
+        :type name: str
+
+        :returns: path
+        :rtype: str
+        """
+        url = self.config['db']['store'] or re.sub("//[^/@]*@", "//", self.config['db']['url'])
+        key = "{}|{}|{}".format(url, self.config['db']['name'], name)
+        h = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+        return os.path.join(self.config['cache']['path'], "base_doc-{}-{}.json".format(name, h))
+
+    def read_cache(self, name, validator):
+        """Returns the cached base document if it was stored with the
+        given ``validator``; counts hits and misses. With ``base_docs``
+        (a dict) the documents are kept in memory too; a copy is
+        returned. Files are only read from a private cache directory
+        (see ``cache_dir()``).
+
+        :returns: base document or ``None``
+        :rtype: dict
+        """
+        doc = None
+        if validator is not None:
+            key = (self.cache_file(name), validator)
+            if self.base_docs is not None and key in self.base_docs:
+                doc = copy.deepcopy(self.base_docs[key])
+            elif self.cache_dir() is not None:
+                try:
+                    with open(self.cache_file(name)) as f:
+                        entry = json.load(f)
+                    if entry.get("validator") == validator:
+                        doc = entry.get("doc")
+                except (OSError, ValueError):
+                    pass
+                if doc is not None and self.base_docs is not None:
+                    self.base_docs[key] = copy.deepcopy(doc)
+
+        self.count_cache(name, "hit" if doc is not None else "miss")
+
+        return doc
+
+    def write_cache(self, name, validator, doc):
+        """Stores the base document together with its ``validator``.
+        Nothing is written if the cache directory is not usable or
+        writing fails.
+        """
+        if self.base_docs is not None:
+            self.base_docs[(self.cache_file(name), validator)] = copy.deepcopy(doc)
+
+        path = self.cache_dir()
+        if path is None:
+            return
+        tmp = None
+        try:
+            fd, tmp = tempfile.mkstemp(dir=path)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"validator": validator, "time": time.time(), "doc": doc}, f)
+            os.replace(tmp, self.cache_file(name))
+        except OSError:
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def count_cache(self, name, event):
+        """Counts cache hits and misses per standard (in memory, per
+        instance).
+        """
+        self.cache_counts.setdefault(name, {"hit": 0, "miss": 0})
+        self.cache_counts[name][event] = self.cache_counts[name][event] + 1
+
+    def cache_stats(self):
+        """Returns the hit and miss counts of the base doc cache.
+
+        :returns: ``{standard: {"hit": n, "miss": m}}``
+        :rtype: dict
+        """
+        return copy.deepcopy(self.cache_counts)
+
+    def invalidate_cache(self, name=None):
+        """Removes the cached base documents of the standard ``name``
+        (all standards if ``None``).
+
+        :param name: name of the standard e.g. ``se3``
+        :type name: str
+
+        :returns: number of removed entries
+        :rtype: int
+        """
+        path = self.config['cache']['path']
+        if not os.path.isdir(path):
+            return 0
+
+        prefix = "base_doc-{}-".format(name) if name else "base_doc-"
+        n = 0
+        for file_name in os.listdir(path):
+            if file_name.startswith(prefix):
+                os.remove(os.path.join(path, file_name))
+                n = n + 1
+
+        return n
+
     def get_state_doc(self, name, enddate=None, startdate="2022-01-01"):
         """Gets and returns the state document
          containing the additional volume outgasing rate ect.
@@ -325,8 +726,7 @@ class Io(object):
         :returns: document
         :rtype: dict
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['work_db']]
+        db = self.get_db(self.config['db']['work_db'])
         view = self.config['standards'][name]['state_doc_view']
 
         if enddate:
@@ -345,8 +745,7 @@ class Io(object):
         10Torr PN SE2: 9911) for the given date (format yyyy-mm-dd)
         and std (SE2, SE3)
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
         view = self.config['standards'][std]['pn_view']
 
         doc = None
@@ -366,8 +765,7 @@ class Io(object):
         :returns: document
         :rtype: dict
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
         dat = {}
 
         view = self.config['standards'][std]['hist_data']
@@ -394,8 +792,7 @@ class Io(object):
         :returns: document
         :rtype: dict
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
         dat = []
 
         start_key = "{}~{}".format(task_name, date_from)
@@ -417,8 +814,7 @@ class Io(object):
         :returns: document
         :rtype: dict
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
         dat = []
 
 
@@ -437,8 +833,7 @@ class Io(object):
         :returns: document
         :rtype: dict
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
         dat = []
 
         view = self.config['standards'][std]['device_info']
@@ -459,8 +854,7 @@ class Io(object):
         :returns: document
         :rtype: dict
         """
-        srv = couchdb.Server(self.config['db']['url'])
-        db = srv[self.config['db']['name']]
+        db = self.get_db()
         dat = []
 
         view = self.config['standards'][std]['device_repeat']
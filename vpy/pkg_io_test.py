@@ -0,0 +1,249 @@
+import os
+import unittest
+import json
+import hashlib
+import tempfile
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .pkg_io import Io
+
+class CouchStandIn(ThreadingHTTPServer):
+    """Minimal CouchDB compatible server (documents, revisions,
+    ``_bulk_get``, ``_bulk_docs``, ``_all_docs`` and views given as
+    lists of rows) for tests without a database server.
+
+    :param dbs: documents by id by database name
+    :type dbs: dict
+    :param views: rows by view path (e.g. ``se3_req/doc``)
+    :type views: dict
+    """
+    daemon_threads = True
+
+    def __init__(self, dbs, views=None):
+        super().__init__(("127.0.0.1", 0), CouchStandInHandler)
+        self.dbs = dbs
+        self.views = views or {}
+        self.connections = 0
+        self.requests = []
+        for db in dbs.values():
+            for doc_id, doc in db.items():
+                doc.setdefault("_id", doc_id)
+                doc.setdefault("_rev", "1-a")
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def view_rows(self, path, query):
+        """Rows of the view ``path`` filtered by the query and the ETag
+        (hash of all rows of the view).
+        """
+        if len(path) != 5 or path[1] != "_design" or path[3] != "_view":
+            return None, None
+        rows = self.views.get("{}/{}".format(path[2], path[4]))
+        if rows is None:
+            return None, None
+        etag = hashlib.sha1(json.dumps(rows, sort_keys=True).encode("utf-8")).hexdigest()
+        if "key" in query:
+            rows = [r for r in rows if r["key"] == query["key"]]
+        if "startkey" in query:
+            rows = [r for r in rows if r["key"] >= query["startkey"]]
+        if "endkey" in query:
+            rows = [r for r in rows if r["key"] <= query["endkey"]]
+        return rows, '"{}"'.format(etag)
+
+    def put_doc(self, db, doc):
+        old = self.dbs[db].get(doc["_id"])
+        if old is not None and old["_rev"] != doc.get("_rev"):
+            return 409, {"id": doc["_id"], "error": "conflict", "reason": "Document update conflict."}
+        n = int(old["_rev"].split("-")[0]) + 1 if old else 1
+        doc = dict(doc, _rev="{}-a".format(n))
+        self.dbs[db][doc["_id"]] = doc
+        return 201, {"ok": True, "id": doc["_id"], "rev": doc["_rev"]}
+
+class CouchStandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections = self.server.connections + 1
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=None, headers=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def parse(self):
+        url = urllib.parse.urlsplit(self.path)
+        path = [urllib.parse.unquote(p) for p in url.path.split("/") if p]
+        query = {k: json.loads(v[0]) for k, v in urllib.parse.parse_qs(url.query).items()}
+        self.server.requests.append((self.command, url.path))
+        return path, query
+
+    def body(self):
+        n = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(n)) if n > 0 else None
+
+    def not_found(self):
+        self.reply(404, {"error": "not_found", "reason": "missing"})
+
+    def do_HEAD(self):
+        path, query = self.parse()
+        rows, etag = self.server.view_rows(path, query)
+        if rows is not None:
+            return self.reply(200, headers={"ETag": etag})
+        if len(path) == 1 and path[0] in self.server.dbs:
+            return self.reply(200)
+        if len(path) == 2 and path[1] in self.server.dbs.get(path[0], {}):
+            doc = self.server.dbs[path[0]][path[1]]
+            return self.reply(200, headers={"ETag": '"{}"'.format(doc["_rev"])})
+        self.not_found()
+
+    def do_GET(self):
+        path, query = self.parse()
+        if len(path) == 2 and path[1] in self.server.dbs.get(path[0], {}):
+            return self.reply(200, self.server.dbs[path[0]][path[1]])
+        rows, etag = self.server.view_rows(path, query)
+        if rows is not None:
+            return self.reply(200, {"total_rows": len(rows), "offset": 0, "rows": rows}, {"ETag": etag})
+        self.not_found()
+
+    def do_PUT(self):
+        path, _ = self.parse()
+        if len(path) == 2 and path[0] in self.server.dbs:
+            doc = dict(self.body(), _id=path[1])
+            return self.reply(*self.server.put_doc(path[0], doc))
+        self.not_found()
+
+    def do_POST(self):
+        path, _ = self.parse()
+        if len(path) != 2 or path[0] not in self.server.dbs:
+            return self.not_found()
+        db = self.server.dbs[path[0]]
+        body = self.body()
+
+        if path[1] == "_bulk_get":
+            results = []
+            for d in body["docs"]:
+                if d["id"] in db:
+                    results.append({"id": d["id"], "docs": [{"ok": db[d["id"]]}]})
+                else:
+                    results.append({"id": d["id"], "docs": [{"error": {"id": d["id"], "error": "not_found"}}]})
+            return self.reply(200, {"results": results})
+
+        if path[1] == "_bulk_docs":
+            return self.reply(201, [self.server.put_doc(path[0], doc)[1] for doc in body["docs"]])
+
+        if path[1] == "_all_docs":
+            rows = [{"id": k, "key": k, "value": {"rev": db[k]["_rev"]}} if k in db else
+                    {"key": k, "error": "not_found"} for k in body["keys"]]
+            return self.reply(200, {"total_rows": len(db), "offset": 0, "rows": rows})
+
+        self.not_found()
+
+class TestIo(unittest.TestCase):
+
+    def setUp(self):
+        self.srv = CouchStandIn({"vl_db": {"a": {"Calibration": {"A": 1}},
+                                           "b": {"Calibration": {"B": 2}}},
+                                 "vl_db_work": {}},
+                                {"se3_req/doc": [
+                                    {"id": "s", "key": "Standard", "value": {"Standard": {"Name": "SE3"}}},
+                                    {"id": "c", "key": "CalibrationObject", "value": {"CalibrationObject": {"Sign": "X"}}},
+                                    {"id": "r", "key": "Result-X", "value": {"Sign": "X", "Result": [{"Type": "a"}]}}]}).start()
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.io = Io(db_url=self.srv.url)
+        self.io.config["cache"]["path"] = self.cache_dir.name
+
+    def tearDown(self):
+        self.srv.stop()
+        self.cache_dir.cleanup()
+
+    def test_get_docs_1(self):
+        """bulk get keeps the order of the ids, missing docs are None
+        """
+        docs = self.io.get_docs(["b", "x", "a"])
+        self.assertEqual(docs[0]["Calibration"]["B"], 2)
+        self.assertIsNone(docs[1])
+        self.assertEqual(docs[2]["_rev"], "1-a")
+
+    def test_save_docs_1(self):
+        """missing revisions are resolved in bulk, conflicts are reported
+        """
+        res = self.io.save_docs([{"_id": "a", "Calibration": {}},
+                                 {"_id": "b", "_rev": "0-x"},
+                                 {"_id": "c"}])
+        self.assertEqual(res[0], ("a", None))
+        self.assertIsNotNone(res[1][1])
+        self.assertEqual(res[2], ("c", None))
+        self.assertEqual(self.srv.dbs["vl_db"]["a"]["_rev"], "2-a")
+
+    def test_set_doc_db_1(self):
+        """the revision is resolved by HEAD; one connection for all requests
+        """
+        self.io.get_doc_db("a")
+        self.io.set_doc_db({"_id": "a", "Calibration": {"A": 3}})
+        self.io.set_doc_db({"_id": "a", "Calibration": {"A": 4}})
+
+        self.assertEqual(self.srv.dbs["vl_db"]["a"]["Calibration"]["A"], 4)
+        self.assertEqual(self.srv.dbs["vl_db"]["a"]["_rev"], "3-a")
+        self.assertFalse(("GET", "/vl_db/a") in self.srv.requests[2:])
+        self.assertEqual(self.srv.connections, 1)
+
+    def test_get_base_doc_1(self):
+        """the cached base doc is used as long as the ETag of the view is unchanged
+        """
+        doc = self.io.get_base_doc("se3")
+        self.assertEqual(doc["CalibrationObject"][0]["Values"], [{"Type": "a"}])
+        n = len(self.srv.requests)
+        self.assertEqual(self.io.get_base_doc("se3"), doc)
+        self.assertEqual(self.srv.requests[n:], [("HEAD", "/vl_db/_design/se3_req/_view/doc")])
+
+        self.srv.views["se3_req/doc"][0]["value"]["Standard"]["Name"] = "SE3b"
+        self.assertEqual(self.io.get_base_doc("se3")["Standard"]["Name"], "SE3b")
+        self.assertEqual(self.io.cache_stats(), {"se3": {"hit": 1, "miss": 2}})
+
+    def test_invalidate_cache_1(self):
+        """invalidation removes the entries; disabled cache fetches the view
+        """
+        self.io.get_base_doc("se3")
+        self.assertEqual(self.io.invalidate_cache("se3"), 1)
+        self.io.config["cache"]["base_doc"] = False
+        self.io.get_base_doc("se3")
+        self.assertEqual(self.srv.requests[-1][0], "GET")
+        self.assertEqual(self.io.invalidate_cache(), 0)
+
+    def test_cache_dir_1(self):
+        """a cache directory accessible by others is neither read nor written
+        """
+        self.io.get_base_doc("se3")
+        os.chmod(self.cache_dir.name, 0o777)
+        n = len(self.srv.requests)
+        self.io.get_base_doc("se3")
+        self.assertEqual(self.srv.requests[n:][-1][0], "GET")
+        self.assertEqual(self.io.cache_stats(), {"se3": {"hit": 0, "miss": 2}})
+
+    def test_write_cache_1(self):
+        """writing fails soft if the cache directory can not be created
+        """
+        self.io.config["cache"]["path"] = os.path.join(self.cache_dir.name, "file", "sub")
+        open(os.path.join(self.cache_dir.name, "file"), "w").close()
+        self.assertEqual(self.io.get_base_doc("se3")["Standard"]["Name"], "SE3")
@@ -87,7 +87,6 @@ class Result(Analysis):
         self.Val = Values(doc)
         self.Date = Date(doc)
         self.lang = doc.get("Calibration",{}).get("Customer",{}).get("Lang", "en")
-        self.org = copy.deepcopy(doc)
 
         super().__init__(doc, init_dict)
 
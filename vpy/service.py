@@ -0,0 +1,255 @@
+"""Long running analysis service.
+
+The entry point scripts (e.g. ``script/se3/cal_filling_pressure.py``,
+``script/se3/check_analysis.py``, ``script/se3/cal_analysis_expansion.py``)
+are run in warm worker processes instead of a new python process per
+call. A worker keeps the imported modules, the base documents
+(``Io.base_docs``), the shared devices (``Device.shared()``), the
+filling pressure grids (``FillGrid.shared()``) and the compiled models
+of all previous requests.
+
+python -m vpy.service                      # json lines on stdin/stdout
+python -m vpy.service --http 8765          # POST json to http://127.0.0.1:8765
+python -m vpy.service --workers 4 --timeout 30
+
+A request is a json object::
+
+    {"id": 1,
+     "script": "script/se3/cal_filling_pressure.py",
+     "args": ["--target_pressure", "10", "--pressure_unit", "Pa"]}
+
+The script is run in a worker with ``sys.argv`` set to the arguments;
+the answer holds the output (``stdout``) and the json printed last
+(``result``) as well as the time in the worker (``run_s``) and in
+total (``time_s``)::
+
+    {"id": 1, "ok": true, "result": {...}, "stdout": "...",
+     "run_s": 0.004, "time_s": 0.005}
+
+Errors (``sys.exit("...")``, exceptions, timeouts, too many requests)
+give ``"ok": false`` and ``error``. At most ``workers`` requests run at
+the same time, at most ``max_pending`` wait; further requests are
+rejected. Only scripts below ``script_path`` are run.
+"""
+import io
+import os
+import sys
+import json
+import time
+import runpy
+import argparse
+import threading
+import traceback
+import contextlib
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def warm(path):
+    """Initialises a worker: working directory (the scripts append
+    ``.`` to ``sys.path``), base documents in memory and the modules of
+    the entry points.
+    """
+    os.chdir(path)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    from .pkg_io import Io
+    from .analysis import Analysis
+    from .standard.se3 import cal, uncert
+    Io.base_docs = {}
+
+def last_json(out):
+    """Returns the json of the last non empty line of ``out`` or ``None``.
+    """
+    for line in reversed(out.splitlines()):
+        if line.strip():
+            try:
+                return json.loads(line)
+            except ValueError:
+                return None
+
+    return None
+
+def run_script(path, args):
+    """Runs the script ``path`` as ``__main__`` with the arguments
+    ``args`` in the worker.
+
+    :returns: output, error message (``None`` if ok) and run time
+    :rtype: dict
+    """
+    argv, path_list = sys.argv, list(sys.path)
+    out = io.StringIO()
+    error = None
+    t_0 = time.perf_counter()
+    sys.argv = [path] + [str(a) for a in args]
+    try:
+        with contextlib.redirect_stdout(out):
+            runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            error = str(e.code)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        sys.argv = argv
+        sys.path[:] = path_list
+
+    return {"stdout": out.getvalue(), "error": error, "run_s": time.perf_counter() - t_0}
+
+class Service(object):
+    """Pool of warm worker processes running the entry point scripts.
+
+    :param workers: number of worker processes (requests run at the same time)
+    :type workers: int
+    :param timeout: time (s) after which a request is answered with an
+                    error (the worker finishes the script)
+    :type timeout: float
+    :param max_pending: number of requests waiting for a worker
+    :type max_pending: int
+    :param path: directory the scripts are given relative to
+    :type path: str
+    :param script_path: directory containing the scripts allowed to run
+                        (default: ``script`` of ``path``)
+    :type script_path: str
+    """
+    def __init__(self, workers=1, timeout=60.0, max_pending=16, path=root, script_path=None):
+        self.workers = max(int(workers), 1)
+        self.timeout = timeout
+        self.path = os.path.realpath(path)
+        self.script_path = os.path.realpath(script_path or os.path.join(self.path, "script"))
+        self.slots = threading.BoundedSemaphore(self.workers + max_pending)
+        self.pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers,
+                                                           initializer=warm, initargs=(self.path,))
+
+    def script(self, name):
+        """Returns the path of the script ``name`` or ``None`` if it is
+        not an allowed script.
+        """
+        if not isinstance(name, str):
+            return None
+        path = os.path.realpath(os.path.join(self.path, name))
+        if not path.startswith(self.script_path + os.sep) or not path.endswith(".py") or not os.path.isfile(path):
+            return None
+
+        return path
+
+    def handle(self, request):
+        """Runs the ``request`` in a worker and returns the answer
+        (see module).
+
+        :param request: id, script and args
+        :type request: dict
+
+        :returns: answer
+        :rtype: dict
+        """
+        t_0 = time.perf_counter()
+        ret = {"id": request.get("id"), "ok": False}
+        path = self.script(request.get("script"))
+        if path is None:
+            ret["error"] = "unknown script {}".format(request.get("script"))
+        elif not self.slots.acquire(blocking=False):
+            ret["error"] = "too many requests"
+        else:
+            try:
+                future = self.pool.submit(run_script, path, request.get("args", []))
+            except Exception as e:
+                self.slots.release()
+                raise e
+            ## the slot is free when the worker is done (not at a timeout)
+            future.add_done_callback(lambda f: self.slots.release())
+            try:
+                res = future.result(timeout=request.get("timeout", self.timeout))
+                ret.update(res)
+                ret["ok"] = res["error"] is None
+                ret["result"] = last_json(res["stdout"])
+                if ret["ok"]:
+                    del ret["error"]
+            except concurrent.futures.TimeoutError:
+                ret["error"] = "timeout"
+            except Exception as e:
+                ret["error"] = repr(e)
+        ret["time_s"] = time.perf_counter() - t_0
+
+        return ret
+
+    def serve_lines(self, fin=sys.stdin, fout=sys.stdout):
+        """Answers the requests (one json object per line) of ``fin``
+        on ``fout`` as they complete (answers carry the ``id`` of the
+        request).
+        """
+        lock = threading.Lock()
+        threads = []
+
+        def answer(request):
+            ret = self.handle(request)
+            with lock:
+                fout.write(json.dumps(ret) + "\n")
+                fout.flush()
+
+        for line in fin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                with lock:
+                    fout.write(json.dumps({"ok": False, "error": "no json"}) + "\n")
+                    fout.flush()
+                continue
+            t = threading.Thread(target=answer, args=(request,))
+            t.start()
+            threads.append(t)
+            threads = [t for t in threads if t.is_alive()]
+
+        for t in threads:
+            t.join()
+
+    def serve_http(self, port, host="127.0.0.1"):
+        """Answers requests POSTed to ``http://host:port``.
+        """
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                    ret = service.handle(request)
+                except ValueError:
+                    ret = {"ok": False, "error": "no json"}
+                body = json.dumps(ret).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        with ThreadingHTTPServer((host, port), Handler) as srv:
+            srv.serve_forever()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max_pending", type=int, default=16)
+    parser.add_argument("--http", type=int, help="port (default: json lines on stdin/stdout)")
+    args = parser.parse_args()
+
+    service = Service(workers=args.workers, timeout=args.timeout, max_pending=args.max_pending)
+    try:
+        if args.http:
+            service.serve_http(args.http)
+        else:
+            service.serve_lines()
+    finally:
+        service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import io
+import json
+import unittest
+import tempfile
+from . import service
+
+class TestService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dir = tempfile.TemporaryDirectory()
+        script = os.path.join(cls.dir.name, "script")
+        os.makedirs(script)
+        with open(os.path.join(script, "echo.py"), "w") as f:
+            f.write("import sys, json\nprint('log')\nprint(json.dumps({'args': sys.argv[1:]}))\n")
+        with open(os.path.join(script, "fail.py"), "w") as f:
+            f.write("import sys\nsys.exit('no doc')\n")
+        with open(os.path.join(cls.dir.name, "outside.py"), "w") as f:
+            f.write("print(1)\n")
+        cls.service = service.Service(workers=1, path=cls.dir.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.close()
+        cls.dir.cleanup()
+
+    def test_handle_1(self):
+        """result, errors of the script and scripts not allowed
+        """
+        ret = self.service.handle({"id": 1, "script": "script/echo.py", "args": ["--ids", "a@b"]})
+        self.assertTrue(ret["ok"])
+        self.assertEqual(ret["id"], 1)
+        self.assertEqual(ret["result"], {"args": ["--ids", "a@b"]})
+        self.assertLessEqual(ret["run_s"], ret["time_s"])
+
+        ret = self.service.handle({"script": "script/fail.py"})
+        self.assertFalse(ret["ok"])
+        self.assertEqual(ret["error"], "no doc")
+
+        for name in ("outside.py", "script/../outside.py", "script/missing.py", None):
+            self.assertFalse(self.service.handle({"script": name})["ok"])
+
+    def test_serve_lines_1(self):
+        """one answer per request line
+        """
+        fin = io.StringIO('{"id": 1, "script": "script/echo.py"}\nnot json\n{"id": 2, "script": "script/fail.py"}\n')
+        fout = io.StringIO()
+        self.service.serve_lines(fin, fout)
+        answers = [json.loads(l) for l in fout.getvalue().splitlines()]
+
+        self.assertEqual(len(answers), 3)
+        self.assertEqual(sorted(a.get("id") or 0 for a in answers), [0, 1, 2])
+        self.assertEqual(sum(a["ok"] for a in answers), 1)
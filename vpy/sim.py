@@ -0,0 +1,409 @@
+"""Synthetic calibration and state documents for load and regression
+tests, benchmarks and profiling. No database is needed.
+
+.. code-block:: python
+
+    from vpy.sim import Sim
+
+    doc = Sim("se3").build()
+    doc = Sim("frs5", n=10000, seed=1, customer_object="SRG").build()
+    doc = Sim("se3", n=100, noise={"ch_*": {"Model": "normal", "Abs": 0.02}}).build()
+    doc = Sim("se3", doc_type="State").build()
+    doc = Sim("se2", base_doc=Io().get_base_doc("se2")).build()
+
+The measurement values are generated from the templates of the
+standards (``vpy/standard/<standard>/values.json`` and
+``aux_values.json``)::
+
+    {"Pressure": {"R": {"Type": "frs_p", "Unit": "lb",
+                        "Min": 0.001, "Max": 11.0,
+                        "Sim": [0.03, 0.05, 0.09],
+                        "Noise": {"Model": "normal", "Rel": 1e-5}}}}
+
+``Sim`` holds the values of the template points; for ``n`` points they
+are interpolated over the point index (logarithmic if all values are
+positive). The noise (``normal`` or ``uniform`` with an absolute
+``Abs`` and a relative ``Rel`` width, ``drift`` rising linearly to
+``Abs`` and ``Rel`` at the last point) of the template may be replaced
+by ``noise`` (keys are ``Type`` patterns, see ``fnmatch``). Values are
+clipped to ``[Min, Max]``.
+
+SE3 calibrations are generated from ``values_struct.json``: the
+filling pressures and expansions of the target pressures are planned by
+``vpy.standard.se3.fill.FillPlanner``. The base documents of FRS5,
+DKM_PPC4 and SE3 are part of the package; those of SE2 and CE3
+(``vpy/standard/<standard>/base_doc.json``) are templates with the
+devices and values the analysis needs, not the values of the standards
+(give ``base_doc`` for those).
+
+The customer indication (``ind``, ``ind_offset``) is derived from the
+calibration pressure: ``ind = (p_cal + ind_abs_dev) * (1 + ind_rel_dev)``.
+"""
+import os
+import sys
+import copy
+import json
+import fnmatch
+import numpy as np
+
+path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "standard")
+
+customer_objects = {
+    "CDG": {"Class": "CDG",
+            "Name": "SIM_CDG",
+            "Device": {"Producer": "MKS Instruments"},
+            "Setup": {"TypeHead": "1Torr", "Unit": "Pa"},
+            "Uncertainty": [{"Type": "digit", "Value": 2.9e-7, "Unit": "Pa"}]},
+    "SRG": {"Class": "SRG",
+            "Name": "SIM_SRG",
+            "Device": {"Producer": "MKS Instruments", "Type": "SRG-2"},
+            "Setup": {},
+            "Uncertainty": [{"Type": "offset", "Value": 1.0e-5, "Unit": "Pa"}]},
+    "IG": {"Class": "IG",
+           "Name": "SIM_IG",
+           "Device": {"Producer": "Leybold"},
+           "Setup": {},
+           "Uncertainty": []},
+    }
+
+class Sim(object):
+    """Generator of synthetic documents.
+
+    :param standard: name of the standard (``se3``, ``se2``, ``frs5``,
+                     ``ce3`` or ``dkm_ppc4``)
+    :type standard: str
+    :param n: number of measurement points (default: points of the template)
+    :type n: int
+    :param seed: seed of the random number generator
+    :type seed: int
+    :param noise: noise models by ``Type`` pattern (see module)
+    :type noise: dict
+    :param customer_object: class of the customer device (see
+                            ``customer_objects``) or ``CustomerObject``
+    :type customer_object: str or dict
+    :param base_doc: ``Standard``, ``Constants`` and ``CalibrationObject``
+                     (a base document or a calibration document)
+    :type base_doc: dict
+    :param doc_type: ``Calibration`` or ``State`` (SE3)
+    :type doc_type: str
+    :param gas: calibration gas
+    :type gas: str
+    """
+    standards = {"se3": {"Standard": "SE3", "BaseDoc": "cal-sim-se3.json", "States": True},
+                 "se2": {"Standard": "SE2", "BaseDoc": "base_doc.json"},
+                 "frs5": {"Standard": "FRS5", "BaseDoc": "base_doc.json"},
+                 "ce3": {"Standard": "CE3", "BaseDoc": "base_doc.json"},
+                 "dkm_ppc4": {"Standard": "DKM_PPC4", "BaseDoc": "base_doc.json"}}
+
+    ## see script/se3/sim_config.json
+    se3_targets = [0.01, 0.013, 0.015, 0.04, 0.05, 0.06, 0.07, 0.08, 0.09,
+                   0.1, 0.13, 0.15, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9,
+                   1, 1.3, 1.5, 3, 4, 5, 6, 7, 8, 9,
+                   10, 13, 15, 30, 40, 50, 60, 70, 80, 90,
+                   100, 130]
+    se3_meas_time = 45000.0
+
+    ind_abs_dev = 0.0
+    ind_rel_dev = 1.0e-3
+    ind_offset_noise = {"Model": "normal", "Abs": 1.0e-5}
+
+    def __init__(self, standard, n=None, seed=0, noise=None, customer_object="CDG",
+                 base_doc=None, doc_type="Calibration", gas="N2"):
+        self.standard = standard.lower()
+        if self.standard not in self.standards:
+            sys.exit("no simulation of standard {}".format(standard))
+        if doc_type == "State" and not self.standards[self.standard].get("States"):
+            sys.exit("no simulation of state documents of {}".format(standard))
+        if n is not None and n < 1:
+            sys.exit("number of points must be positive")
+
+        self.conf = self.standards[self.standard]
+        self.n = n
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.noise = noise or {}
+        self.base_doc = base_doc
+        self.doc_type = doc_type
+        self.gas = gas
+
+        if isinstance(customer_object, str):
+            if customer_object not in customer_objects:
+                sys.exit("no simulation of customer device class {}".format(customer_object))
+            customer_object = customer_objects[customer_object]
+        self.customer_object = copy.deepcopy(customer_object)
+
+    def template(self, name):
+        """Returns the template ``name`` of the standard.
+        """
+        file_name = os.path.join(path, self.standard, name)
+        if not os.path.isfile(file_name):
+            sys.exit("no template {} of {}".format(name, self.standard))
+        with open(file_name) as f:
+            return json.load(f)
+
+    def get_base_doc(self):
+        """Returns the ``Standard``, ``Constants`` and ``CalibrationObject``
+        of the document.
+        """
+        doc = self.base_doc
+        if doc is None:
+            if self.conf["BaseDoc"] is None:
+                sys.exit("no base document of {} in the package, give base_doc".format(self.standard))
+            doc = self.template(self.conf["BaseDoc"])
+        doc = doc.get("Calibration", doc)
+
+        return {k: copy.deepcopy(doc[k]) for k in ("Standard", "Constants", "CalibrationObject")}
+
+    def resample(self, sim, n):
+        """Returns the values of the template points ``sim`` for ``n``
+        points (see module).
+        """
+        if any(isinstance(v, str) for v in sim):
+            if n is None:
+                return list(sim)
+            return [sim[int(i)] for i in np.round(np.linspace(0, len(sim) - 1, n))]
+
+        v = np.asarray(sim, dtype=float)
+        if n is None or n == len(v):
+            return v.copy()
+        if len(v) == 1:
+            return np.full(n, v[0])
+        x = np.linspace(0.0, 1.0, n)
+        x_sim = np.linspace(0.0, 1.0, len(v))
+        if np.all(v > 0):
+            return np.exp(np.interp(x, x_sim, np.log(v)))
+
+        return np.interp(x, x_sim, v)
+
+    def noise_model(self, t, default=None):
+        """Returns the noise model of the type ``t``.
+        """
+        for pattern, model in self.noise.items():
+            if fnmatch.fnmatchcase(t, pattern):
+                return model
+
+        return default
+
+    def add_noise(self, v, model):
+        """Adds the noise of the ``model`` to the values ``v``.
+        """
+        if not model:
+            return v
+        kind = model.get("Model", "normal")
+        a = model.get("Abs", 0.0)
+        r = model.get("Rel", 0.0)
+        if kind == "normal":
+            z_a, z_r = self.rng.standard_normal(len(v)), self.rng.standard_normal(len(v))
+        elif kind == "uniform":
+            z_a, z_r = self.rng.uniform(-1, 1, len(v)), self.rng.uniform(-1, 1, len(v))
+        elif kind == "drift":
+            z_a = z_r = np.linspace(0.0, 1.0, len(v))
+        else:
+            sys.exit("unknown noise model {}".format(kind))
+
+        return v + a * z_a + r * v * z_r
+
+    def entry(self, t, unit, v, noise=None, lim=(None, None)):
+        """Returns the value entry of the type ``t``.
+        """
+        if not isinstance(v, list):
+            v = self.add_noise(v, self.noise_model(t, noise))
+            if lim[0] is not None or lim[1] is not None:
+                v = np.clip(v, lim[0], lim[1])
+            v = v.tolist()
+        e = {"Type": t, "Value": v}
+        if unit is not None:
+            e["Unit"] = unit
+
+        return e
+
+    def values(self, template, n=None, points=True):
+        """Generates the values of a template (see module). Entries which
+        are no quantities (e.g. ``Gas``) are copied. With ``points`` all
+        entries get ``n`` values (default: the longest ``Sim`` of the
+        template), otherwise those of ``Sim``.
+
+        :returns: values
+        :rtype: dict
+        """
+        if points and n is None:
+            n = max(len(e["Sim"]) for entries in template.values() if isinstance(entries, dict) for e in entries.values())
+        ret = {}
+        for quant, entries in template.items():
+            if not isinstance(entries, dict):
+                ret[quant] = copy.deepcopy(entries)
+                continue
+            ret[quant] = [self.entry(e["Type"], e.get("Unit"), self.resample(e["Sim"], n), e.get("Noise"), (e.get("Min"), e.get("Max")))
+                          for e in entries.values()]
+
+        return ret
+
+    def indication(self, p_cal, unit):
+        """Returns the entries ``ind`` and ``ind_offset`` of the customer
+        device for the calibration pressures ``p_cal``.
+        """
+        p_cal = np.asarray(p_cal, dtype=float)
+        ind = (p_cal + self.ind_abs_dev) * (1 + self.ind_rel_dev)
+        offset = np.zeros(len(p_cal))
+
+        return [self.entry("ind", unit, ind),
+                self.entry("ind_offset", unit, offset, self.ind_offset_noise)]
+
+    def measurement(self):
+        """Generates the ``Measurement`` (``Values`` and ``AuxValues``)
+        of the document.
+
+        :returns: measurement
+        :rtype: dict
+        """
+        if self.standard == "se3" and self.doc_type == "State":
+            vals = self.values(self.template("state_values.json"), self.n)
+            return {"Values": vals, "AuxValues": {"Gas": self.gas}}
+
+        if self.standard == "se3":
+            return self.se3_measurement()
+
+        vals = self.values(self.template("values.json"), self.n)
+        aux = self.values(self.template("aux_values.json"), points=False)
+        aux["Gas"] = self.gas
+        meas = {"Values": vals, "AuxValues": aux}
+
+        if self.standard == "se2":
+            self.se2_indication(vals)
+        if self.standard == "ce3":
+            self.ce3_conductance(meas)
+
+        return meas
+
+    def build(self):
+        """Builds the document.
+
+        :returns: calibration or state document
+        :rtype: dict
+        """
+        base_doc = self.get_base_doc()
+        meas = self.measurement()
+        doc_id = "{}-sim-{}-{}".format("cal" if self.doc_type == "Calibration" else "state", self.standard, self.seed)
+
+        if self.doc_type == "State":
+            body = {"Measurement": meas}
+            body.update(base_doc)
+            return {"_id": doc_id, "State": body}
+
+        todo = {"Standard": self.conf["Standard"], "Type": "error", "Gas": self.gas}
+        body = {"ToDo": todo, "Measurement": meas, "CustomerObject": copy.deepcopy(self.customer_object)}
+        body.update(base_doc)
+        doc = {"_id": doc_id, "Calibration": body}
+
+        if self.standard == "se3":
+            body["Analysis"] = {"AuxValues": self.template("ana_aux_values.json")}
+            todo["Values"] = {"Pressure": [{"Type": "target", "Unit": "Pa", "Value": list(self.se3_targets)}]}
+        if self.standard in ("frs5", "dkm_ppc4"):
+            p_cal, unit = self.pressure_cal(doc)
+            meas["Values"]["Pressure"] = meas["Values"]["Pressure"] + self.indication(p_cal, unit)
+
+        return doc
+
+    def pressure_cal(self, doc):
+        """Returns the calibration pressure of the standard (FRS5,
+        DKM_PPC4) and its unit.
+        """
+        from .analysis import Analysis
+        res = Analysis(doc, git_hash=False)
+        if self.standard == "frs5":
+            from .standard.frs5.cal import Cal
+            cal = Cal(doc)
+            cal.temperature(res)
+            cal.pressure_res(res)
+            cal.pressure_cal(res)
+        if self.standard == "dkm_ppc4":
+            from .standard.dkm_ppc4.cal import Cal
+            cal = Cal(doc)
+            cal.temperature(res)
+            cal.temperature_correction(res)
+            cal.pressure_res(res)
+            cal.mass_total(res)
+            cal.pressure_cal(res)
+
+        return res.pick("Pressure", "cal", cal.unit), cal.unit
+
+    def se2_indication(self, vals):
+        """Derives the corrected (``p_cor``) and the indicated
+        (``p_ind``) pressure of SE2 from ``p_cal``.
+        """
+        p = {e["Type"]: e for e in vals["Pressure"]}["p_cal"]
+        faktor = np.asarray(vals["faktor"][0]["Value"])
+        p_cor = self.entry("p_cor", p["Unit"], (np.asarray(p["Value"]) + self.ind_abs_dev) * (1 + self.ind_rel_dev))
+        vals["Pressure"].append(p_cor)
+        vals["Pressure"].append(self.entry("p_ind", p["Unit"], np.asarray(p_cor["Value"])/faktor))
+
+    def ce3_conductance(self, meas, m=10):
+        """Adds the conductance measurements (``C_<start_sz_mt>``) of
+        CE3: ``m`` pressure rises at the same mean pressure and ``m + 1``
+        piston positions (the first one is the start position, see
+        ``Cal.delta_V()``).
+        """
+        t = meas["Values"]["Time"][0]
+        t["Value"] = ["{:.0f}".format(v) for v in t["Value"]]
+        for ts in t["Value"]:
+            slope = 1.0e-7 * (1 + 0.01 * self.rng.standard_normal())
+            mean_t = float(ts) + 3.0e4 * np.arange(m)
+            meas["AuxValues"]["C_{}".format(ts)] = {"Values": [
+                self.entry("slope_x", "mbar/ms", np.full(m, slope), {"Model": "normal", "Rel": 1e-3}),
+                self.entry("mean_t", "ms", mean_t),
+                self.entry("mean_p", "mbar", np.full(m, 1.0), {"Model": "normal", "Rel": 1e-6}),
+                self.entry("turn", "turn", 0.5 * np.arange(m + 1))]}
+
+    def se3_measurement(self):
+        """Generates the measurement of an SE3 calibration from
+        ``values_struct.json`` (see ``script/se3/sim_gen_data.py``).
+        """
+        from .standard.se3.cal import Cal
+        from .standard.se3.fill import FillPlanner
+
+        target = self.resample(self.se3_targets, self.n)
+        N = len(target)
+        plan = FillPlanner(Cal(self.get_base_doc()), min_p=94.0, with_f_uncert=True).plan(target, "Pa")
+        ok = np.array([name is not None for name in plan["Expansion"]])
+        if not np.all(ok):
+            sys.exit("no expansion for target pressures {}".format(target[~ok]))
+        p_fill = plan["Pressure_fill"]
+        index = np.arange(N)
+
+        vals = self.template("values_struct.json")
+        for quant, entries in vals.items():
+            for i, d in enumerate(entries):
+                t, unit = d.get("Type"), d.get("Unit")
+                noise = None
+                if quant == "Pressure" and t == "target_pressure":
+                    v = target
+                elif quant == "Pressure" and t == "target_fill":
+                    v = p_fill
+                elif quant == "Pressure" and t == "ind":
+                    v = (target + self.ind_abs_dev) * (1 + self.ind_rel_dev)
+                elif quant == "Pressure" and t == "ind_offset":
+                    v, noise = np.zeros(N), self.ind_offset_noise
+                elif quant == "Pressure" and t.endswith("-fill"):
+                    v = p_fill
+                elif quant == "Pressure" and t.endswith("-offset"):
+                    v = np.zeros(N)
+                elif quant == "Expansion":
+                    v = list(plan["Expansion"])
+                elif quant == "Temperature" and t.endswith("_before"):
+                    v = np.full(N, 23.1)
+                elif quant == "Temperature" and t.endswith("_after"):
+                    v = np.full(N, 23.0)
+                elif quant == "Position":
+                    v = ["open"] * N
+                elif quant == "Time" and t == "amt_expansion_end":
+                    v = 100000.0 * index + self.se3_meas_time
+                elif quant == "Time":
+                    v = 100000.0 * index
+                else:
+                    sys.exit("no simulation of {} {}".format(quant, t))
+                entries[i] = self.entry(t, unit, v if isinstance(v, list) else np.array(v, dtype=float), noise)
+
+        aux = self.template("meas_aux_values.json")
+        aux["Gas"] = self.gas
+
+        return {"Values": vals, "AuxValues": aux}
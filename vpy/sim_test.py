@@ -0,0 +1,70 @@
+import json
+import unittest
+import numpy as np
+from vpy.sim import Sim
+from vpy.analysis import Analysis
+from vpy.standard.se3.cal import Cal
+
+class TestSim(unittest.TestCase):
+
+    def values(self, doc, name="Calibration"):
+        return {e["Type"]: e["Value"] for q in doc[name]["Measurement"]["Values"].values() for e in q}
+
+    def test_build_1(self):
+        """same seed gives the same document, other seed an other one
+        """
+        noise = {"*": {"Model": "normal", "Rel": 1e-4}}
+        a = Sim("frs5", n=50, seed=1, noise=noise).build()
+        b = Sim("frs5", n=50, seed=1, noise=noise).build()
+        c = Sim("frs5", n=50, seed=2, noise=noise).build()
+        self.assertEqual(json.dumps(a), json.dumps(b))
+        self.assertNotEqual(self.values(a)["frs_p"], self.values(c)["frs_p"])
+
+    def test_build_2(self):
+        """all entries have n values, noise only for matching types
+        """
+        doc = Sim("frs5", n=50, noise={"frs_p": {"Model": "uniform", "Abs": 1e-3}}).build()
+        ref = Sim("frs5", n=50).build()
+        val, val_ref = self.values(doc), self.values(ref)
+        for t, v in val.items():
+            self.assertEqual(len(v), 50)
+        self.assertNotEqual(val["frs_p"], val_ref["frs_p"])
+        self.assertEqual(val["frs_zc_p"], val_ref["frs_zc_p"])
+        self.assertTrue(np.all(np.abs(np.array(val["frs_p"]) - val_ref["frs_p"]) <= 1e-3))
+
+    def test_build_3(self):
+        """the template points of se3 give the simulated calibration of the package
+        """
+        with open("vpy/standard/se3/cal-sim-se3.json") as f:
+            ref = self.values(json.load(f))
+        val = self.values(Sim("se3").build())
+        for t, v in ref.items():
+            if t != "ind_offset":
+                self.assertEqual(val[t], v)
+
+    def test_build_4(self):
+        """state documents can be analysed
+        """
+        doc = Sim("se3", doc_type="State", n=20).build()
+        cal = Cal(doc)
+        res = Analysis(doc)
+        cal.time_state(res)
+        cal.pressure_state(res)
+        cal.outgas_state(res)
+        self.assertEqual(len(res.pick("Pressure", "qbs-state", cal.unit)), 20)
+
+    def test_build_5(self):
+        """se2 and ce3 documents from the base document templates
+        """
+        from vpy.pipeline import se2_expansion
+        from vpy.standard.ce3.cal import Cal as Ce3Cal
+
+        doc = se2_expansion(Sim("se2", n=5).build())
+        self.assertEqual(len(doc["Calibration"]["Analysis"]["Values"]["Pressure"][0]["Value"]), 5)
+
+        doc = Sim("ce3", n=5).build()
+        cal = Ce3Cal(doc)
+        res = Analysis(doc)
+        cal.drift(res)
+        cal.conductance(res)
+        self.assertTrue(np.all(np.isfinite(res.pick("Conductance", "cnom", "l/s"))))
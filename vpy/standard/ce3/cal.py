@@ -1,9 +1,10 @@
 import sys
 import numpy as np
 import copy
-import sympy as sym
 from .std import Ce3
 from ...values import Values as Val
+from ... import lazy
+sym = lazy.module("sympy")
 
 class Cal(Ce3):
     np.warnings.filterwarnings('ignore')
@@ -1,5 +1,4 @@
 import numpy as np
-import sympy as sym
 from ..standard import Standard
 from ...device.srg import Srg
 from ...device.cdg import InfCdg, Cdg
@@ -7,6 +6,8 @@ from ...device.dmm import Dmm
 from ...constants import Constants
 from ...calibration_devices import CalibrationObject
 from ...values import Temperature, Pressure, Length, Current, Time, Drift, AuxValues
+from ... import lazy
+sym = lazy.module("sympy")
 
 
 class Ce3(Standard):
@@ -41,17 +42,17 @@ class Ce3(Standard):
         self.cdga_lim_x01 = 1.33
         self.cdga_lim_x1 = 13.33
 
-        self.CDGA = Cdg(doc, self.Cobj.get_by_name("FM3_10T_NEW"))
+        self.CDGA = Cdg.shared(doc, self.Cobj.get_by_name("FM3_10T_NEW"))
 
         ## CDGB ... 1000mbar
         self.cdgb_lim_x001 = 13.33
         self.cdgb_lim_x01 = 133.3
         self.cdgb_lim_x1 = 1333.
 
-        self.CDGB = Cdg(doc, self.Cobj.get_by_name("FM3_1000mbar"))
+        self.CDGB = Cdg.shared(doc, self.Cobj.get_by_name("FM3_1000mbar"))
 
         ## CDGD ... 0.1Torr
         self.cdgd_lim_x01 = 0.0133
         self.cdgd_lim_x1 = 0.1333
 
-        self.TDev = Dmm(doc, self.Cobj.get_by_name("FM3_CE3-DMM_Agilent"))
+        self.TDev = Dmm.shared(doc, self.Cobj.get_by_name("FM3_CE3-DMM_Agilent"))
@@ -1,6 +1,7 @@
 import sys
 import numpy as np
 from .std import Ce3
+from ... import gum
 
 class Uncert(Ce3):
 
@@ -159,12 +160,7 @@ class Uncert(Ce3):
         u5 = ana.pick("Uncertainty", "delta_V_delta_t", self.rel_unit)
         u6 = ana.pick("Uncertainty", "pressure_res", self.rel_unit)
 
-        u = np.sqrt(np.power(u1, 2) +
-                    np.power(u2, 2) +
-                    np.power(u3, 2) +
-                    np.power(u4, 2) +
-                    np.power(u5, 2) +
-                    np.power(u6, 2))
+        u = gum.quadratic_sum([u1, u2, u3, u4, u5, u6])
         u = np.full(self.no_of_meas_points, u)
 
         ana.store("Uncertainty", "flow_pV", u, self.rel_unit)
@@ -234,12 +230,7 @@ class Uncert(Ce3):
         u5 = ana.pick("Uncertainty", "temperature_uhv", self.rel_unit)
         u6 = ana.pick("Uncertainty", "conductance_Cx", self.rel_unit)
 
-        u = np.sqrt(np.power(u1, 2) +
-                    np.power(u2, 2) +
-                    np.power(u3, 2) +
-                    np.power(u4, 2) +
-                    np.power(u5, 2) +
-                    np.power(u6, 2))
+        u = gum.quadratic_sum([u1, u2, u3, u4, u5, u6])
         u = np.full(self.no_of_meas_points, u)
 
         ana.store("Uncertainty", "standard", u, self.rel_unit)
@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sym
 from datetime import datetime
 from .std import DkmPpc4
+from ... import lazy
+sym = lazy.module("sympy")
 
 
 class Cal(DkmPpc4):
@@ -1,7 +1,6 @@
 import copy
 import json
 import numpy as np
-import sympy as sym
 from ...device.dmm import Dmm
 from ...device.cdg import InfCdg
 from ...constants import Constants
@@ -9,6 +8,8 @@ from ...calibration_devices import CalibrationObject
 from ...values import Temperature, Pressure, Time, AuxDkmPpc4, Mass
 from ..standard import Standard
 from ...device.cdg import Cdg
+from ... import lazy
+sym = lazy.module("sympy")
 
 
 class DkmPpc4(Standard):
@@ -32,7 +33,7 @@ class DkmPpc4(Standard):
         self.Mass = Mass(doc)
         self.Aux = AuxDkmPpc4(doc)
         self.no_of_meas_points = len(self.Time.get_value("amt_meas", "ms"))
-        self.TDev = Dmm(doc, self.Cobj.get_by_name("DKM_PPC4_DMM"))
+        self.TDev = Dmm.shared(doc, self.Cobj.get_by_name("DKM_PPC4_DMM"))
 
     def get_gas(self):
         """Returns the name of the calibration gas.
@@ -1,7 +1,8 @@
 import numpy as np
-import sympy as sym
 
 from .std import DkmPpc4
+from ... import gum, lazy
+sym = lazy.module("sympy")
 
 class Uncert(DkmPpc4):
 
@@ -26,10 +27,9 @@ class Uncert(DkmPpc4):
 
         p_cal = res.pick("Pressure", "cal", self.unit)
 
-        u = (res.pick("Uncertainty", "u_res", "1")**2
-              + res.pick("Uncertainty", "u_cal", "1")**2
-              + res.pick("Uncertainty", "u_lt", "1")**2
-              )**0.5
+        u = gum.quadratic_sum([res.pick("Uncertainty", "u_res", "1"),
+                               res.pick("Uncertainty", "u_cal", "1"),
+                               res.pick("Uncertainty", "u_lt", "1")], square=np.square)
 
         res.store("Uncertainty", "standard", u, "1")
 
@@ -1,6 +1,7 @@
 import numpy as np
-import sympy as sym
 from .std import Frs5
+from ... import lazy
+sym = lazy.module("sympy")
 
 class Cal(Frs5):
 
@@ -1,10 +1,11 @@
 import numpy as np
-import sympy as sym
 from ..standard import Standard
 from ...device.srg import Srg
 from ...constants import Constants
 from ...calibration_devices import CalibrationObject
 from ...values import Temperature, Pressure, Time, AuxFrs5, Range
+from ... import lazy
+sym = lazy.module("sympy")
 
 
 class Frs5(Standard):
@@ -48,7 +49,7 @@ class Frs5(Standard):
         # residual pressure device
         amt = self.Time.get_value("amt_meas", "ms")
         self.no_of_meas_points = len(amt)
-        self.ResDev = Srg(doc, self.Cobj.get_by_name("FRS5_4019"))
+        self.ResDev = Srg.shared(doc, self.Cobj.get_by_name("FRS5_4019"))
 
     def get_gas(self):
         """Returns the name of the calibration gas stored in *AuxValues*
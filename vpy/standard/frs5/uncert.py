@@ -1,12 +1,37 @@
 import numpy as np
-import sympy as sym
 
 from .std import Frs5
+from ... import gum, lazy, model
+sym = lazy.module("sympy")
 
 class Uncert(Frs5):
+    """Uncertainty of the FRS5 pressure.
+
+    The terms ``sens_terms`` are: type of the uncertainty, symbol the
+    model is derived for and the factors (``Standard`` or ``Constants``,
+    type and unit of the uncertainty expression) the sensitivity
+    coefficient is multiplied with. ``s_rho_gas`` is the sensitivity
+    coefficient alone (see ``uncert_rho_gas()``).
+    """
+    sens_terms = (
+        ("u_r",       "r",       (("Standard", "u_r", "lb"),)),
+        ("u_r_zc",    "r_zc",    (("Standard", "u_r_zc", "lb"),)),
+        ("u_r_zc0",   "r_zc0",   (("Standard", "u_r_zc0", "lb"),)),
+        ("u_ub",      "ub",      (("Standard", "u_ub", "lb"),)),
+        ("u_m_cal",   "m_cal",   (("Standard", "u_m_cal", "kg"),)),
+        ("u_r_cal",   "r_cal",   (("Standard", "u_r_cal", "lb"),)),
+        ("u_r_cal0",  "r_cal0",  (("Standard", "u_r_cal0", "lb"),)),
+        ("u_g",       "g",       (("Standard", "u_g", "1"), ("Constants", "g", "m/s^2"))),
+        ("u_A",       "A",       (("Standard", "u_A", "m^2"),)),
+        ("u_T",       "T",       (("Standard", "u_t", "C"),)),
+        ("s_rho_gas", "rho_gas", ()),
+        ("u_ab",      "r",       (("Standard", "u_ab", "1/K"),)),
+    )
 
     def __init__(self, doc):
         super().__init__(doc)
+        self.sens_val = None
+        self.sens_val_arr = None
 
     def define_model(self):
         """ Defines symbols and model for FRS5.
@@ -185,7 +210,7 @@ class Uncert(Frs5):
 
     def total_standard(self, res, no_type_a=False):
         """Calculates the total uncertainty.
-        sympy derives the sensitivity coefficients.
+        sympy derives the sensitivity coefficients (see ``sens_values()``).
 
         :param: Class with methode
                 store(quantity, type, value, unit, [stdev], [N])) and
@@ -244,24 +269,101 @@ class Uncert(Frs5):
         p = res.pick("Pressure", "cal", self.unit)
         res.store("Uncertainty", "standard", u_total, "1")
 
-    def uncert_r(self, res):
-        """Calculates the uncertainty of the r (reading)
+    def total_mc(self, res, samples=10**6, p=0.95, seed=None, workers=1):
+        """Propagates the distributions of the inputs of ``sens_terms``
+        (normal, the FRS5 entries have no ``Dist``) through the model
+        (GUM Supplement 1, see ``vpy.gum.MonteCarlo``) and stores the
+        standard uncertainty (``standard_mc``) and the limits of the
+        coverage interval (``interval_mc_low``, ``interval_mc_high``)
+        relative to the calibration pressure.
 
         :param: Class with methode
                 store(quantity, type, value, unit, [stdev], [N])) and
                 pick(quantity, type, unit)
         :type: class
+
+        :returns: results of ``vpy.gum.MonteCarlo.run()`` (Pa)
+        :rtype: dict
+        """
+        self.define_model()
+        self.gen_val_array(res)
+
+        pconv = self.Cons.get_conv("Pa", self.unit)
+        T = res.pick("Temperature", "frs5", "C") + self.Cons.get_conv("C", "K")
+        M = np.full(self.no_of_meas_points, self.Cons.get_mol_weight(self.get_gas(), "kg/mol"))
+        R = np.full(self.no_of_meas_points, self.Cons.get_value("R", "Pa m^3/mol/K")*pconv)
+        p_cal = res.pick("Pressure", "cal", self.unit)
+        u_args = ('M', 'R', 'T', 'p')
+        u_obj = self.get_object("Type", "u_rho_gas")
+        f_u = model.lambdify(u_args, lambda: self.get_expression("u_rho_gas", "kg/m^3"),
+                             model.expression_key(u_args, u_obj, "kg/m^3"))
+
+        prop = gum.Propagation([str(s) for s in self.symb], self.model)
+        table = [(u_type, wrt, f_u(M, R, T, p_cal) if u_type == "s_rho_gas" else u)
+                 for u_type, wrt, u in self.sens_table()]
+        mc = gum.MonteCarlo(prop, samples=samples, p=p, seed=seed, workers=workers)
+        out = mc.run(self.val_arr, prop.uncertainties(self.val_arr, table))
+
+        res.store("Uncertainty", "standard_mc", out["std"]*pconv/p_cal, "1")
+        res.store("Uncertainty", "interval_mc_low", (out["low"] - out["y"])*pconv/p_cal, "1")
+        res.store("Uncertainty", "interval_mc_high", (out["high"] - out["y"])*pconv/p_cal, "1")
+
+        return out
+
+    def sens_table(self):
+        """Returns the terms of ``sens_terms`` as table of
+        ``vpy.gum.Propagation.contributions()``: type, symbol and the
+        product of the uncertainty expressions (``None`` if there is none).
+
+        :returns: table
+        :rtype: list
+        """
+        table = []
+        for u_type, wrt, factors in self.sens_terms:
+            u_expr = None
+            for source, t, unit in factors:
+                doc = self.Cons if source == "Constants" else self
+                expr = doc.get_expression(t, unit)
+                u_expr = expr if u_expr is None else u_expr * expr
+            table.append((u_type, wrt, u_expr))
+
+        return table
+
+    def sens_values(self):
+        """Evaluates the products of the sensitivity coefficients
+        (derivatives of ``self.model``) with the uncertainty expressions
+        of all terms of ``sens_terms`` once per document. The terms are
+        computed by one compiled function (see ``vpy.gum.Propagation``).
+
+        :returns: values by type (see ``sens_terms``)
+        :rtype: dict
+        """
+        if self.sens_val is None or self.sens_val_arr is not self.val_arr:
+            prop = gum.Propagation([str(s) for s in self.symb], self.model)
+            self.sens_val = prop.contributions(self.val_arr, self.sens_table())
+            self.sens_val_arr = self.val_arr
+
+        return self.sens_val
+
+    def store_sens(self, res, u_type):
+        """Stores the relative uncertainty ``u_type`` of ``sens_values()``.
         """
         conv   = self.Cons.get_conv("Pa", self.unit)
         p      = res.pick("Pressure", "cal", self.unit)
 
-        s_expr = sym.diff(self.model, sym.Symbol('r'))
-        u_expr = self.get_expression("u_r", "lb")
+        val   = self.sens_values()[u_type]*conv
+
+        res.store("Uncertainty", u_type, np.absolute(val/p), "1")
 
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
+    def uncert_r(self, res):
+        """Calculates the uncertainty of the r (reading)
 
-        res.store("Uncertainty", "u_r", np.absolute(val/p), "1")
+        :param: Class with methode
+                store(quantity, type, value, unit, [stdev], [N])) and
+                pick(quantity, type, unit)
+        :type: class
+        """
+        self.store_sens(res, "u_r")
 
     def uncert_r_zc(self, res):
         """Calculates the uncertainty of the r_zc
@@ -272,16 +374,7 @@ class Uncert(Frs5):
                 pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('r_zc'))
-        u_expr = self.get_expression("u_r_zc", "lb")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_r_zc", np.absolute(val/p), "1")
+        self.store_sens(res, "u_r_zc")
 
     def uncert_r_zc0(self, res):
         """Calculates the uncertainty of the r_zc0 (initial zero check)
@@ -291,16 +384,7 @@ class Uncert(Frs5):
                 pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('r_zc0'))
-        u_expr = self.get_expression("u_r_zc0", "lb")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_r_zc0", np.absolute(val/p), "1")
+        self.store_sens(res, "u_r_zc0")
 
     def uncert_ub(self, res):
         """Calculates the uncertainty of the r (reading)
@@ -310,17 +394,7 @@ class Uncert(Frs5):
                 pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('ub'))
-        u_expr = self.get_expression("u_ub", "lb")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_ub", np.absolute(val/p), "1")
-
+        self.store_sens(res, "u_ub")
 
     def uncert_m_cal(self, res):
         """Calculates the uncertainty of m_cal
@@ -330,16 +404,7 @@ class Uncert(Frs5):
             pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('m_cal'))
-        u_expr = self.get_expression("u_m_cal", "kg")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_m_cal", np.absolute(val/p), "1")
+        self.store_sens(res, "u_m_cal")
 
     def uncert_r_cal(self, res):
         """Calculates the uncertainty of r_cal
@@ -349,16 +414,7 @@ class Uncert(Frs5):
             pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('r_cal'))
-        u_expr = self.get_expression("u_r_cal", "lb")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_r_cal", np.absolute(val/p), "1")
+        self.store_sens(res, "u_r_cal")
 
     def uncert_r_cal0(self, res):
         """Calculates the uncertainty of r_cal0
@@ -368,16 +424,7 @@ class Uncert(Frs5):
             pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('r_cal0'))
-        u_expr = self.get_expression("u_r_cal0", "lb")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_r_cal0", np.absolute(val/p), "1")
+        self.store_sens(res, "u_r_cal0")
 
     def uncert_g(self, res):
         """Calculates the uncertainty of m_cal
@@ -387,17 +434,7 @@ class Uncert(Frs5):
             pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('g'))
-        u_expr = self.get_expression("u_g", "1")
-        v_expr = self.Cons.get_expression("g", "m/s^2")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr * v_expr, "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_g", np.absolute(val/p), "1")
+        self.store_sens(res, "u_g")
 
     def uncert_A(self, res):
         """Calculates the uncertainty of effective area
@@ -407,17 +444,7 @@ class Uncert(Frs5):
             pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('A'))
-        u_expr = self.get_expression("u_A", "m^2")
-
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr, "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_A", np.absolute(val/p), "1")
+        self.store_sens(res, "u_A")
 
     def uncert_T(self, res):
         """Calculates the uncertainty of the temperature correction
@@ -427,17 +454,7 @@ class Uncert(Frs5):
             pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('T'))
-        u_expr = self.get_expression("u_t", "C")
-
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr, "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_T", np.absolute(val/p), "1")
+        self.store_sens(res, "u_T")
 
     def uncert_rho_gas(self, res):
         """Calculates the uncertainty of the buoyancy correction
@@ -460,16 +477,12 @@ class Uncert(Frs5):
         # R in mbar m^3/mol/K
         R       = np.full(self.no_of_meas_points, self.Cons.get_value("R", "Pa m^3/mol/K") *pconv)
 
-        s_expr  = sym.diff(self.model, sym.Symbol('rho_gas'))
-        u_expr  = self.get_expression("u_rho_gas", "kg/m^3")
-        f_u     = sym.lambdify((
-                            sym.Symbol('M'),
-                            sym.Symbol('R'),
-                            sym.Symbol('T'),
-                            sym.Symbol('p')), u_expr, "numpy")
+        u_args  = ('M', 'R', 'T', 'p')
+        u_obj   = self.get_object("Type", "u_rho_gas")
+        f_u     = model.lambdify(u_args, lambda: self.get_expression("u_rho_gas", "kg/m^3"),
+                                 model.expression_key(u_args, u_obj, "kg/m^3"))
 
-        f_s     = sym.lambdify(self.symb, s_expr, "numpy")
-        val     = f_s(*self.val_arr)*f_u(M,R,T,p)*pconv
+        val     = self.sens_values()["s_rho_gas"]*f_u(M,R,T,p)*pconv
 
         res.store("Uncertainty", "u_rho_gas", np.absolute(val/p), "1")
 
@@ -518,13 +531,4 @@ class Uncert(Frs5):
                 pick(quantity, type, unit)
         :type: class
         """
-        conv   = self.Cons.get_conv("Pa", self.unit)
-        p      = res.pick("Pressure", "cal", self.unit)
-
-        s_expr = sym.diff(self.model, sym.Symbol('r'))
-        u_expr = self.get_expression("u_ab", "1/K")
-
-        f     = sym.lambdify(self.symb, s_expr * u_expr , "numpy")
-        val   = f(*self.val_arr)*conv
-
-        res.store("Uncertainty", "u_ab", np.absolute(val/p), "1")
+        self.store_sens(res, "u_ab")
@@ -1,9 +1,10 @@
 import numpy as np
-import sympy as sym
 from ...values import Values, Temperature, Pressure, Date
 from .std import Se2
-import matplotlib.pyplot as plt
-from scipy.optimize import curve_fit
+from ... import lazy
+sym = lazy.module("sympy")
+plt = lazy.module("matplotlib.pyplot")
+optimize = lazy.module("scipy.optimize")
 
 class Cal(Se2):
 
@@ -16,8 +16,8 @@ class Se2(Standard):
         super().__init__(doc, self.name)
 
         self.Aux = AuxSe2(doc)
-        self.TDev = Dmm(doc, self.Cobj.get_by_name("SE2_DMM_Keithley"))
-        self.Qbs = Qbs(doc, self.Cobj.get_by_name("SE2_Ruska"))
+        self.TDev = Dmm.shared(doc, self.Cobj.get_by_name("SE2_DMM_Keithley"))
+        self.Qbs = Qbs.shared(doc, self.Cobj.get_by_name("SE2_Ruska"))
 
     def get_gas(self):
         """Returns the name of the calibration gas.
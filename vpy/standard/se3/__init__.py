@@ -1,3 +1,4 @@
 from . import std
 #from . import uncert
 from . import cal
+from . import fill
@@ -1,7 +1,9 @@
 import numpy as np
 import copy
-import sympy as sym
 from .std import Se3
+from ...device.budget import total_uncert
+from ... import lazy
+sym = lazy.module("sympy")
 
 
 class Cal(Se3):
@@ -12,6 +14,7 @@ class Cal(Se3):
 
     def __init__(self, doc):
         super().__init__(doc)
+        self.temperature_matrices = {}
 
     def check_analysis(self, res, chk):
         """ Checks the analysis values against a given
@@ -150,8 +153,13 @@ class Cal(Se3):
         """
         L = list(range(1001, 1031)) + list(range(2001, 2031)) + \
             list(range(3001, 3031))
+        rows, arr = self.temperature_matrix("state")
         for ch in L:
-            t_mean, _, _ = self.temperature([ch], "state")
+            if arr is not None and str(ch) in rows:
+                ## the mean of one channel is its row
+                t_mean = np.array(arr[rows[str(ch)]])
+            else:
+                t_mean, _, _ = self.temperature([ch], "state")
 
             res.store("Temperature", "ch_{}state".format(ch), t_mean, "K")
 
@@ -459,19 +467,25 @@ class Cal(Se3):
         p_arr = np.array([])
         u_arr = np.array([])
         for i in range(len(self.FillDevs)):
-            GNDevice = self.FillDevs[i]
-            if GNDevice.name != self.fill_dev_names[i]:
+            if self.FillDevs[i].name != self.fill_dev_names[i]:
                 sys.exit("Filling pressure devicees in unexpected order")
 
-            p_corr = res.pick("Pressure","{dev_name}-{sufix}".format(dev_name=GNDevice.name, sufix=sufix), dict_unit=self.unit)
+        ## uncertainties of all devices in one pass
+        p_corr_arr = [res.pick("Pressure","{dev_name}-{sufix}".format(dev_name=GNDevice.name, sufix=sufix), dict_unit=self.unit) for GNDevice in self.FillDevs]
+        u_corr_arr = total_uncert(self.FillDevs, p_corr_arr, self.unit, self.unit, take_type_list=["u2", "u3", "u4", "u5", "u6" ])
+
+        for i in range(len(self.FillDevs)):
+            GNDevice = self.FillDevs[i]
+
+            p_corr = p_corr_arr[i]
             e      = res.pick("Error","{dev_name}-{sufix}".format(dev_name=GNDevice.name, sufix=sufix), dict_unit="1")
             e_off  = res.pick("Error","{dev_name}-offset".format(dev_name=GNDevice.name, sufix=sufix), dict_unit="1")
-            u_corr = GNDevice.get_total_uncert(p_corr, self.unit, self.unit, take_type_list=["u2", "u3", "u4", "u5", "u6" ])
+            u_corr = u_corr_arr[i]
 
             ## only use p if u exist
-            np.put(p_corr, np.where(np.isnan(u_corr)), np.nan)
-            np.put(e, np.where(np.isnan(u_corr)), np.nan)
-            np.put(e_off, np.where(np.isnan(u_corr)), np.nan)
+            p_corr = np.where(np.isnan(u_corr), np.nan, p_corr)
+            e = np.where(np.isnan(u_corr), np.nan, e)
+            e_off = np.where(np.isnan(u_corr), np.nan, e_off)
 
             res.store("Pressure", "{dev_name}-{sufix}".format(dev_name=GNDevice.name, sufix=sufix), p_corr, self.unit)
             res.store("Error", "{dev_name}-{sufix}".format(dev_name=GNDevice.name, sufix=sufix), e, '1')
@@ -580,7 +594,44 @@ class Cal(Se3):
 
         return dp * self.Cons.get_conv(from_unit="Pa", to_unit=self.unit)
 
+    def temperature_matrix(self, sufix="_before", prefix="ch_", sufix_corr="", prefix_corr="corr_ch_"):
+        """Returns the corrected temperatures in K of all channels having
+        readings ``<prefix><channel><sufix>`` (in C) and corrections
+        ``<prefix_corr><channel><sufix_corr>`` of the DMM. The matrix is
+        built once per sufix.
+
+        :returns: row by channel, temperatures (one row per channel;
+                  ``None`` if the readings or corrections differ in length)
+        :rtype: dict, np.array
+        """
+        key = (sufix, prefix, sufix_corr, prefix_corr)
+        entry = self.temperature_matrices.get(key)
+        if entry is None or entry[0] is not self.Temp.doc or entry[1] is not self.TDev.doc:
+            ch_tem, tem = self.Temp.get_channel_matrix(prefix, sufix, "C")
+            ch_cor, cor = self.TDev.get_channel_matrix(prefix_corr, sufix_corr, "K")
+            rows, arr = {}, None
+            if tem is not None and cor is not None:
+                i_cor = {ch: i for i, ch in enumerate(ch_cor)}
+                i_tem = [i for i, ch in enumerate(ch_tem) if ch in i_cor]
+                rows = {ch_tem[i]: k for k, i in enumerate(i_tem)}
+                arr = tem[i_tem] + cor[[i_cor[ch_tem[i]] for i in i_tem]] + self.Cons.get_conv("C", "K")
+            entry = (self.Temp.doc, self.TDev.doc, rows, arr)
+            self.temperature_matrices[key] = entry
+
+        return entry[2], entry[3]
+
     def temperature(self, channels, sufix="_before", prefix="ch_", sufix_corr="", prefix_corr="corr_ch_"):
+        """Returns mean, standard deviation and number of the corrected
+        temperatures of the ``channels`` (rows of ``temperature_matrix()``).
+        """
+        rows, arr = self.temperature_matrix(sufix, prefix, sufix_corr, prefix_corr)
+        idx = [rows.get(str(ch)) for ch in channels]
+        if arr is not None and None not in idx:
+            t = arr[idx]
+
+            return np.mean(t, axis=0), np.std(t, axis=0), len(channels)
+
+        ## missing channels
         tem_arr = self.Temp.get_array(prefix, channels, sufix, "C")
         cor_arr = self.TDev.get_array(prefix_corr, channels, sufix_corr, "K")
 
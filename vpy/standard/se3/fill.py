@@ -0,0 +1,248 @@
+"""Filling pressure planner of SE3.
+
+For a target (calibration) pressure ``p`` the filling pressures of the
+expansions are ``p/f_s``, ``p/f_m`` and ``p/f_l``. The planner chooses
+the expansion with the smallest estimated relative uncertainty of the
+filling pressure (all group normal devices, see
+``FillPlanner.fill_uncert_rel()``); filling pressures out of
+``[min_p, max_p]`` are skipped.
+
+``FillPlanner.plan()`` evaluates all targets of a sweep at once (one
+evaluation of the uncertainty budgets of the group normal devices).
+The results are the same (bit by bit) as those of the target by target
+evaluation of ``script/se3/cal_filling_pressure.py``.
+
+``FillGrid`` serves single targets from a lookup grid computed once per
+process and standard (see ``FillGrid.shared()``, e.g. per worker of
+``vpy.service``). The expansion is chosen by the uncertainties
+interpolated (log-log) between the grid points; the uncertainty of the
+chosen filling pressure is computed exactly. Close to the steps of the
+budgets (ranges, resolution decades) the chosen expansion may differ
+from the planned one.
+"""
+import sys
+import numpy as np
+
+from ...device.budget import total_uncert
+from ...device.registry import object_key
+
+class FillPlanner(object):
+    """Filling pressures and expansions of target pressures.
+
+    :param cal: SE3 standard with the expansion factors and the group
+                normal devices (``FillDevs``)
+    :type cal: vpy.standard.se3.std.Se3
+    :param min_p: filling pressures ``<= min_p`` are skipped
+    :type min_p: float
+    :param max_p: filling pressures ``> max_p`` are skipped
+    :type max_p: float
+    :param with_f_uncert: include the uncertainty of the expansion factors
+    :type with_f_uncert: bool
+    :param c: factor of the uncertainty of the filling pressure
+              (see ``fill_uncert_rel()``)
+    :type c: float
+    """
+    f_names = ["f_s", "f_m", "f_l"]
+
+    def __init__(self, cal, min_p=80.0, max_p=133322.0, with_f_uncert=False, c=2):
+        self.cal = cal
+        self.unit = cal.unit
+        self.min_p = min_p
+        self.max_p = max_p
+        self.with_f_uncert = with_f_uncert
+        self.c = c
+        self.f = np.array([cal.get_value(n, "1")[0] for n in self.f_names])
+        self.u_f = np.array([cal.get_value("u_{}".format(n), "1")[0] for n in self.f_names])
+
+    def key(self):
+        """Returns a key changing with the expansion factors, the group
+        normal devices and the settings of the planner.
+        """
+        devs = [self.cal.Cobj.get_by_name(d) for d in self.cal.fill_dev_names if d in self.cal.Cobj.cob_by_name]
+
+        return object_key({"f": self.f.tolist(), "u_f": self.u_f.tolist(), "unit": self.unit,
+                           "devs": [object_key(d) for d in devs],
+                           "settings": [self.min_p, self.max_p, self.with_f_uncert, self.c]})
+
+    def check_unit(self, unit):
+        if unit != self.unit:
+            sys.exit("units dont match")
+
+    def fill_pressures(self, target):
+        """Returns the filling pressures of the targets.
+
+        :param target: target pressures
+        :type target: np.array
+
+        :returns: filling pressures, one row per expansion
+        :rtype: np.array
+        """
+        return np.asarray(target, dtype=float)[None, :] / self.f[:, None]
+
+    def fill_uncert_rel(self, p_fill):
+        """Returns the relative uncertainty of the filling pressures
+        ``p_fill`` (any shape). The uncertainty of the group normal
+        devices is multiplied by ``c`` taking into account that the
+        uncertainty of ``p_fill`` consist of:
+
+        * the uncertainty of the p_fill measurement
+        * the correction of the error of indication
+        * the uncertainty of the calibration pressure
+
+        See latest MUB for details.
+
+        :param p_fill: filling pressures
+        :type p_fill: np.array
+
+        :returns: relative uncertainties
+        :rtype: np.array
+        """
+        p = np.ravel(p_fill)
+        u = total_uncert(self.cal.FillDevs, p, self.unit, self.unit)
+
+        return (self.cal.Pres.invers_array_square_sum(u)/p * self.c).reshape(np.shape(p_fill))
+
+    def uncert_rel(self, p_fill, idx=None):
+        """Returns the relative uncertainties the choice is based on
+        (filling pressure and, if ``with_f_uncert``, expansion factor).
+
+        :param p_fill: filling pressures, one row per expansion or (with
+                       ``idx``) one per target
+        :type p_fill: np.array
+        :param idx: expansion of the filling pressures
+        :type idx: np.array
+
+        :returns: relative uncertainties
+        :rtype: np.array
+        """
+        u = self.fill_uncert_rel(p_fill)
+        if self.with_f_uncert:
+            u_f = self.u_f[:, None] if idx is None else self.u_f[idx]
+            u = np.sqrt(np.power(u, 2) + np.power(u_f, 2))
+
+        return u
+
+    def choose(self, p_fill, u_rel):
+        """Skips the filling pressures out of ``[min_p, max_p]`` and
+        returns the index of the expansion with the smallest uncertainty
+        per target (``-1`` if all are skipped or ``nan``).
+
+        :returns: index, uncertainties with skipped entries set to ``inf``
+        :rtype: tuple
+        """
+        u_rel = np.array(u_rel, dtype=float)
+        u_rel[(p_fill <= self.min_p) | (p_fill > self.max_p)] = np.inf
+
+        none = np.all(np.isinf(u_rel), axis=0) | np.all(np.isnan(u_rel), axis=0)
+        idx = np.nanargmin(np.where(none[None, :], 0.0, u_rel), axis=0)
+        idx[none] = -1
+
+        return idx, u_rel
+
+    def plan(self, target, unit=None):
+        """Plans the targets ``target``.
+
+        :param target: target pressures
+        :type target: np.array
+        :param unit: unit of the targets (must be the unit of the standard)
+        :type unit: str
+
+        :returns: chosen ``Expansion`` (``None`` if there is none),
+                  ``Pressure_fill`` and ``Uncertainty_cal`` (``nan`` if
+                  there is none) per target as well as the filling
+                  pressures ``p_fill`` and uncertainties ``u_rel``
+                  (one row per expansion, skipped ones are ``inf``)
+        :rtype: dict
+        """
+        self.check_unit(unit or self.unit)
+        p_fill = self.fill_pressures(np.atleast_1d(target))
+        idx, u_rel = self.choose(p_fill, self.uncert_rel(p_fill))
+
+        return self.chosen(p_fill, u_rel, idx)
+
+    def chosen(self, p_fill, u_rel, idx):
+        cols = np.arange(np.shape(p_fill)[1])
+        ok = idx >= 0
+
+        return {"Expansion": [self.f_names[i] if i >= 0 else None for i in idx],
+                "Pressure_fill": np.where(ok, p_fill[idx, cols], np.nan),
+                "Uncertainty_cal": np.where(ok, u_rel[idx, cols], np.nan),
+                "p_fill": p_fill,
+                "u_rel": u_rel}
+
+    def result_dict(self, plan, k=0, unit=None):
+        """Returns the result of target ``k`` of the ``plan`` as
+        returned to the callers of ``script/se3/cal_filling_pressure.py``.
+
+        :returns: result
+        :rtype: dict
+        """
+        name = plan["Expansion"][k]
+        if name is None:
+            return {"error": "all expasion sequences deliver nan"}
+
+        return {"Pressure_fill":{"Value": plan["Pressure_fill"][k],
+                                 "Type": "target_fill",
+                                 "Unit": unit or self.unit},
+                "Uncertainty_cal":{"Value": plan["Uncertainty_cal"][k],
+                                   "Type":  "cal_estimated",
+                                   "Unit":  "1"},
+                "Expansion":{"Type" : "name",
+                             "Value": name}}
+
+class FillGrid(object):
+    """Lookup grid of a ``FillPlanner``. The relative uncertainties of
+    all expansions are computed once for the log spaced targets
+    ``10**start`` to ``10**stop`` (``num`` points). Targets out of the
+    grid are planned directly.
+
+    :param planner: planner
+    :type planner: FillPlanner
+    """
+    grids = {}
+
+    def __init__(self, planner, start=-4.0, stop=5.0, num=1801):
+        self.planner = planner
+        self.log_target = np.linspace(start, stop, num)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.log_u = np.log10(planner.uncert_rel(planner.fill_pressures(10**self.log_target)))
+
+    @classmethod
+    def shared(cls, planner, **kwargs):
+        """Returns the grid of the ``planner``; it is computed once per
+        process as long as the expansion factors and group normal
+        devices are unchanged (see ``FillPlanner.key()``).
+        """
+        key = (planner.key(), repr(sorted(kwargs.items())))
+        if key not in cls.grids:
+            cls.grids[key] = cls(planner, **kwargs)
+        grid = cls.grids[key]
+        grid.planner = planner
+
+        return grid
+
+    def plan(self, target, unit=None):
+        """Same as ``FillPlanner.plan()``; the expansion is chosen by
+        the interpolated uncertainties, ``Uncertainty_cal`` is computed
+        for the chosen filling pressure (``u_rel`` holds the
+        interpolated values of the other expansions).
+        """
+        planner = self.planner
+        planner.check_unit(unit or planner.unit)
+        target = np.atleast_1d(np.asarray(target, dtype=float))
+        x = np.log10(target)
+        inside = (x >= self.log_target[0]) & (x <= self.log_target[-1])
+
+        p_fill = planner.fill_pressures(target)
+        u_rel = np.full(np.shape(p_fill), np.nan)
+        for j in range(len(planner.f)):
+            u_rel[j, inside] = 10**np.interp(x[inside], self.log_target, self.log_u[j])
+        if not np.all(inside):
+            u_rel[:, ~inside] = planner.uncert_rel(p_fill[:, ~inside])
+        idx, u_rel = planner.choose(p_fill, u_rel)
+        ok = idx >= 0
+        if np.any(ok):
+            cols = np.flatnonzero(ok)
+            u_rel[idx[ok], cols] = planner.uncert_rel(p_fill[idx[ok], cols], idx[ok])
+
+        return planner.chosen(p_fill, u_rel, idx)
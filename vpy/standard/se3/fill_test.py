@@ -0,0 +1,62 @@
+import json
+import unittest
+import numpy as np
+from vpy.standard.se3.cal import Cal
+from vpy.standard.se3.fill import FillPlanner, FillGrid
+
+class TestFillSE3(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("vpy/standard/se3/base_doc.json") as f:
+            cls.cal = Cal(json.load(f))
+
+    def setUp(self):
+        self.planner = FillPlanner(self.cal)
+        self.target = np.logspace(-3, 5, 41)
+
+    def test_plan_1(self):
+        """a sweep gives the results of the single targets
+        """
+        plan = self.planner.plan(self.target, "Pa")
+        for k, t in enumerate(self.target):
+            single = self.planner.plan([t], "Pa")
+            self.assertEqual(self.planner.result_dict(plan, k), self.planner.result_dict(single))
+
+    def test_plan_2(self):
+        """chosen filling pressures are in range and have the smallest uncertainty
+        """
+        plan = self.planner.plan(self.target)
+        for k, name in enumerate(plan["Expansion"]):
+            if name is None:
+                self.assertTrue(np.all(np.isinf(plan["u_rel"][:, k])))
+                self.assertEqual(self.planner.result_dict(plan, k), {"error": "all expasion sequences deliver nan"})
+            else:
+                self.assertGreater(plan["Pressure_fill"][k], 80.0)
+                self.assertLessEqual(plan["Pressure_fill"][k], 133322.0)
+                self.assertEqual(plan["Uncertainty_cal"][k], np.nanmin(plan["u_rel"][:, k]))
+        self.assertIn("f_s", plan["Expansion"])
+        self.assertIn(None, plan["Expansion"])
+
+    def test_grid_1(self):
+        """the grid is computed once, chooses as the planner does and gives the exact uncertainty
+        """
+        grid = FillGrid.shared(self.planner)
+        self.assertIs(grid, FillGrid.shared(FillPlanner(self.cal)))
+        self.assertIsNot(grid, FillGrid.shared(FillPlanner(self.cal, min_p=94.0)))
+
+        t = grid.log_target[::50]
+        plan = self.planner.plan(10**t)
+        grid_plan = grid.plan(10**t)
+        self.assertEqual(plan["Expansion"], grid_plan["Expansion"])
+        np.testing.assert_array_equal(grid_plan["Uncertainty_cal"], plan["Uncertainty_cal"])
+
+    def test_grid_2(self):
+        """the uncertainty of the chosen filling pressure is exact between the grid points
+        """
+        planner = FillPlanner(self.cal, min_p=94.0, with_f_uncert=True)
+        grid = FillGrid.shared(planner)
+        t = 10**((grid.log_target[:-1] + grid.log_target[1:])/2)[::7]
+        plan, grid_plan = planner.plan(t), grid.plan(t)
+        same = np.array(plan["Expansion"]) == np.array(grid_plan["Expansion"])
+        np.testing.assert_array_equal(grid_plan["Uncertainty_cal"][same], plan["Uncertainty_cal"][same])
@@ -284,16 +284,16 @@ class Se3(Standard):
 
         ## Temperature device
         if self.temp_dev_name in self.Cobj.cob_by_name:
-            self.TDev = Dmm(doc, self.Cobj.get_by_name(self.temp_dev_name))
+            self.TDev = Dmm.shared(doc, self.Cobj.get_by_name(self.temp_dev_name))
 
         ## Filling pressure
         self.FillDevs =[]
         for d in self.fill_dev_names:
             if d in self.Cobj.cob_by_name:
                 if d.startswith("CDG"):
-                    self.FillDevs.append(InfCdg(doc, self.Cobj.get_by_name(d)))
+                    self.FillDevs.append(InfCdg.shared(doc, self.Cobj.get_by_name(d)))
                 if d.startswith("QBS"):
-                    self.FillDevs.append(Qbs(doc, self.Cobj.get_by_name(d)))
+                    self.FillDevs.append(Qbs.shared(doc, self.Cobj.get_by_name(d)))
 
     def get_gas(self):
         """Returns the name of the calibration gas.
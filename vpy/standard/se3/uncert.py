@@ -1,6 +1,12 @@
 import sys
 import numpy as np
 from .std import Se3
+from ...device.budget import total_uncert
+from ... import gum, piecewise
+
+piecewise.register("SE3", "cmc", piecewise.Piecewise(
+    [0.027,  0.3,   0.73,    9.,      30.,     133.,                                1000.,   8000.],
+    [0.0014, 0.001, 0.00092, 0.00086, 0.00075, "((0.0245/p)**2 + 2.24e-5**2)**0.5", 0.00075, 0.00019, 0.00014]))
 
 class Uncert(Se3):
 
@@ -74,6 +80,28 @@ class Uncert(Se3):
     ## --------------------------------------------
     ## sens. coeff. related to calib. pressure
     ## --------------------------------------------
+    def pressure_cal(self, p_fill, p_rise, f, V_add, V_start, T_after, T_before, F):
+        """Model of the calibration pressure; the ``sens_*`` methods
+        are its derivatives.
+        """
+        return F*T_after/T_before*p_fill/(V_add/V_start + 1/f) + p_rise
+
+    def propagation(self):
+        """Returns the propagation (``vpy.gum.Propagation``) of the
+        uncertainties of the inputs of ``pressure_cal()`` with the
+        sensitivity coefficients ``sens_*``.
+        """
+        return gum.Propagation(("p_fill", "p_rise", "f", "V_add", "V_start", "T_after", "T_before", "F"),
+                               self.pressure_cal,
+                               sens={"p_fill": self.sens_pressure_fill,
+                                     "p_rise": self.sens_pressure_rise,
+                                     "f": self.sens_expansion,
+                                     "V_add": self.sens_volume_add,
+                                     "V_start": self.sens_volume_start,
+                                     "T_after": self.sens_temperature_after,
+                                     "T_before": self.sens_temperature_before,
+                                     "F": self.sens_corr_factors})
+
     def sens_pressure_fill(self, p_fill, p_rise, f, V_add, V_start, T_after, T_before, F):
         return F*T_after/T_before/(V_add/V_start + 1/f)
 
@@ -103,14 +131,8 @@ class Uncert(Se3):
 
     def group_normal_array(self, p, unit, take_type_list=None, skip_type=None):
         N = len(self.fill_dev_names)
-        u_arr = []
-
-        for i in range(N):
-            Dev = self.FillDevs[i]
-            u_i = Dev.get_total_uncert(p, unit, self.pressure_unit, take_type_list=take_type_list, skip_type=skip_type)
-            u_arr.append(u_i)
 
-        return u_arr
+        return total_uncert(self.FillDevs[:N], p, unit, self.pressure_unit, take_type_list=take_type_list, skip_type=skip_type)
     ## --------------------------------
     ## uncert contributions
     ## --------------------------------
@@ -407,8 +429,25 @@ class Uncert(Se3):
 
 
     def total(self, ana):
-
+        x, table = self.inputs(ana)
         p_cal = ana.pick("Pressure", "cal", "Pa")
+
+        u_i, u = self.propagation().total(x, table)
+
+        for name, u_abs in u_i.items():
+            ana.store("Uncertainty", name, np.abs(u_abs/p_cal), "1")
+
+        ana.store("Uncertainty", "standard", u/p_cal , "1")
+
+        return u
+
+    def inputs(self, ana):
+        """Returns the inputs of ``pressure_cal()`` and the table of
+        their uncertainties (``vpy.gum.Propagation.contributions()``).
+
+        :returns: inputs, table
+        :rtype: tuple
+        """
         p_fill = ana.pick("Pressure", "fill", "Pa")
         p_rise = ana.pick("Pressure", "rise", "Pa")
         f = ana.pick("Expansion", "uncorr", "1")
@@ -429,55 +468,51 @@ class Uncert(Se3):
         ## cal. uncert.
         f_name = self.get_expansion_name()
 
-        u_c_1 = self.contrib_pressure_fill(p_fill, "Pa")
-        u_1 = self.pressure_fill(u_c_1, "Pa", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
-
-
-        u_c_2 = self.contrib_pressure_rise(p_rise, "Pa")
-        u_2 = self.pressure_rise(u_c_2, "Pa", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
-
-        u_c_3 = self.contrib_temperature_before(T_before, "K", f_name = f_name)
-        u_3 = self.temperature_before(u_c_3,"K", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
-
-        u_c_4 = self.contrib_temperature_after(T_after, "K")
-        u_4 = self.temperature_after(u_c_4,"K", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
-
-        u_c_5 = self.contrib_expansion(f, f_name)
-        u_5 = self.expansion(u_c_5, "1", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
-
-        u_c_6 = self.contrib_volume_add(p_0, p_1, p_r, "Pa")
-        u_6 = self.volume_add(u_c_6, "cm^3", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
-
-        u_c_7 = self.contrib_volume_start(f_name)
-        u_7 = self.volume_start(u_c_7, "cm^3", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
-
-        u_c_8 = self.contrib_corr_factors( p_fill, "Pa", f_name, "N2")
-        u_8 = self.corr_factors(u_c_8, "1", p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
+        x = (p_fill, p_rise, f, V_add, V_start, T_after, T_before, K)
+        table = [("p_fill",   "p_fill",   self.contrib_pressure_fill(p_fill, "Pa")),
+                 ("p_rise",   "p_rise",   self.contrib_pressure_rise(p_rise, "Pa")),
+                 ("T_before", "T_before", self.contrib_temperature_before(T_before, "K", f_name = f_name)),
+                 ("T_after",  "T_after",  self.contrib_temperature_after(T_after, "K")),
+                 ("f",        "f",        self.contrib_expansion(f, f_name)),
+                 ("V_add",    "V_add",    self.contrib_volume_add(p_0, p_1, p_r, "Pa")),
+                 ("V_start",  "V_start",  self.contrib_volume_start(f_name)),
+                 ("KF",       "F",        self.contrib_corr_factors( p_fill, "Pa", f_name, "N2"))]
+
+        return x, table
+
+    def total_mc(self, ana, samples=10**6, p=0.95, seed=None, workers=1):
+        """Propagates the distributions of the inputs of ``total()``
+        through ``pressure_cal()`` (GUM Supplement 1, see
+        ``vpy.gum.MonteCarlo``) and stores the standard uncertainty
+        (``standard_mc``) and the limits of the coverage interval
+        (``interval_mc_low``, ``interval_mc_high``) relative to the
+        calibration pressure. The filling pressure and the temperatures
+        are distributed as the ``Dist`` of the ``Uncertainty`` entries
+        of their devices if all entries agree, the other inputs normal.
+
+        :returns: results of ``vpy.gum.MonteCarlo.run()`` (Pa)
+        :rtype: dict
+        """
+        x, table = self.inputs(ana)
+        p_cal = ana.pick("Pressure", "cal", "Pa")
+        fill_dist = gum.common_dist([u_i for dev in self.FillDevs for u_i in getattr(dev, "uncert_dict", None) or []])
+        temp_dist = gum.common_dist(getattr(self.TDev, "uncert_dict", None) or [])
+        dists = {"p_fill": fill_dist, "T_before": temp_dist, "T_after": temp_dist}
 
-        ana.store("Uncertainty", "p_fill",   np.abs(u_1/p_cal), "1")
-        ana.store("Uncertainty", "p_rise",   np.abs(u_2/p_cal), "1")
-        ana.store("Uncertainty", "T_before", np.abs(u_3/p_cal), "1")
-        ana.store("Uncertainty", "T_after",  np.abs(u_4/p_cal), "1")
-        ana.store("Uncertainty", "f",        np.abs(u_5/p_cal), "1")
-        ana.store("Uncertainty", "V_add",    np.abs(u_6/p_cal), "1")
-        ana.store("Uncertainty", "V_start",  np.abs(u_7/p_cal), "1")
-        ana.store("Uncertainty", "KF",        np.abs(u_8/p_cal), "1")
+        mc = gum.MonteCarlo(self.propagation(), samples=samples, p=p, seed=seed, workers=workers)
+        out = mc.run(x, table, dists)
 
-        u = np.sqrt(np.power(u_1 ,2) + np.power(u_2 ,2) + np.power(u_3 ,2) +
-                    np.power(u_4 ,2) + np.power(u_5 ,2) + np.power(u_6 ,2) +
-                    np.power(u_7 ,2) + np.power(u_8 ,2))
+        ana.store("Uncertainty", "standard_mc", out["std"]/p_cal, "1")
+        ana.store("Uncertainty", "interval_mc_low", (out["low"] - out["y"])/p_cal, "1")
+        ana.store("Uncertainty", "interval_mc_high", (out["high"] - out["y"])/p_cal, "1")
 
-        ana.store("Uncertainty", "standard", u/p_cal , "1")
-
-        return u
+        return out
 
     # -------------------------
     ## vaclab cmc records
     # -------------------------
     def cmc(self, ana):
-        p_list = ana.pick("Pressure", "cal", self.pressure_unit)
-
-        u = np.asarray([np.piecewise(p, [p <= 0.027, (p > 0.027 and p <= 0.3), (p > 0.3 and p <= 0.73), (p > 0.73 and p <= 9.), (p > 9. and p <= 30.), (p > 30. and p <= 133.),            (p > 133. and p <= 1000.), (p > 1000. and p <= 8000.), 8000. < p],
-                                        [0.0014,     0.001,                   0.00092,                0.00086,              0.00075,              ((0.0245/p)**2 + 2.24e-5**2)**0.5, 0.00075,                  0.00019,                  0.00014] ).tolist() for p in p_list])
+        table = piecewise.find("cmc", self.name, getattr(self, "doc", None))
+        u = table(ana.pick("Pressure", "cal", table.unit))
 
         ana.store("Uncertainty", "standard", u , "1")
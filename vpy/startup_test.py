@@ -0,0 +1,40 @@
+import os
+import sys
+import unittest
+import subprocess
+
+class TestStartup(unittest.TestCase):
+    """Import time of the modules of the script entry points (e.g.
+    ``script/se3/check_analysis.py``, ``script/se3/cal_filling_pressure.py``)
+    measured by ``python -X importtime``.
+    """
+    budget = 0.5 # s
+    entry_points = ["vpy.pkg_io", "vpy.analysis", "vpy.standard.se3.cal", "vpy.standard.se3.uncert",
+                    "vpy.standard.frs5.cal", "vpy.standard.frs5.uncert", "vpy.helper"]
+    lazy_modules = ["sympy", "scipy", "matplotlib", "couchdb"]
+
+    def import_times(self):
+        """Returns the cumulative import time (us) by module.
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = "import " + ", ".join(self.entry_points)
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=root,
+                             stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, check=True).stderr.decode()
+        times = {}
+        for line in out.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line[len("import time:"):].split("|")
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = (int(cumulative), len(name) - len(name.lstrip()))
+        return times
+
+    def test_import_time_1(self):
+        """entry points import no heavy dependency and stay in the budget
+        """
+        times = self.import_times()
+        for name in self.lazy_modules:
+            self.assertNotIn(name, times)
+
+        top = min(indent for _, indent in times.values())
+        total = sum(t for t, indent in times.values() if indent == top)/1e6
+        self.assertLess(total, self.budget)
@@ -0,0 +1,397 @@
+"""Offline document store in a SQLite file.
+
+A ``Store`` holds the documents of several databases together with
+the rows of their views. Views can not be computed offline (the map
+functions are javascript); their rows are imported from a dump or
+pulled from a CouchDB server. The queries used by ``Io``
+(``key``, ``keys``, ``startkey``, ``endkey``, ``include_docs``) are
+answered from an index on the keys in CouchDB collation order
+(``null`` < booleans < numbers < strings < arrays < objects; strings
+are compared by code point, not by ICU).
+
+``Store.db(name)`` returns a ``StoreDb`` which provides the part of
+``couchdb.Database`` used by ``Io`` (``get()``, ``save()``,
+``update()``, ``view()``, ``info()``).
+"""
+import json
+import uuid
+import struct
+import sqlite3
+import hashlib
+from collections import namedtuple
+from . import lazy
+couchdb = lazy.module("couchdb")
+
+
+Row = namedtuple("Row", ["id", "key", "value", "doc"])
+
+def collation_key(key):
+    """Returns a tuple sorting the ``key`` like CouchDB does. Arrays
+    and objects are compared element by element (see ``collation_bytes()``).
+
+    :param key: view key
+    :type key: None|bool|int|float|str|list|dict
+
+    :returns: type rank, number, string (bytes for arrays and objects)
+    :rtype: tuple
+    """
+    if key is None:
+        return 0, 0.0, ""
+    if isinstance(key, bool):
+        return 1, float(key), ""
+    if isinstance(key, (int, float)):
+        return 2, float(key), ""
+    if isinstance(key, str):
+        return 3, 0.0, key
+    if isinstance(key, list):
+        return 4, 0.0, collation_bytes(key)
+
+    return 5, 0.0, collation_bytes(key)
+
+def collation_bytes(key):
+    """Returns bytes whose order (``memcmp``, as SQLite compares blobs)
+    is the CouchDB collation of ``key``: a type tag per value in the
+    order of the types, numbers as big endian doubles with flipped sign
+    bit (all bits if negative), strings as UTF-8 (code point order)
+    with escaped zero bytes, arrays and objects (in the order of their
+    keys) element by element with an end mark sorting before any
+    element, so that a prefix sorts first.
+
+    :param key: view key
+    :type key: None|bool|int|float|str|list|dict
+
+    :returns: sort key
+    :rtype: bytes
+    """
+    if key is None:
+        return b"\x01"
+    if isinstance(key, bool):
+        return b"\x02" + (b"\x01" if key else b"\x00")
+    if isinstance(key, (int, float)):
+        b = bytearray(struct.pack(">d", float(key) + 0.0))
+        if b[0] & 0x80:
+            b = bytearray(x ^ 0xff for x in b)
+        else:
+            b[0] = b[0] | 0x80
+        return b"\x03" + bytes(b)
+    if isinstance(key, str):
+        return b"\x04" + key.encode("utf-8").replace(b"\x00", b"\x00\xff") + b"\x00\x01"
+    if isinstance(key, list):
+        return b"\x05" + b"".join(collation_bytes(k) for k in key) + b"\x00"
+
+    return b"\x06" + b"".join(collation_bytes(k) + collation_bytes(v) for k, v in key.items()) + b"\x00"
+
+def next_rev(rev, doc):
+    """Returns the revision following ``rev`` for the content ``doc``.
+    """
+    n = int(rev.split("-")[0]) + 1 if rev else 1
+    body = {k: v for k, v in doc.items() if k not in ("_id", "_rev")}
+    h = hashlib.md5(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+
+    return "{}-{}".format(n, h)
+
+def read_dump(file_name):
+    """Reads a dump file: one JSON object (see ``Store.import_dump()``)
+    or lines with one document or a list of documents each (e.g. the
+    output of ``couchbackup``).
+
+    :param file_name: name of the file
+    :type file_name: str
+
+    :returns: dump
+    :rtype: dict
+    """
+    with open(file_name) as f:
+        text = f.read()
+    try:
+        dump = json.loads(text)
+        if isinstance(dump, list):
+            return {"docs": dump}
+        if "_id" in dump:
+            return {"docs": [dump]}
+        return dump
+    except ValueError:
+        docs = []
+        for line in text.splitlines():
+            if line.strip():
+                item = json.loads(line)
+                docs = docs + (item if isinstance(item, list) else [item])
+
+        return {"docs": docs}
+
+class Store(object):
+    """Documents and view rows of several databases in one SQLite file.
+
+    :param path: file name (``:memory:`` for a store in memory)
+    :type path: str
+    """
+    def __init__(self, path):
+        self.path = path
+        self.con = sqlite3.connect(path)
+        self.con.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (db TEXT, id TEXT, rev TEXT, doc TEXT, PRIMARY KEY (db, id));
+            CREATE TABLE IF NOT EXISTS views (db TEXT, view TEXT, PRIMARY KEY (db, view));
+            CREATE TABLE IF NOT EXISTS rows (db TEXT, view TEXT, ktype INTEGER, knum REAL, kstr TEXT,
+                                             key TEXT, id TEXT, value TEXT);
+            CREATE INDEX IF NOT EXISTS rows_key ON rows (db, view, ktype, knum, kstr, id);
+            CREATE TABLE IF NOT EXISTS seq (db TEXT PRIMARY KEY, update_seq INTEGER);
+            """)
+        self.migrate()
+
+    def migrate(self):
+        """Recomputes the keys of array and object rows stored by a
+        former version (compared as json strings, ``user_version`` 0).
+        """
+        if self.con.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return
+        with self.con:
+            rows = self.con.execute("SELECT rowid, key FROM rows WHERE ktype >= 4").fetchall()
+            self.con.executemany("UPDATE rows SET kstr=? WHERE rowid=?",
+                                 [(collation_key(json.loads(k))[2], i) for i, k in rows])
+            self.con.execute("PRAGMA user_version = 1")
+
+    def db(self, name):
+        """Returns the database ``name``.
+
+        :param name: name of the database
+        :type name: str
+
+        :returns: database
+        :rtype: StoreDb
+        """
+        return StoreDb(self, name)
+
+    def close(self):
+        self.con.close()
+
+    def import_dump(self, dump):
+        """Imports a dump. Accepted are the output of ``_all_docs``
+        with ``include_docs=true`` (``{"rows": [{"doc": ...}]}``), a body of
+        ``_bulk_docs`` (``{"docs": [...]}``) and the output of
+        ``export_dump()`` (``{"dbs": {name: {"docs": [...], "views": {view: rows}}}}``).
+        The first two are imported into the database ``vl_db``.
+
+        :param dump: dump
+        :type dump: dict
+
+        :returns: number of imported documents
+        :rtype: int
+        """
+        if "dbs" not in dump:
+            dump = {"dbs": {"vl_db": dump}}
+
+        n = 0
+        for name, content in dump["dbs"].items():
+            db = self.db(name)
+            docs = content.get("docs") or [row["doc"] for row in content.get("rows", []) if row.get("doc")]
+            db.put_docs(docs)
+            for view, rows in content.get("views", {}).items():
+                db.put_view(view, rows)
+            n = n + len(docs)
+
+        return n
+
+    def export_dump(self):
+        """Exports all databases with documents (including ``_rev``) and view rows.
+        The ``docs`` of a database can be posted to ``_bulk_docs``
+        (with ``"new_edits": false``) of a CouchDB server.
+
+        :returns: dump
+        :rtype: dict
+        """
+        dump = {"dbs": {}}
+        names = [r[0] for r in self.con.execute("SELECT db FROM docs UNION SELECT db FROM views ORDER BY 1")]
+        for name in names:
+            db = self.db(name)
+            dump["dbs"][name] = {"docs": db.all_docs(),
+                                 "views": {view: [{"id": row.id, "key": row.key, "value": row.value} for row in db.view(view)]
+                                           for view in db.view_names()}}
+
+        return dump
+
+    def pull(self, srv_db, name, views):
+        """Copies the documents and the rows of the given views from a
+        CouchDB database into the database ``name`` of the store.
+
+        :param srv_db: CouchDB database
+        :type srv_db: couchdb.Database
+        :param name: name of the database in the store
+        :type name: str
+        :param views: views e.g. ``["se3_req/doc"]``
+        :type views: list
+
+        :returns: number of documents
+        :rtype: int
+        """
+        db = self.db(name)
+        docs = [dict(row.doc) for row in srv_db.view("_all_docs", include_docs=True)
+                if not row.id.startswith("_design/")]
+        db.put_docs(docs)
+        for view in views:
+            try:
+                db.put_view(view, [{"id": row.id, "key": row.key, "value": row.value} for row in srv_db.view(view)])
+            except couchdb.http.ResourceNotFound:
+                pass
+
+        return len(docs)
+
+class StoreDb(object):
+    """One database of a ``Store``.
+
+    :param store: store
+    :type store: Store
+    :param name: name of the database
+    :type name: str
+    """
+    def __init__(self, store, name):
+        self.store = store
+        self.con = store.con
+        self.name = name
+
+    def info(self):
+        row = self.con.execute("SELECT update_seq FROM seq WHERE db=?", (self.name,)).fetchone()
+
+        return {"db_name": self.name, "update_seq": row[0] if row else 0}
+
+    def touch(self):
+        self.con.execute("INSERT INTO seq VALUES (?, 1) ON CONFLICT(db) DO UPDATE SET update_seq=update_seq+1",
+                         (self.name,))
+
+    def get(self, doc_id, default=None):
+        row = self.con.execute("SELECT doc FROM docs WHERE db=? AND id=?", (self.name, doc_id)).fetchone()
+
+        return json.loads(row[0]) if row else default
+
+    def get_rev(self, doc_id):
+        """Returns the current revision (``None`` if the document does not exist).
+        """
+        row = self.con.execute("SELECT rev FROM docs WHERE db=? AND id=?", (self.name, doc_id)).fetchone()
+
+        return row[0] if row else None
+
+    def get_revs(self, doc_ids):
+        """Returns the revisions by id (missing documents are left out).
+        """
+        revs = {doc_id: self.get_rev(doc_id) for doc_id in doc_ids}
+
+        return {doc_id: rev for doc_id, rev in revs.items() if rev is not None}
+
+    def get_docs(self, doc_ids):
+        """Returns the documents in the order of ``doc_ids`` (``None`` if not found).
+        """
+        return [self.get(doc_id) for doc_id in doc_ids]
+
+    def all_docs(self):
+        return [json.loads(r[0]) for r in self.con.execute("SELECT doc FROM docs WHERE db=? ORDER BY id", (self.name,))]
+
+    def write(self, doc):
+        """Writes the document if its ``_rev`` is the current one.
+
+        :returns: id, new revision or ``None`` on conflict
+        :rtype: tuple
+        """
+        doc_id = doc.get("_id") or uuid.uuid4().hex
+        rev = self.get_rev(doc_id)
+        if rev != doc.get("_rev"):
+            return doc_id, None
+
+        new = dict(doc, _id=doc_id, _rev=next_rev(rev, doc))
+        self.con.execute("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)",
+                         (self.name, doc_id, new["_rev"], json.dumps(new)))
+
+        return doc_id, new["_rev"]
+
+    def save(self, doc):
+        """Saves the document like ``couchdb.Database.save()`` does
+        (``_id`` and ``_rev`` of ``doc`` are updated).
+
+        :returns: id, revision
+        :rtype: tuple
+        """
+        with self.con:
+            doc_id, rev = self.write(doc)
+            if rev is None:
+                raise couchdb.http.ResourceConflict(("conflict", "Document update conflict."))
+            self.touch()
+        doc["_id"] = doc_id
+        doc["_rev"] = rev
+
+        return doc_id, rev
+
+    def update(self, docs):
+        """Saves the documents like ``couchdb.Database.update()`` does.
+
+        :returns: list of (ok, id, revision or error)
+        :rtype: list
+        """
+        ret = []
+        with self.con:
+            for doc in docs:
+                doc_id, rev = self.write(doc)
+                if rev is None:
+                    ret.append((False, doc_id, couchdb.http.ResourceConflict(("conflict", "Document update conflict."))))
+                else:
+                    doc["_id"] = doc_id
+                    doc["_rev"] = rev
+                    ret.append((True, doc_id, rev))
+            self.touch()
+
+        return ret
+
+    def put_docs(self, docs):
+        """Stores the documents as they are (including their ``_rev``).
+        """
+        with self.con:
+            self.con.executemany("INSERT OR REPLACE INTO docs VALUES (?, ?, ?, ?)",
+                                 [(self.name, doc["_id"], doc.get("_rev"), json.dumps(doc)) for doc in docs])
+            self.touch()
+
+    def put_view(self, view, rows):
+        """Replaces the rows of the ``view``.
+
+        :param view: view e.g. ``se3_req/doc``
+        :type view: str
+        :param rows: rows with ``id``, ``key`` and ``value``
+        :type rows: list
+        """
+        with self.con:
+            self.con.execute("DELETE FROM rows WHERE db=? AND view=?", (self.name, view))
+            self.con.execute("INSERT OR IGNORE INTO views VALUES (?, ?)", (self.name, view))
+            self.con.executemany("INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                 [(self.name, view) + collation_key(row["key"]) +
+                                  (json.dumps(row["key"]), row.get("id"), json.dumps(row["value"])) for row in rows])
+            self.touch()
+
+    def view_names(self):
+        return [r[0] for r in self.con.execute("SELECT view FROM views WHERE db=? ORDER BY view", (self.name,))]
+
+    def view(self, name, key=None, keys=None, startkey=None, endkey=None, include_docs=False):
+        """Returns the rows of the view ``name`` like ``couchdb.Database.view()``.
+        ``startkey`` and ``endkey`` are inclusive.
+
+        :returns: rows with ``id``, ``key``, ``value`` and ``doc``
+        :rtype: list
+        """
+        if self.con.execute("SELECT 1 FROM views WHERE db=? AND view=?", (self.name, name)).fetchone() is None:
+            raise couchdb.http.ResourceNotFound(("not_found", "missing_named_view"))
+
+        sql = "SELECT id, key, value FROM rows WHERE db=? AND view=?"
+        order = " ORDER BY ktype, knum, kstr, id"
+        if keys is not None:
+            res = []
+            for k in keys:
+                res = res + self.query(name, sql + " AND (ktype, knum, kstr)=(?, ?, ?)" + order, collation_key(k))
+        elif key is not None:
+            res = self.query(name, sql + " AND (ktype, knum, kstr)=(?, ?, ?)" + order, collation_key(key))
+        else:
+            cond, param = "", ()
+            if startkey is not None:
+                cond, param = cond + " AND (ktype, knum, kstr)>=(?, ?, ?)", param + collation_key(startkey)
+            if endkey is not None:
+                cond, param = cond + " AND (ktype, knum, kstr)<=(?, ?, ?)", param + collation_key(endkey)
+            res = self.query(name, sql + cond + order, param)
+
+        return [Row(i, json.loads(k), json.loads(v), self.get(i) if include_docs else None) for i, k, v in res]
+
+    def query(self, view, sql, param):
+        return self.con.execute(sql, (self.name, view) + tuple(param)).fetchall()
@@ -0,0 +1,82 @@
+import unittest
+import couchdb
+from .store import Store
+from .pkg_io import Io
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = Store(":memory:")
+        self.store.import_dump({"dbs": {
+            "vl_db": {"docs": [{"_id": "a", "_rev": "1-a", "Calibration": {"A": 1}},
+                               {"_id": "b", "_rev": "1-b", "Calibration": {"B": 2}}],
+                      "views": {"se3_req/doc": [
+                          {"id": "s", "key": "Standard", "value": {"Standard": {"Name": "SE3"}}},
+                          {"id": "c", "key": "CalibrationObject", "value": {"CalibrationObject": {"Sign": "X"}}},
+                          {"id": "r", "key": "Result-X", "value": {"Sign": "X", "Result": [{"Type": "a"}]}}],
+                                "log_data/name-date": [
+                          {"id": "l3", "key": "task~2020-04-22_14-46", "value": 3},
+                          {"id": "l1", "key": "task~2020-04-22_14-44", "value": 1},
+                          {"id": "l2", "key": "task~2020-04-22_14-45", "value": 2},
+                          {"id": "n", "key": 10, "value": 0},
+                          {"id": "m", "key": None, "value": -1}]}},
+            "vl_db_work": {"views": {"se3_req/state": [
+                          {"id": "s1", "key": "20220301", "value": {"_id": "s1"}},
+                          {"id": "s2", "key": "20230301", "value": {"_id": "s2"}}]}}}})
+        self.io = Io()
+        self.io.store = self.store
+        self.io.config["db"]["store"] = ":memory:"
+        self.io.config["cache"]["base_doc"] = False
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_view_1(self):
+        """keys are sorted and selected in CouchDB collation order
+        """
+        db = self.store.db("vl_db")
+        self.assertEqual([r.value for r in db.view("log_data/name-date")], [-1, 0, 1, 2, 3])
+        self.assertEqual(self.io.get_log_data("task", "2020-04-22_14-45", "2020-04-22_14-46"), [2, 3])
+        self.assertEqual(self.io.get_state_doc("se3", enddate="2022-12-31")["_id"], "s1")
+        self.assertEqual(self.io.get_state_doc("se3")["_id"], "s2")
+        self.assertEqual(db.view("se3_req/doc", keys=["Result-X", "Standard"])[1].id, "s")
+        with self.assertRaises(couchdb.http.ResourceNotFound):
+            db.view("se3_req/missing")
+
+    def test_view_2(self):
+        """arrays and objects are compared element by element
+        """
+        keys = [[2], [10], [1, "b"], [1, "a"], [1], ["a"], [None], [True, 1], [-1.5], [[1]], {"a": 2}, {"a": 10}, {"a": 2, "b": 1}, [1, {}]]
+        db = self.store.db("vl_db")
+        db.put_view("t/keys", [{"id": str(i), "key": k, "value": i} for i, k in enumerate(keys)])
+
+        self.assertEqual([r.key for r in db.view("t/keys")],
+                         [[None], [True, 1], [-1.5], [1], [1, "a"], [1, "b"], [1, {}], [2], [10], ["a"], [[1]],
+                          {"a": 2}, {"a": 2, "b": 1}, {"a": 10}])
+        self.assertEqual([r.key for r in db.view("t/keys", startkey=[1], endkey=[10])],
+                         [[1], [1, "a"], [1, "b"], [1, {}], [2], [10]])
+        self.assertEqual(db.view("t/keys", key=[10])[0].value, 1)
+
+    def test_io_1(self):
+        """Io works on the store: base doc, bulk get and save with revisions
+        """
+        doc = self.io.get_base_doc("se3")
+        self.assertEqual(doc["CalibrationObject"][0]["Values"], [{"Type": "a"}])
+
+        docs = self.io.get_docs(["b", "x"])
+        self.assertEqual(docs, [{"_id": "b", "_rev": "1-b", "Calibration": {"B": 2}}, None])
+
+        res = self.io.save_docs([{"_id": "a", "Calibration": {}}, {"_id": "b", "_rev": "0-x"}])
+        self.assertEqual(res[0], ("a", None))
+        self.assertIsNotNone(res[1][1])
+        self.io.set_doc_db({"_id": "a", "Calibration": {"A": 3}})
+        self.assertTrue(self.io.get_doc_db("a")["_rev"].startswith("3-"))
+
+    def test_export_1(self):
+        """export and import give the same store
+        """
+        dump = self.store.export_dump()
+        store = Store(":memory:")
+        self.assertEqual(store.import_dump(dump), 2)
+        self.assertEqual(store.export_dump(), dump)
+        store.close()
@@ -0,0 +1,264 @@
+"""Opt-in timing of the analysis pipelines.
+
+Enabled by the cli flag ``--profile [dir]`` of ``Io.eval_args()`` or
+the environment variable ``VPY_PROFILE=<dir>``::
+
+    python script/se3/cal_analysis_expansion.py --ids 'cal-2019-se3-kk-75002_0001' --profile /tmp/prof
+    VPY_PROFILE=/tmp/prof python script/se3/cal_analysis_expansion.py --ids ...
+
+``enable()`` wraps the public methods of all classes derived from
+``Document`` imported so far (``Cal``, ``Uncert``, ``Device``,
+``Analysis``, ``Result``, ``Values``, ...) and of ``Io``; classes
+derived from ``Document`` later on (e.g. ``Cal`` imported by
+``vpy.pipeline``) are wrapped when they are defined. Per method
+the calls, the wall time (``Time_s``, including the called methods),
+the time spent in the method itself (``SelfTime_s``), the lookups by
+``Document.get_object()`` and the bytes copied by ``copy.deepcopy()``
+are recorded. Nothing is wrapped as long as timing is not enabled.
+
+The records are written per document: ``Io.get_doc_db()`` starts the
+record of the requested document (``begin()``), the record is written
+by the next ``begin()`` or at the end of the process to
+``<dir>/<name>.json`` (summary) and ``<dir>/<name>.folded`` (self time
+in microseconds per call stack, input of ``flamegraph.pl`` or
+speedscope). Records are kept per process, not per thread.
+"""
+import os
+import re
+import sys
+import copy
+import json
+import time
+import atexit
+import functools
+import numpy as np
+
+recorder = None
+
+class Recorder(object):
+    """Timing record of one document.
+
+    :param path: directory of the summaries
+    :type path: str
+    :param name: name of the record (default: name of the script)
+    :type name: str
+    """
+    def __init__(self, path, name=None):
+        self.path = path
+        self.reset(name)
+
+    def reset(self, name=None):
+        """Starts a new record; running methods are timed from now on.
+        """
+        self.name = name or os.path.splitext(os.path.basename(sys.argv[0] or "vpy"))[0]
+        self.t_start = time.perf_counter()
+        self.stats = {}
+        self.stacks = {}
+        self.stack = [[f[0], self.t_start, 0.0] for f in getattr(self, "stack", [])]
+
+    def stat(self, name):
+        if name not in self.stats:
+            self.stats[name] = {"Calls": 0, "Time_s": 0.0, "SelfTime_s": 0.0, "Lookups": 0, "CopiedBytes": 0}
+
+        return self.stats[name]
+
+    def enter(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def leave(self):
+        name, t_0, t_child = self.stack.pop()
+        elapsed = time.perf_counter() - t_0
+        s = self.stat(name)
+        s["Calls"] += 1
+        s["SelfTime_s"] += elapsed - t_child
+        if name not in (f[0] for f in self.stack): ## recursion: outermost call only
+            s["Time_s"] += elapsed
+        key = ";".join([f[0] for f in self.stack] + [name])
+        self.stacks[key] = self.stacks.get(key, 0.0) + elapsed - t_child
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def count(self, field, n=1):
+        """Adds ``n`` to the ``field`` of the running method (of
+        ``<top>`` outside of wrapped methods).
+        """
+        self.stat(self.stack[-1][0] if self.stack else "<top>")[field] += n
+
+    def summary(self):
+        """Returns the summary of the record; methods sorted by self time.
+
+        :rtype: dict
+        """
+        names = sorted(self.stats, key=lambda n: self.stats[n]["SelfTime_s"], reverse=True)
+
+        return {"Name": self.name,
+                "Script": sys.argv[0],
+                "Total_s": time.perf_counter() - self.t_start,
+                "Lookups": sum(s["Lookups"] for s in self.stats.values()),
+                "CopiedBytes": sum(s["CopiedBytes"] for s in self.stats.values()),
+                "Methods": {n: self.stats[n] for n in names}}
+
+    def write(self):
+        """Writes ``<name>.json`` and ``<name>.folded`` to ``self.path``
+        if anything was recorded.
+
+        :returns: file name of the summary or ``None``
+        :rtype: str
+        """
+        if not self.stats:
+            return None
+        os.makedirs(self.path, exist_ok=True)
+        base = os.path.join(self.path, re.sub(r"[^\w.-]", "_", self.name))
+        with open(base + ".json", "w") as f:
+            json.dump(self.summary(), f, indent=1)
+        with open(base + ".folded", "w") as f:
+            for key, t in self.stacks.items():
+                f.write("{} {}\n".format(key, int(round(t * 1e6))))
+
+        return base + ".json"
+
+def size_of(obj):
+    """Returns the approximate size in bytes of ``obj`` (nested dicts,
+    lists and arrays).
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(size_of(k) + size_of(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(size_of(v) for v in obj)
+
+    return sys.getsizeof(obj)
+
+def timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        rec = recorder
+        ## direct recursion is timed as one call
+        if rec is None or (rec.stack and rec.stack[-1][0] == name):
+            return func(*args, **kwargs)
+        rec.enter(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            rec.leave()
+
+    return wrapper
+
+def counted_lookup(func):
+    @functools.wraps(func)
+    def wrapper(self, key, value, o=False):
+        if not o and recorder is not None:
+            recorder.count("Lookups")
+
+        return func(self, key, value, o)
+
+    return wrapper
+
+def counted_deepcopy(func):
+    @functools.wraps(func)
+    def wrapper(x, memo=None, *args):
+        ret = func(x, memo, *args)
+        ## copy.deepcopy calls itself for the items (memo given)
+        if memo is None and recorder is not None:
+            recorder.count("CopiedBytes", size_of(ret))
+
+        return ret
+
+    return wrapper
+
+originals = []
+
+def patch(owner, name, value):
+    originals.append((owner, name, owner.__dict__[name]))
+    setattr(owner, name, value)
+
+def classes():
+    """Returns the classes to time: ``Document`` and all classes
+    derived from it imported so far as well as ``Io``.
+    """
+    from .document import Document
+    from .pkg_io import Io
+
+    ret, todo = [], [Document]
+    while todo:
+        cls = todo.pop()
+        if cls not in ret:
+            ret.append(cls)
+            todo.extend(cls.__subclasses__())
+
+    return ret + [Io]
+
+def wrap(cls):
+    from .document import Document
+
+    for name, attr in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        label = "{}.{}".format(cls.__name__, name)
+        if cls is Document and name == "get_object":
+            patch(cls, name, counted_lookup(attr))
+        elif isinstance(attr, classmethod):
+            patch(cls, name, classmethod(timed(label, attr.__func__)))
+        elif isinstance(attr, staticmethod):
+            patch(cls, name, staticmethod(timed(label, attr.__func__)))
+        elif callable(attr) and not isinstance(attr, type):
+            patch(cls, name, timed(label, attr))
+
+def instrument():
+    for cls in classes():
+        wrap(cls)
+    patch(copy, "deepcopy", counted_deepcopy(copy.deepcopy))
+
+def instrument_class(cls):
+    """Wraps the methods of a class derived from ``Document`` after
+    ``enable()`` (called by ``Document.__init_subclass__()``; the
+    standards are imported by the pipelines on first use).
+    """
+    if recorder is not None:
+        wrap(cls)
+
+def enable(path):
+    """Enables timing; the summaries are written to ``path``.
+
+    :param path: directory of the summaries
+    :type path: str
+    """
+    global recorder
+    if recorder is None:
+        instrument()
+        atexit.register(write)
+        recorder = Recorder(path)
+    else:
+        recorder.write()
+        recorder.path = path
+        recorder.reset()
+
+def disable():
+    """Writes the current record and restores the wrapped methods.
+    """
+    global recorder
+    write()
+    recorder = None
+    while originals:
+        owner, name, value = originals.pop()
+        setattr(owner, name, value)
+
+def begin(name):
+    """Writes the current record and starts the one of the document
+    ``name``. Does nothing if timing is not enabled.
+    """
+    if recorder is not None:
+        recorder.write()
+        recorder.reset(str(name))
+
+def write():
+    """Writes the current record (if enabled).
+
+    :returns: file name of the summary or ``None``
+    :rtype: str
+    """
+    if recorder is not None:
+        return recorder.write()
+
+    return None
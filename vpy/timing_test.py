@@ -0,0 +1,70 @@
+import os
+import sys
+import copy
+import json
+import tempfile
+import unittest
+import subprocess
+from vpy import timing
+from vpy.document import Document
+from vpy.analysis import Analysis
+
+class TestTiming(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.doc = {"Calibration": {"Measurement": {"Values": {"Pressure": [
+            {"Type": "a", "Unit": "Pa", "Value": [1.0, 2.0]}]}}}}
+
+    def tearDown(self):
+        timing.disable()
+        self.tmp.cleanup()
+
+    def test_enable_1(self):
+        """nothing is wrapped unless enabled; disable restores the methods
+        """
+        get_value = Document.__dict__["get_value"]
+        deepcopy = copy.deepcopy
+        timing.enable(self.tmp.name)
+        self.assertIsNot(Document.__dict__["get_value"], get_value)
+        timing.disable()
+        self.assertIs(Document.__dict__["get_value"], get_value)
+        self.assertIs(copy.deepcopy, deepcopy)
+        self.assertIsNone(timing.write())
+
+    def test_begin_1(self):
+        """calls, lookups and copied bytes are recorded per document
+        """
+        timing.enable(self.tmp.name)
+        timing.begin("cal-1")
+        ana = Analysis(self.doc, git_hash=False)
+        ana.get_value("a", "Pa")
+        ana.store("Pressure", "b", [1.0, 2.0], "Pa")
+        timing.begin("cal-2")
+
+        with open(os.path.join(self.tmp.name, "cal-1.json")) as f:
+            summary = json.load(f)
+        methods = summary["Methods"]
+        self.assertEqual(methods["Document.get_value"]["Calls"], 1)
+        self.assertEqual(methods["Document.get_value"]["Lookups"], 1)
+        self.assertEqual(methods["Analysis.store"]["Calls"], 1)
+        self.assertGreater(summary["CopiedBytes"], 0)
+        with open(os.path.join(self.tmp.name, "cal-1.folded")) as f:
+            self.assertIn("Analysis.store", f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "cal-2.json")))
+
+    def test_enable_2(self):
+        """standards imported after enable() (by the pipelines) are timed
+        """
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        code = ("import sys, vpy.pipeline\n"
+                "from vpy import timing\n"
+                "assert 'vpy.standard.se3.cal' not in sys.modules\n"
+                "timing.enable(sys.argv[1])\n"
+                "from vpy.standard.se3.cal import Cal\n"
+                "from vpy.standard.se3.uncert import Uncert\n"
+                "print(hasattr(Cal.temperature_before, '__wrapped__'), hasattr(Uncert.total, '__wrapped__'),"
+                " hasattr(Cal.pressure_gn_corr, '__wrapped__'))\n")
+        out = subprocess.run([sys.executable, "-c", code, self.tmp.name], cwd=root,
+                             stdout=subprocess.PIPE, check=True).stdout.decode()
+        self.assertEqual(out.split(), ["True", "True", "True"])
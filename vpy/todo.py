@@ -2,6 +2,7 @@ import sys
 import numpy as np
 from .document import Document
 from .values import Pressure, Temperature
+from .grouping import index_by_rel_dev
 
 
 class ToDo(Document):
@@ -73,16 +74,10 @@ class ToDo(Document):
         """
 
         target = self.Pres.get_value("target", unit)
-        r = []
         if max_dev is None:
             max_dev = self.max_dev
 
-        for i in range(0, len(target)):
-            rr = []
-            for j in range(0, len(cal)):
-                if abs(cal[j] / target[i] - 1) < max_dev:
-                    rr.append(j)
-            r.append(rr)
+        r = index_by_rel_dev(cal, target, max_dev)
 
         self.average_index = r
         return r